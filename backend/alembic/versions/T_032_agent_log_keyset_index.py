@@ -0,0 +1,29 @@
+"""Composite index backing keyset pagination of agent logs."""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "T_032_agent_log_keyset_index"
+down_revision = "T_031_identity_sprint1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    try:
+        op.create_index(
+            "ix_agent_logs_agent_created",
+            "agent_logs",
+            ["agent_id", "created_at", "id"],
+        )
+    except Exception:
+        pass
+
+
+def downgrade() -> None:
+    try:
+        op.drop_index("ix_agent_logs_agent_created", table_name="agent_logs")
+    except Exception:
+        pass
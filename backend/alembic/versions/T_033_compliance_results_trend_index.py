@@ -0,0 +1,29 @@
+"""Composite index backing aggregated compliance trend queries."""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "T_033_compliance_results_trend_index"
+down_revision = "T_032_agent_log_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    try:
+        op.create_index(
+            "ix_compliance_results_tenant_module_recorded",
+            "compliance_results",
+            ["tenant_id", "module", "recorded_at"],
+        )
+    except Exception:
+        pass
+
+
+def downgrade() -> None:
+    try:
+        op.drop_index("ix_compliance_results_tenant_module_recorded", table_name="compliance_results")
+    except Exception:
+        pass
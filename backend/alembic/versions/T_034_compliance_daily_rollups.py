@@ -0,0 +1,39 @@
+"""Daily compliance rollups (pass/fail per tenant, module and day), backfilled from results."""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "T_034_compliance_daily_rollups"
+down_revision = "T_033_compliance_results_trend_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "compliance_daily_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("tenant_id", sa.Integer(), sa.ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("module", sa.String(length=100), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("pass_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("fail_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.UniqueConstraint("tenant_id", "module", "day", name="uq_compliance_daily_rollups_tenant_module_day"),
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        day = "CAST(date_trunc('day', recorded_at) AS date)"
+    else:
+        day = "date(recorded_at)"
+    is_pass = "lower(trim(status)) = 'pass'"
+    op.execute(
+        "INSERT INTO compliance_daily_rollups (tenant_id, module, day, pass_count, fail_count) "
+        f"SELECT tenant_id, module, {day}, "
+        f"SUM(CASE WHEN {is_pass} THEN 1 ELSE 0 END), SUM(CASE WHEN {is_pass} THEN 0 ELSE 1 END) "
+        f"FROM compliance_results GROUP BY tenant_id, module, {day}"
+    )
+
+
+def downgrade():
+    op.drop_table("compliance_daily_rollups")
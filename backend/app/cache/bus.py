@@ -0,0 +1,417 @@
+"""Cross-process cache invalidation bus.
+
+In-process caches (app settings, feature flags, CORS origins) are evicted by
+the process that commits a write (see :mod:`app.cache.invalidation`).  The
+bus forwards those evictions to every other API and Celery process, so long
+TTLs no longer mean other workers serve stale data::
+
+    subscribe("app_settings", handler)   # handler(changed) evicts locally
+    publish("app_settings", changed)     # runs local handlers, then broadcasts
+
+``broadcast_on_commit(model, namespace, handler)`` wires both ends to the
+commit hooks in one call.
+
+The transport is picked from ``TENANTRA_CACHE_BUS_URL``:
+
+* ``redis://`` / ``rediss://`` - Redis pub/sub
+* ``postgresql://`` (driver suffixes such as ``+psycopg`` are accepted) -
+  Postgres ``LISTEN``/``NOTIFY``
+* empty (default) - process-local only
+
+Local handlers run synchronously in ``publish``.  Remote sends never block
+the committing thread: they are merged per namespace into an outbox that a
+sender thread drains, one message per drain, and everything published while
+one commit's hooks run goes out together.  Messages carry
+``({namespace: tenant ids}, version, origin)``; a process ignores its own
+messages and exact duplicates.  Evictions are idempotent, so messages that
+arrive out of order are still applied.  Neither transport replays messages
+sent while a listener was disconnected, so every (re)connect flushes all
+subscribed namespaces before new messages are applied.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import json
+import logging
+import os
+import re
+import select
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from app.cache.invalidation import ALL_TENANTS, Changed, around_dispatch, on_commit
+from app.observability.metrics import record_cache_bus_event
+
+logger = logging.getLogger("tenantra.cache")
+
+try:  # optional dependency
+    import redis as _redis
+except Exception:  # pragma: no cover - optional dependency
+    _redis = None
+
+BUS_URL = os.getenv("TENANTRA_CACHE_BUS_URL", "").strip()
+CHANNEL = os.getenv("TENANTRA_CACHE_BUS_CHANNEL", "tenantra_cache")
+RETRY_SECONDS = float(os.getenv("TENANTRA_CACHE_BUS_RETRY_SECONDS", "5"))
+
+Handler = Callable[[Changed], None]
+PayloadCallback = Callable[[str], None]
+
+# Listener loops wake up this often to notice stop requests.
+_POLL_SECONDS = 1.0
+_MAX_TRACKED_MESSAGES = 4096
+
+
+def _merge(current: Optional[Changed], changed: Changed) -> Changed:
+    if current is None:
+        return changed
+    if current is ALL_TENANTS or changed is ALL_TENANTS:
+        return ALL_TENANTS
+    return current | changed
+
+
+def _encode_tenants(changed: Changed) -> Optional[List[Optional[int]]]:
+    if changed is ALL_TENANTS:
+        return None
+    return sorted(changed, key=lambda tenant_id: -1 if tenant_id is None else tenant_id)
+
+
+def _decode_tenants(tenants) -> Changed:
+    return ALL_TENANTS if tenants is None else frozenset(tenants)
+
+
+@dataclass(frozen=True)
+class Message:
+    changes: Dict[str, Changed]
+    version: int
+    origin: str
+
+    def encode(self) -> str:
+        return json.dumps(
+            {
+                "ns": {namespace: _encode_tenants(changed) for namespace, changed in self.changes.items()},
+                "v": self.version,
+                "origin": self.origin,
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def decode(cls, raw: Union[str, bytes]) -> "Message":
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        data = json.loads(raw)
+        namespaces = data["ns"]
+        if isinstance(namespaces, str):
+            # Single-namespace layout sent by processes that predate batching.
+            changes = {namespaces: _decode_tenants(data.get("tenants"))}
+        else:
+            changes = {str(namespace): _decode_tenants(tenants) for namespace, tenants in namespaces.items()}
+        return cls(changes=changes, version=int(data["v"]), origin=str(data["origin"]))
+
+
+class RedisTransport:
+    """Redis pub/sub on a single channel."""
+
+    def __init__(self, url: str, channel: str = CHANNEL) -> None:
+        if _redis is None:
+            raise RuntimeError("redis package is not installed")
+        self.channel = channel
+        self._client = _redis.Redis.from_url(url, socket_timeout=5, socket_connect_timeout=1)
+
+    def send(self, payload: str) -> None:
+        self._client.publish(self.channel, payload)
+
+    def listen(self, on_payload: PayloadCallback, on_ready: Callable[[], None], stop: threading.Event) -> None:
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self.channel)
+            on_ready()
+            while not stop.is_set():
+                message = pubsub.get_message(timeout=_POLL_SECONDS)
+                if message and message.get("type") == "message":
+                    on_payload(message["data"])
+        finally:
+            pubsub.close()
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _libpq_url(url: str) -> str:
+    return re.sub(r"^postgres(?:ql)?(?:\+\w+)?://", "postgresql://", url)
+
+
+class PostgresTransport:
+    """Postgres ``LISTEN``/``NOTIFY`` on a single channel."""
+
+    def __init__(self, url: str, channel: str = CHANNEL) -> None:
+        import psycopg
+
+        self._psycopg = psycopg
+        self.url = _libpq_url(url)
+        self.channel = channel
+        self._send_conn = None
+        self._send_lock = threading.Lock()
+
+    def _connect(self):
+        return self._psycopg.connect(self.url, autocommit=True, connect_timeout=5)
+
+    def send(self, payload: str) -> None:
+        with self._send_lock:
+            if self._send_conn is None or self._send_conn.closed:
+                self._send_conn = self._connect()
+            try:
+                self._send_conn.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+            except Exception:
+                self._send_conn.close()
+                self._send_conn = None
+                raise
+
+    def listen(self, on_payload: PayloadCallback, on_ready: Callable[[], None], stop: threading.Event) -> None:
+        from psycopg import sql
+
+        conn = self._connect()
+        try:
+            conn.add_notify_handler(lambda notify: on_payload(notify.payload))
+            conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+            on_ready()
+            while not stop.is_set():
+                # Notifications are dispatched to the handler while a command
+                # runs, so wait for the socket and then run a no-op.
+                readable, _, _ = select.select([conn.fileno()], [], [], _POLL_SECONDS)
+                if readable:
+                    conn.execute("SELECT 1")
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        with self._send_lock:
+            if self._send_conn is not None:
+                self._send_conn.close()
+                self._send_conn = None
+
+
+def transport_from_url(url: str):
+    """Transport for ``url``; ``None`` keeps invalidation process-local."""
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisTransport(url)
+    if re.match(r"^postgres(?:ql)?(?:\+\w+)?://", url):
+        return PostgresTransport(url)
+    raise ValueError(f"Unsupported cache bus URL scheme: {url.split(':', 1)[0]}")
+
+
+class InvalidationBus:
+    def __init__(self, transport=None, *, retry_seconds: float = RETRY_SECONDS) -> None:
+        self.transport = transport
+        self.retry_seconds = retry_seconds
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._versions = itertools.count(1)
+        self._seen: Dict[Tuple[str, int], None] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Remote sends: namespace -> merged tenants, drained by the sender thread.
+        self._outbox: Dict[str, Changed] = {}
+        self._outbox_cond = threading.Condition()
+        self._sending = False
+        self._sender: Optional[threading.Thread] = None
+        self._held = threading.local()
+
+    def subscribe(self, namespace: str, handler: Handler) -> None:
+        with self._lock:
+            self._handlers.setdefault(namespace, []).append(handler)
+
+    def publish(self, namespace: str, changed: Changed = ALL_TENANTS) -> None:
+        """Evict locally, then queue the eviction for every other process."""
+        self._deliver(namespace, changed)
+        if self.transport is None:
+            return
+        held = getattr(self._held, "changes", None)
+        if held is not None:
+            held[namespace] = _merge(held.get(namespace), changed)
+        else:
+            self._enqueue({namespace: changed})
+
+    @contextlib.contextmanager
+    def hold(self) -> Iterator[None]:
+        """Queue everything this thread publishes inside the block as one message."""
+        if getattr(self._held, "changes", None) is not None:
+            yield
+            return
+        self._held.changes = {}
+        try:
+            yield
+        finally:
+            changes, self._held.changes = self._held.changes, None
+            if changes and self.transport is not None:
+                self._enqueue(changes)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until queued messages have been handed to the transport."""
+        with self._outbox_cond:
+            return self._outbox_cond.wait_for(lambda: not self._outbox and not self._sending, timeout)
+
+    def _enqueue(self, changes: Dict[str, Changed]) -> None:
+        with self._outbox_cond:
+            for namespace, changed in changes.items():
+                self._outbox[namespace] = _merge(self._outbox.get(namespace), changed)
+            if self._sender is None or not self._sender.is_alive():
+                self._sender = threading.Thread(target=self._send_loop, name="cache-bus-sender", daemon=True)
+                self._sender.start()
+            self._outbox_cond.notify_all()
+
+    def _send_loop(self) -> None:
+        while True:
+            with self._outbox_cond:
+                self._sending = False
+                self._outbox_cond.notify_all()
+                while not self._outbox:
+                    self._outbox_cond.wait()
+                changes, self._outbox = self._outbox, {}
+                self._sending = True
+            self._send(changes)
+
+    def _send(self, changes: Dict[str, Changed]) -> None:
+        transport = self.transport
+        if transport is None:
+            return
+        message = Message(changes=changes, version=next(self._versions), origin=self.origin)
+        try:
+            transport.send(message.encode())
+            record_cache_bus_event("published")
+        except Exception:
+            # The write is already committed; other processes catch up at TTL expiry.
+            logger.warning("Unable to publish cache invalidation for %s", ", ".join(sorted(changes)), exc_info=True)
+            record_cache_bus_event("publish_error")
+
+    def start(self) -> None:
+        if self.transport is None or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-bus-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self.flush(timeout)
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.transport.listen(self._receive, self._on_connected, self._stop)
+            except Exception:
+                if self._stop.is_set():
+                    break
+                logger.warning(
+                    "Cache invalidation bus disconnected; retrying in %ss", self.retry_seconds, exc_info=True
+                )
+                record_cache_bus_event("disconnect")
+                self._stop.wait(self.retry_seconds)
+
+    def _on_connected(self) -> None:
+        # Anything published while we were not listening is lost; start clean.
+        with self._lock:
+            namespaces = list(self._handlers)
+        for namespace in namespaces:
+            self._deliver(namespace, ALL_TENANTS)
+
+    def _receive(self, raw) -> None:
+        try:
+            message = Message.decode(raw)
+        except Exception:
+            logger.warning("Ignoring malformed cache invalidation message: %r", raw)
+            return
+        if message.origin == self.origin:
+            return
+        key = (message.origin, message.version)
+        with self._lock:
+            if key in self._seen:
+                return
+            if len(self._seen) >= _MAX_TRACKED_MESSAGES:
+                del self._seen[next(iter(self._seen))]
+            self._seen[key] = None
+        record_cache_bus_event("received")
+        for namespace, changed in message.changes.items():
+            self._deliver(namespace, changed)
+
+    def _deliver(self, namespace: str, changed: Changed) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(namespace, ()))
+        for handler in handlers:
+            try:
+                handler(changed)
+            except Exception:
+                logger.warning("Cache invalidation handler failed for %s", namespace, exc_info=True)
+
+
+_BUS: Optional[InvalidationBus] = None
+_BUS_LOCK = threading.Lock()
+
+
+def get_bus() -> InvalidationBus:
+    global _BUS
+    if _BUS is None:
+        with _BUS_LOCK:
+            if _BUS is None:
+                try:
+                    transport = transport_from_url(BUS_URL)
+                except Exception:
+                    logger.warning("Cache invalidation bus unavailable; invalidation stays process-local", exc_info=True)
+                    transport = None
+                _BUS = InvalidationBus(transport)
+    return _BUS
+
+
+def subscribe(namespace: str, handler: Handler) -> None:
+    get_bus().subscribe(namespace, handler)
+
+
+def publish(namespace: str, changed: Changed = ALL_TENANTS) -> None:
+    get_bus().publish(namespace, changed)
+
+
+def _hold_for_commit():
+    return get_bus().hold()
+
+
+around_dispatch(_hold_for_commit)
+
+
+def broadcast_on_commit(model: Type, namespace: str, handler: Handler) -> None:
+    """Run ``handler`` in every process when ``model`` rows are committed."""
+    subscribe(namespace, handler)
+    on_commit(model, lambda changed: publish(namespace, changed))
+
+
+def start() -> None:
+    """Start the listener thread (no-op without a configured transport)."""
+    get_bus().start()
+
+
+def stop() -> None:
+    bus = _BUS
+    if bus is not None:
+        bus.stop()
+        if bus.transport is not None:
+            try:
+                bus.transport.close()
+            except Exception:
+                logger.debug("Cache bus transport close failed", exc_info=True)
+
+
+def configure(transport) -> InvalidationBus:
+    """Swap the transport of the process bus, keeping its subscriptions (tests, tooling)."""
+    bus = get_bus()
+    bus.stop()
+    bus.transport = transport
+    return bus
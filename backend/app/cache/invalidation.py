@@ -0,0 +1,128 @@
+"""Invalidate in-process caches when watched ORM models are committed.
+
+``on_commit(AppSetting, callback)`` calls ``callback(tenant_ids)`` after any
+session in this process commits inserts, updates or deletes of ``AppSetting``
+rows, whether they came from an API route, a script or a test.
+``tenant_ids`` holds the ``tenant_id`` of every touched row (``None`` for
+global rows).  Bulk ``query.update()``/``delete()`` statements cannot tell
+which rows they hit, so they pass ``ALL_TENANTS`` instead.
+
+Writes that are rolled back stay pending and are reported with the
+session's next commit: a spurious invalidation is cheap, a missed one is not.
+
+Tenant-scoped caches store entries under :func:`tenant_namespace` and
+register ``tenant_evictor(cache)`` as their commit handler.
+
+``around_dispatch(factory)`` wraps the callbacks of each commit in
+``factory()`` (a context manager), so consumers can batch their work per
+commit.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import threading
+from typing import Callable, ContextManager, Dict, FrozenSet, List, Optional, Set, Type, Union
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("tenantra.cache")
+
+
+class _AllTenants:
+    def __repr__(self) -> str:
+        return "ALL_TENANTS"
+
+
+ALL_TENANTS = _AllTenants()
+
+Changed = Union[FrozenSet[Optional[int]], _AllTenants]
+Callback = Callable[[Changed], None]
+
+_PENDING_KEY = "tenantra.cache.pending"
+
+_WATCHERS: Dict[type, List[Callback]] = {}
+_DISPATCH_CONTEXTS: List[Callable[[], ContextManager]] = []
+_LOCK = threading.Lock()
+_INSTALLED = False
+
+
+def on_commit(model: Type, callback: Callback) -> None:
+    """Register ``callback`` for committed writes to ``model``."""
+    global _INSTALLED
+    with _LOCK:
+        _WATCHERS.setdefault(model, []).append(callback)
+        if not _INSTALLED:
+            event.listen(Session, "after_flush", _collect_flush)
+            event.listen(Session, "do_orm_execute", _collect_bulk)
+            event.listen(Session, "after_commit", _dispatch)
+            _INSTALLED = True
+
+
+def tenant_namespace(tenant_id: Optional[int]) -> str:
+    """Cache namespace for one tenant scope (``"global"`` for tenant-less rows)."""
+    return "global" if tenant_id is None else f"tenant:{tenant_id}"
+
+
+def tenant_evictor(cache, *, global_fans_out: bool = True) -> Callback:
+    """Commit handler evicting the :func:`tenant_namespace` entries of ``cache``.
+
+    With ``global_fans_out`` (caches whose tenant entries merge in global
+    rows) a change to a global row clears the whole cache.
+    """
+
+    def _evict(changed: Changed) -> None:
+        if changed is ALL_TENANTS or (global_fans_out and None in changed):
+            cache.clear()
+        else:
+            cache.invalidate_namespace(*(tenant_namespace(tenant_id) for tenant_id in changed))
+
+    return _evict
+
+
+def around_dispatch(factory: Callable[[], ContextManager]) -> None:
+    """Enter ``factory()`` around the callbacks run for each commit."""
+    with _LOCK:
+        _DISPATCH_CONTEXTS.append(factory)
+
+
+def _pending(session: Session) -> Dict[type, Union[Set[Optional[int]], _AllTenants]]:
+    return session.info.setdefault(_PENDING_KEY, {})
+
+
+def _collect_flush(session: Session, _flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        model = type(obj)
+        if model not in _WATCHERS:
+            continue
+        pending = _pending(session)
+        touched = pending.setdefault(model, set())
+        if touched is not ALL_TENANTS:
+            touched.add(getattr(obj, "tenant_id", None))
+
+
+def _collect_bulk(state) -> None:
+    if not (state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    model = getattr(mapper, "class_", None)
+    if model in _WATCHERS:
+        _pending(state.session)[model] = ALL_TENANTS
+
+
+def _dispatch(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    with contextlib.ExitStack() as stack:
+        for factory in list(_DISPATCH_CONTEXTS):
+            stack.enter_context(factory())
+        for model, touched in pending.items():
+            changed: Changed = touched if touched is ALL_TENANTS else frozenset(touched)
+            for callback in list(_WATCHERS.get(model, ())):
+                try:
+                    callback(changed)
+                except Exception:
+                    logger.warning("Cache invalidation callback failed for %s", model.__name__, exc_info=True)
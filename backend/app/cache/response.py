@@ -0,0 +1,364 @@
+"""Declarative response caching for read-heavy dashboard endpoints.
+
+::
+
+    @router.get("/inventory", response_model=CloudInventoryResponse)
+    @cached_response(tags=("cloud",), ttl=60)
+    def inventory(...): ...
+
+    invalidate_on_commit(CloudAccount, "cloud")
+
+Responses are cached as serialized JSON bytes with a precomputed ETag, keyed
+by endpoint, the caller's tenant and role, the path and the query string.
+Clients sending a matching ``If-None-Match`` get ``304``.  The endpoint's
+own dependencies (auth, tenant checks) still run on every request; only the
+endpoint body is skipped on a hit.
+
+Invalidation is by tag version rather than by scanning keys.  Every key
+embeds the current versions of its tags, at two levels:
+
+* ``<tag>`` - bumped by writes to global rows; invalidates every tenant.
+* ``<tag>:<scope>`` - bumped by writes for one tenant; ``scope`` is the
+  tenant id, or ``all`` for cross-tenant (tenant-less admin) views, which
+  every tenant write also bumps.
+
+Bumped entries become unreachable and age out by TTL.  ``invalidate_on_commit``
+bumps tags whenever rows of a model are committed, from any code path.
+
+Storage is chosen with ``TENANTRA_RESPONSE_CACHE_BACKEND``:
+
+* ``memory`` (default) - per process; tag bumps travel over the cache bus.
+* ``redis`` - shared by every worker (``TENANTRA_RESPONSE_CACHE_REDIS_URL``);
+  tag versions live in Redis too.  Redis errors bypass the cache.
+* ``off`` - disabled.
+
+Lookups are counted in ``app_cache_events_total{cache="response:<name>"}``
+as ``hit``, ``miss`` and ``not_modified``.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import typing
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Type
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+
+from app.cache import bus as cache_bus
+from app.cache.invalidation import ALL_TENANTS, Changed, on_commit
+from app.cache.ttl import TTLCache
+from app.observability.metrics import record_cache_event
+
+logger = logging.getLogger("tenantra.cache")
+
+try:  # optional dependency
+    import redis as _redis
+except Exception:  # pragma: no cover - optional dependency
+    _redis = None
+
+BACKEND = os.getenv("TENANTRA_RESPONSE_CACHE_BACKEND", "memory").strip().lower()
+REDIS_URL = os.getenv("TENANTRA_RESPONSE_CACHE_REDIS_URL", "").strip()
+REDIS_PREFIX = os.getenv("TENANTRA_RESPONSE_CACHE_REDIS_PREFIX", "tenantra:rc:")
+MAXSIZE = int(os.getenv("TENANTRA_RESPONSE_CACHE_MAXSIZE", "2048"))
+DEFAULT_TTL = float(os.getenv("TENANTRA_RESPONSE_CACHE_TTL", "60"))
+
+CACHE_STATUS_HEADER = "X-Cache"
+_MAX_TTL = 3600
+_BUS_PREFIX = "response_cache:"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "CachedResponse":
+        return cls(body=body, etag=f'W/"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+class MemoryResponseStore:
+    """Per-process store; tag versions are kept coherent through the cache bus."""
+
+    shared = False
+
+    def __init__(self, maxsize: int = MAXSIZE) -> None:
+        # Endpoints pick their own TTL, so entries carry a deadline and the
+        # LRU's TTL is only an upper bound.
+        self._entries = TTLCache(name="response_cache", ttl_seconds=_MAX_TTL, maxsize=maxsize)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def versions(self, keys: Sequence[str]) -> List[int]:
+        return [self._versions.get(key, 0) for key in keys]
+
+    def bump(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        item = self._entries.peek(key)
+        if item is None or item[0] <= time.monotonic():
+            return None
+        return item[1]
+
+    def set(self, key: str, entry: CachedResponse, ttl: float) -> None:
+        self._entries.set(key, (time.monotonic() + ttl, entry))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        with self._lock:
+            self._versions.clear()
+
+
+class RedisResponseStore:
+    """Store shared by every process; bodies and tag versions live in Redis."""
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = REDIS_PREFIX) -> None:
+        if _redis is None:
+            raise RuntimeError("redis package is not installed")
+        self.prefix = prefix
+        self._client = _redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+
+    def versions(self, keys: Sequence[str]) -> List[int]:
+        raw = self._client.mget([f"{self.prefix}tag:{key}" for key in keys])
+        return [int(value) if value is not None else 0 for value in raw]
+
+    def bump(self, keys: Iterable[str]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        for key in keys:
+            pipe.incr(f"{self.prefix}tag:{key}")
+        pipe.execute()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raw = self._client.get(f"{self.prefix}body:{key}")
+        if raw is None:
+            return None
+        etag, _, body = raw.partition(b"\n")
+        return CachedResponse(body=body, etag=etag.decode("ascii"))
+
+    def set(self, key: str, entry: CachedResponse, ttl: float) -> None:
+        value = entry.etag.encode("ascii") + b"\n" + entry.body
+        self._client.set(f"{self.prefix}body:{key}", value, px=max(1, int(ttl * 1000)))
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(f"{self.prefix}*"):
+            self._client.delete(key)
+
+
+def _build_store():
+    if BACKEND == "off":
+        return None
+    if BACKEND == "redis":
+        try:
+            return RedisResponseStore(REDIS_URL)
+        except Exception:
+            logger.warning("Redis response cache unavailable; falling back to in-process", exc_info=True)
+    return MemoryResponseStore()
+
+
+_STORE: Any = None
+_STORE_READY = False
+_STORE_LOCK = threading.Lock()
+
+
+def get_store():
+    """Process response store, or ``None`` when caching is off."""
+    global _STORE, _STORE_READY
+    if not _STORE_READY:
+        with _STORE_LOCK:
+            if not _STORE_READY:
+                _STORE = _build_store()
+                _STORE_READY = True
+    return _STORE
+
+
+def configure(store) -> None:
+    """Replace the process store (tests, tooling); ``None`` disables caching."""
+    global _STORE, _STORE_READY
+    with _STORE_LOCK:
+        _STORE, _STORE_READY = store, True
+
+
+def _scope(tenant_id: Optional[int]) -> str:
+    return "all" if tenant_id is None else str(tenant_id)
+
+
+def _tag_keys(tag: str, changed: Changed) -> List[str]:
+    if changed is ALL_TENANTS or None in changed:
+        return [tag]
+    keys = [f"{tag}:{tenant_id}" for tenant_id in changed]
+    keys.append(f"{tag}:all")
+    return keys
+
+
+def _bump_local(tag: str, changed: Changed) -> None:
+    store = get_store()
+    if store is not None and not store.shared:
+        store.bump(_tag_keys(tag, changed))
+
+
+_SUBSCRIBED: set = set()
+_SUBSCRIBED_LOCK = threading.Lock()
+
+
+def _subscribe(tag: str) -> None:
+    with _SUBSCRIBED_LOCK:
+        if tag in _SUBSCRIBED:
+            return
+        _SUBSCRIBED.add(tag)
+    cache_bus.subscribe(_BUS_PREFIX + tag, functools.partial(_bump_local, tag))
+
+
+def invalidate(tag: str, changed: Changed = ALL_TENANTS) -> None:
+    """Invalidate ``tag`` for the tenants in ``changed`` (every tenant by default)."""
+    store = get_store()
+    if store is None:
+        return
+    if store.shared:
+        try:
+            store.bump(_tag_keys(tag, changed))
+        except Exception:
+            logger.warning("Unable to invalidate response cache tag %s", tag, exc_info=True)
+        return
+    _subscribe(tag)
+    cache_bus.publish(_BUS_PREFIX + tag, changed)
+
+
+def invalidate_on_commit(model: Type, tag: str) -> None:
+    """Invalidate ``tag`` for the affected tenants whenever ``model`` rows are committed."""
+    _subscribe(tag)
+    on_commit(model, functools.partial(invalidate, tag))
+
+
+def _find_user(values: Iterable[Any]):
+    from app.models.user import User
+
+    return next((value for value in values if isinstance(value, User)), None)
+
+
+def _serialize(result: Any) -> bytes:
+    # Same encoding as FastAPI's JSONResponse.
+    return json.dumps(
+        jsonable_encoder(result), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _respond(request: Request, entry: CachedResponse, cache_status: str, name: str) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if request.headers.get("if-none-match") == entry.etag:
+        record_cache_event(name, "not_modified")
+        headers[CACHE_STATUS_HEADER] = cache_status
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    headers[CACHE_STATUS_HEADER] = cache_status
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def cached_response(*, tags: Sequence[str], ttl: float = DEFAULT_TTL, name: Optional[str] = None):
+    """Cache a JSON endpoint per tenant, role and query string.
+
+    Place it under the route decorator.  The endpoint must depend on the
+    current ``User``; a ``Request`` parameter is added when it has none.
+    """
+
+    tags = tuple(tags)
+    for tag in tags:
+        _subscribe(tag)
+
+    def decorate(func: Callable[..., Any]):
+        cache_name = f"response:{name or func.__name__}"
+        hints = _resolved_hints(func)
+        signature = inspect.signature(func)
+        parameters = [
+            param.replace(annotation=hints.get(param.name, param.annotation))
+            for param in signature.parameters.values()
+        ]
+        request_param = next((param.name for param in parameters if param.annotation is Request), None)
+        injected = request_param is None
+        if injected:
+            request_param = "_cache_request"
+            parameters.append(inspect.Parameter(request_param, inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+        is_async = inspect.iscoroutinefunction(func)
+
+        async def _call(kwargs: Dict[str, Any]) -> Any:
+            if is_async:
+                return await func(**kwargs)
+            return await run_in_threadpool(functools.partial(func, **kwargs))
+
+        @functools.wraps(func)
+        async def wrapper(**kwargs: Any) -> Any:
+            request: Request = kwargs.pop(request_param) if injected else kwargs[request_param]
+            store = get_store()
+            user = _find_user(kwargs.values())
+            if store is None or user is None:
+                return await _call(kwargs)
+
+            scope = _scope(user.tenant_id)
+            tag_keys = [key for tag in tags for key in (tag, f"{tag}:{scope}")]
+            try:
+                versions = await _store_call(store, store.versions, tag_keys)
+            except Exception:
+                logger.warning("Response cache unavailable; serving %s uncached", cache_name, exc_info=True)
+                return await _call(kwargs)
+            query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+            raw_key = "|".join(
+                [cache_name, scope, str(user.role or ""), request.url.path, query, ",".join(map(str, versions))]
+            )
+            key = hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+            try:
+                entry = await _store_call(store, store.get, key)
+            except Exception:
+                logger.debug("Response cache read failed for %s", cache_name, exc_info=True)
+                entry = None
+            if entry is not None:
+                record_cache_event(cache_name, "hit")
+                return _respond(request, entry, "HIT", cache_name)
+
+            record_cache_event(cache_name, "miss")
+            result = await _call(kwargs)
+            if isinstance(result, Response):
+                return result
+            entry = CachedResponse.from_body(_serialize(result))
+            try:
+                await _store_call(store, store.set, key, entry, ttl)
+            except Exception:
+                logger.debug("Response cache write failed for %s", cache_name, exc_info=True)
+            return _respond(request, entry, "MISS", cache_name)
+
+        wrapper.__signature__ = signature.replace(
+            parameters=parameters,
+            return_annotation=hints.get("return", signature.return_annotation),
+        )
+        return wrapper
+
+    return decorate
+
+
+async def _store_call(store, method, *args):
+    # Redis calls block; keep them off the event loop.
+    if store.shared:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+
+def _resolved_hints(func: Callable[..., Any]) -> Dict[str, Any]:
+    # FastAPI resolves string annotations against the wrapper's module, so
+    # hand it the endpoint's resolved types instead.
+    try:
+        return typing.get_type_hints(func)
+    except Exception:
+        return {}
@@ -1,40 +1,302 @@
 """
-Simple in-process TTL cache for small config/data lookups.
-NOT for large datasets or multi-instance coherence.
+In-process LRU + TTL cache for small config/data lookups.
+
+* O(1) LRU eviction and TTL expiry.  Expired entries are purged from the
+  write-order queue on every store, not only when they are read again.
+* Per-key single flight: concurrent misses for one key run the loader once,
+  and a slow load never blocks lookups of other keys.  Callers on an asyncio
+  event-loop thread (including ``AsyncSession.run_sync`` greenlets) never wait
+  on another caller's load: blocking the loop would stall the very I/O that
+  load is waiting for, so they run the loader themselves instead.
+* Optional stale-while-revalidate: for ``stale_seconds`` after expiry the old
+  value is served while one background thread reloads it.  Loaders used with
+  it must not capture request-scoped resources such as a ``Session``.
+* Namespaces (e.g. ``tenant:7``) group entries for one-call invalidation, and
+  caches register by name so writers can invalidate them without importing
+  the reader.
+
+NOT for large datasets; coherence across processes is handled by the
+invalidation hooks, not here.
 """
-import time
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
 import threading
-from typing import Any, Callable, Dict, Tuple
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from app.observability.metrics import record_cache_event, record_cache_size
+
+logger = logging.getLogger("tenantra.cache")
+
+
+@dataclass
+class _Entry:
+    value: Any
+    namespace: Hashable
+    fresh_until: float
+    stale_until: float
+
+
+class _Flight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
 
 class TTLCache:
-    def __init__(self, ttl_seconds: int = 60, maxsize: int = 1024):
-        self.ttl = ttl_seconds
+    def __init__(
+        self,
+        name: str = "default",
+        ttl_seconds: float = 60,
+        maxsize: int = 1024,
+        stale_seconds: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.ttl = float(ttl_seconds)
         self.maxsize = maxsize
-        self.lock = threading.Lock()
-        self.store: Dict[Any, Tuple[float, Any]] = {}
-
-    def get(self, key: Any, loader: Callable[[], Any]):
-        now = time.time()
-        with self.lock:
-            if key in self.store:
-                ts, val = self.store[key]
-                if now - ts < self.ttl:
-                    return val
+        self.stale = float(stale_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Access order for LRU eviction.
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        # Write order; with one TTL per cache this is also deadline order.
+        self._deadlines: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._namespaces: Dict[Hashable, Set[Hashable]] = {}
+        self._inflight: Dict[Hashable, _Flight] = {}
+        # Bumped by every invalidation so loads that started earlier are not stored.
+        self._generation = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any], namespace: Hashable = None) -> Any:
+        now = self._clock()
+        refresh: Optional[_Flight] = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry.fresh_until:
+                    self._entries.move_to_end(key)
+                    record_cache_event(self.name, "hit")
+                    return entry.value
+                if now < entry.stale_until:
+                    self._entries.move_to_end(key)
+                    if key not in self._inflight:
+                        refresh = self._inflight[key] = _Flight()
+                        generation = self._generation
+                    value = entry.value
                 else:
-                    del self.store[key]
-            val = loader()
-            if len(self.store) >= self.maxsize:
-                # FIFO-ish: pop an arbitrary item
-                self.store.pop(next(iter(self.store)))
-            self.store[key] = (now, val)
-            return val
+                    self._drop(key)
+                    record_cache_event(self.name, "expired")
+                    entry = None
+            if entry is None:
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = _Flight()
+                    generation = self._generation
+        if entry is not None:
+            record_cache_event(self.name, "stale")
+            if refresh is not None:
+                self._refresh_in_background(key, loader, namespace, refresh, generation)
+            return value
+        if not leader:
+            if _on_event_loop_thread():
+                record_cache_event(self.name, "miss")
+                return self._load(key, loader, namespace, None, None)
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        record_cache_event(self.name, "miss")
+        return self._load(key, loader, namespace, flight, generation)
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Fresh cached value for ``key`` without loading or touching LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._clock() >= entry.fresh_until:
+                return default
+            return entry.value
+
+    @property
+    def generation(self) -> int:
+        """Invalidation counter; pass it to :meth:`set` for values loaded outside :meth:`get`."""
+        return self._generation
+
+    def set(self, key: Hashable, value: Any, namespace: Hashable = None, generation: Optional[int] = None) -> None:
+        """Store ``value``; skipped when ``generation`` is given and an invalidation has happened since."""
+        with self._lock:
+            if generation is None or generation == self._generation:
+                self._store(key, value, namespace)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._drop(key)
+            self._report_size()
+
+    def invalidate_namespace(self, *namespaces: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            for namespace in namespaces:
+                for key in list(self._namespaces.get(namespace, ())):
+                    self._drop(key)
+            self._report_size()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._deadlines.clear()
+            self._namespaces.clear()
+            self._report_size()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self, key, loader, namespace, flight: Optional[_Flight], generation: Optional[int]) -> Any:
+        # Without a flight (event-loop callers bypassing one in progress) the
+        # value is returned but left for the flight leader to store.
+        try:
+            value = loader()
+        except BaseException as exc:
+            if flight is not None:
+                flight.error = exc
+            record_cache_event(self.name, "load_error")
+            raise
+        else:
+            if flight is not None:
+                flight.value = value
+                with self._lock:
+                    if generation == self._generation:
+                        self._store(key, value, namespace)
+            return value
+        finally:
+            if flight is not None:
+                with self._lock:
+                    if self._inflight.get(key) is flight:
+                        del self._inflight[key]
+                flight.event.set()
+
+    def _refresh_in_background(self, key, loader, namespace, flight: _Flight, generation: int) -> None:
+        def _run() -> None:
+            try:
+                self._load(key, loader, namespace, flight, generation)
+            except Exception:
+                logger.warning("Background refresh of %s[%r] failed; serving stale value", self.name, key, exc_info=True)
+
+        threading.Thread(target=_run, name=f"cache-refresh-{self.name}", daemon=True).start()
+
+    # The helpers below expect self._lock to be held.
+
+    def _store(self, key, value, namespace) -> None:
+        now = self._clock()
+        self._drop(key)
+        fresh_until = now + self.ttl
+        entry = _Entry(value=value, namespace=namespace, fresh_until=fresh_until, stale_until=fresh_until + self.stale)
+        self._entries[key] = entry
+        self._deadlines[key] = entry.stale_until
+        self._namespaces.setdefault(namespace, set()).add(key)
+        expired = 0
+        while self._deadlines:
+            oldest, deadline = next(iter(self._deadlines.items()))
+            if deadline > now:
+                break
+            self._drop(oldest)
+            expired += 1
+        if expired:
+            record_cache_event(self.name, "expired", expired)
+        evicted = 0
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            evicted += 1
+        if evicted:
+            record_cache_event(self.name, "eviction", evicted)
+        self._report_size()
+
+    def _drop(self, key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._deadlines.pop(key, None)
+        keys = self._namespaces.get(entry.namespace)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._namespaces[entry.namespace]
+
+    def _report_size(self) -> None:
+        record_cache_size(self.name, len(self._entries))
+
+
+def _on_event_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+_CACHES: Dict[str, TTLCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_cache(name: str, **options: Any) -> TTLCache:
+    """Named process-wide cache; ``options`` apply only on first creation."""
+    cache = _CACHES.get(name)
+    if cache is None:
+        with _CACHES_LOCK:
+            cache = _CACHES.get(name)
+            if cache is None:
+                cache = _CACHES[name] = TTLCache(name=name, **options)
+    return cache
+
+
+def invalidate_cache(name: str, *namespaces: Hashable) -> None:
+    """Drop ``namespaces`` from cache ``name`` (everything when none are given)."""
+    cache = _CACHES.get(name)
+    if cache is None:
+        return
+    if namespaces:
+        cache.invalidate_namespace(*namespaces)
+    else:
+        cache.clear()
+
+
+def _default_key(args: tuple, kwargs: dict) -> Hashable:
+    from sqlalchemy.orm import Session
+
+    # Sessions (and other per-request handles) are not part of the identity.
+    return (
+        tuple(arg for arg in args if not isinstance(arg, Session)),
+        tuple(sorted((k, v) for k, v in kwargs.items() if not isinstance(v, Session))),
+    )
+
 
 # Decorator
-def ttl_cache(ttl_seconds: int = 60):
+def ttl_cache(
+    ttl_seconds: float = 60,
+    maxsize: int = 1024,
+    name: Optional[str] = None,
+    key: Optional[Callable[..., Hashable]] = None,
+):
     def _wrap(func):
-        cache = TTLCache(ttl_seconds=ttl_seconds)
+        cache = get_cache(name or f"{func.__module__}.{func.__qualname__}", ttl_seconds=ttl_seconds, maxsize=maxsize)
+
+        @functools.wraps(func)
         def _inner(*args, **kwargs):
-            key = (args, tuple(sorted(kwargs.items())))
-            return cache.get(key, lambda: func(*args, **kwargs))
+            cache_key = key(*args, **kwargs) if key else _default_key(args, kwargs)
+            return cache.get(cache_key, lambda: func(*args, **kwargs))
+
+        _inner.cache = cache
         return _inner
+
     return _wrap
@@ -4,9 +4,15 @@ from __future__ import annotations
 
 import os
 
-from celery import Celery
+# Label this process for the shared DB engine (application_name, pool
+# settings and metrics) before any task module imports app.database.
+os.environ.setdefault("TENANTRA_PROCESS_ROLE", "worker")
+
+from celery import Celery, signals
 from celery.schedules import schedule
 
+from app.observability import celery_metrics
+
 
 def _create_celery() -> Celery:
     broker_url = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
@@ -18,6 +24,7 @@ def _create_celery() -> Celery:
         include=[
             "app.tasks.notifications",
             "app.tasks.scheduler",
+            "app.tasks.compliance",
         ],
     )
     default_queue = os.getenv("CELERY_DEFAULT_QUEUE", "tenantra")
@@ -26,6 +33,7 @@ def _create_celery() -> Celery:
 
     notif_interval = float(os.getenv("TENANTRA_NOTIFICATIONS_INTERVAL", "10"))
     sched_interval = float(os.getenv("TENANTRA_SCHEDULER_INTERVAL", "30"))
+    rollup_interval = float(os.getenv("TENANTRA_COMPLIANCE_ROLLUP_REPAIR_INTERVAL", "3600"))
     app.conf.beat_schedule = {
         "dispatch-notifications": {
             "task": "tenantra.notifications.dispatch",
@@ -35,8 +43,28 @@ def _create_celery() -> Celery:
             "task": "tenantra.scheduler.tick",
             "schedule": schedule(sched_interval),
         },
+        "repair-compliance-rollups": {
+            "task": "tenantra.compliance.repair_rollups",
+            "schedule": schedule(rollup_interval),
+        },
     }
     return app
 
 
 celery_app = _create_celery()
+celery_metrics.install()
+
+
+@signals.worker_process_init.connect(weak=False)
+def _start_cache_bus(**_kwargs) -> None:
+    # Listener threads do not survive the prefork, so start one per child.
+    from app.cache import bus as cache_bus
+
+    cache_bus.start()
+
+
+@signals.worker_process_shutdown.connect(weak=False)
+def _stop_cache_bus(**_kwargs) -> None:
+    from app.cache import bus as cache_bus
+
+    cache_bus.stop()
@@ -5,12 +5,14 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core import security as security_utils
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.middleware.context import get_request_context
 from app.models.user import User
 from app.services import token_blocklist
 
@@ -66,13 +68,33 @@ def _resolve_user_from_token(token: str, db: Session) -> User:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
     return user
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    return _resolve_user_from_token(token, db)
+def _remember_tenant(request: Request, user: User) -> User:
+    # Per-tenant request metrics label by this, not by client-sent headers.
+    if user.tenant_id is not None:
+        get_request_context(request.scope).tenant_id = str(user.tenant_id)
+    return user
+
+
+def get_current_user(
+    request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> User:
+    return _remember_tenant(request, _resolve_user_from_token(token, db))
+
+
+async def get_current_user_async(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """``get_current_user`` for routes that take an ``AsyncSession``."""
+    user = await db.run_sync(lambda session: _resolve_user_from_token(token, session))
+    return _remember_tenant(request, user)
 
 _DEF_ADMIN_ROLES = {"admin", "administrator", "super_admin", "system_admin"}
 _SETTINGS_READ_ROLES = _DEF_ADMIN_ROLES | {"auditor", "audit", "read_only_admin", "msp_admin"}
 
 def get_admin_user(
+    request: Request,
     db: Session = Depends(get_db),
     authorization: str = Header(..., alias="Authorization"),
 ) -> User:
@@ -80,7 +102,7 @@ def get_admin_user(
     if scheme.lower() != "bearer" or not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
 
-    user = _resolve_user_from_token(token, db)
+    user = _remember_tenant(request, _resolve_user_from_token(token, db))
     role = (getattr(user, "role", "") or "").strip().lower()
     if role not in _DEF_ADMIN_ROLES:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
@@ -88,6 +110,7 @@ def get_admin_user(
 
 
 def get_settings_user(
+    request: Request,
     db: Session = Depends(get_db),
     authorization: str = Header(..., alias="Authorization"),
 ) -> User:
@@ -95,7 +118,7 @@ def get_settings_user(
     if scheme.lower() != "bearer" or not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
 
-    user = _resolve_user_from_token(token, db)
+    user = _remember_tenant(request, _resolve_user_from_token(token, db))
     role = (getattr(user, "role", "") or "").strip().lower()
     if role not in _SETTINGS_READ_ROLES:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Settings permission required")
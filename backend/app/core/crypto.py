@@ -1,6 +1,7 @@
 import base64
 import hashlib
 import os
+from typing import Callable
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
@@ -14,13 +15,21 @@ def encrypt_data(raw: str, key: bytes) -> str:
     return base64.b64encode(nonce + ct).decode("utf-8")
 
 
+def aes_decryptor(key: bytes) -> Callable[[str], str]:
+    """``decrypt_data`` bound to ``key``: derive the key and build the cipher once for bulk reads."""
+    aesgcm = AESGCM(hashlib.sha256(key).digest())
+
+    def _decrypt(enc: str) -> str:
+        try:
+            data = base64.b64decode(enc)
+            nonce, ct = data[:12], data[12:]
+            pt = aesgcm.decrypt(nonce, ct, associated_data=None)
+            return pt.decode("utf-8")
+        except Exception as exc:  # pragma: no cover - defensive path
+            raise ValueError("Failed to decrypt payload") from exc
+
+    return _decrypt
+
+
 def decrypt_data(enc: str, key: bytes) -> str:
-    try:
-        data = base64.b64decode(enc)
-        nonce, ct = data[:12], data[12:]
-        k = hashlib.sha256(key).digest()
-        aesgcm = AESGCM(k)
-        pt = aesgcm.decrypt(nonce, ct, associated_data=None)
-        return pt.decode("utf-8")
-    except Exception as exc:  # pragma: no cover - defensive path
-        raise ValueError("Failed to decrypt payload") from exc
+    return aes_decryptor(key)(enc)
@@ -18,11 +18,12 @@ cleanly closed after use.
 
 import os
 import sys
+import threading
 from pathlib import Path
 from urllib.parse import urlparse, urlunparse, quote
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 from sqlalchemy.orm import sessionmaker
 
 # Retrieve individual connection details or a complete URL from the
@@ -128,18 +129,52 @@ try:
 except Exception:
     pass
 
-# Create the SQLAlchemy engine and session factory.  The ``autocommit`` and
-# ``autoflush`` flags are kept consistent with the original code.
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False, "timeout": 30}
-    # Use StaticPool for both file and in-memory SQLite during tests to avoid locking
-    engine: Engine = create_engine(
-        DATABASE_URL,
-        connect_args=connect_args,
-        poolclass=StaticPool,
-    )
-else:
-    engine = create_engine(DATABASE_URL)
+# Process role ("api", "worker", "beat", "script", ...) used for the
+# Postgres application_name, per-role pool overrides and pool metric labels.
+PROCESS_ROLE = os.getenv("TENANTRA_PROCESS_ROLE", "api").strip().lower() or "api"
+
+
+def _pool_setting(name: str, default: str) -> str:
+    """Read ``<name>_<ROLE>`` first (e.g. TENANTRA_DB_POOL_SIZE_WORKER), then ``<name>``."""
+    return os.getenv(f"{name}_{PROCESS_ROLE.upper()}", os.getenv(name, default))
+
+
+def _pool_options(role: str) -> dict:
+    connect_args = {"application_name": os.getenv("TENANTRA_DB_APPLICATION_NAME", f"tenantra-{role}")}
+    statement_timeout = int(_pool_setting("TENANTRA_DB_STATEMENT_TIMEOUT_MS", "0"))
+    if statement_timeout > 0:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+    return {
+        "pool_size": int(_pool_setting("TENANTRA_DB_POOL_SIZE", "5")),
+        "max_overflow": int(_pool_setting("TENANTRA_DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(_pool_setting("TENANTRA_DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(_pool_setting("TENANTRA_DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _pool_setting("TENANTRA_DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes", "on"),
+        "connect_args": connect_args,
+    }
+
+
+def create_app_engine(url: str, role: str = PROCESS_ROLE) -> Engine:
+    """Build the process-wide engine; every session factory binds to this.
+
+    Pool knobs (all overridable per role with a ``_<ROLE>`` suffix):
+    TENANTRA_DB_POOL_SIZE, TENANTRA_DB_MAX_OVERFLOW, TENANTRA_DB_POOL_TIMEOUT,
+    TENANTRA_DB_POOL_RECYCLE, TENANTRA_DB_POOL_PRE_PING and
+    TENANTRA_DB_STATEMENT_TIMEOUT_MS (0 disables).
+    """
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False, "timeout": 30}
+        # Use StaticPool for both file and in-memory SQLite during tests to avoid locking
+        return create_engine(url, connect_args=connect_args, poolclass=StaticPool)
+
+    from app.observability.db_pool import TimedQueuePool, instrument_engine
+
+    built = create_engine(url, poolclass=TimedQueuePool, **_pool_options(role))
+    instrument_engine(built, role)
+    return built
+
+
+engine: Engine = create_app_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Register PostgreSQL type fallbacks (e.g., JSONB -> JSON under SQLite)
@@ -164,3 +199,86 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ---------------------------------------------------------------------------
+# Async engine for high fan-in endpoints (agent ingest, config long-poll,
+# trend reads).  These routes run on the event loop instead of the shared
+# threadpool; they reuse the sync ORM helpers through AsyncSession.run_sync.
+# The engine is built on first use so processes that never serve async
+# routes (workers, scripts) do not need the async driver.
+# ---------------------------------------------------------------------------
+
+_ASYNC_ENGINE = None
+_ASYNC_SESSIONMAKER = None
+_ASYNC_LOCK = threading.Lock()
+
+
+def async_database_url(url: str) -> str:
+    """Map the sync DSN onto its async driver (psycopg3 async / aiosqlite)."""
+    if url.startswith("sqlite+aiosqlite") or url.startswith("postgresql+psycopg"):
+        return url
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + url[len(url.split(":", 1)[0]):]
+    if url.startswith("postgresql"):
+        return "postgresql+psycopg" + url[len(url.split(":", 1)[0]):]
+    return url
+
+
+def create_async_app_engine(url: str, role: str = PROCESS_ROLE):
+    """Async counterpart of :func:`create_app_engine` using the same pool knobs.
+
+    SQLite uses NullPool: aiosqlite connections are bound to the event loop
+    that opened them, and the test client runs each request on its own loop.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_database_url(url)
+    if url.startswith("sqlite"):
+        return create_async_engine(url, connect_args={"timeout": 30}, poolclass=NullPool)
+
+    from app.observability.db_pool import TimedAsyncQueuePool, instrument_engine
+
+    built = create_async_engine(url, poolclass=TimedAsyncQueuePool, **_pool_options(role))
+    instrument_engine(built.sync_engine, f"{role}-async")
+    return built
+
+
+def get_async_engine():
+    global _ASYNC_ENGINE, _ASYNC_SESSIONMAKER
+    if _ASYNC_ENGINE is None:
+        with _ASYNC_LOCK:
+            if _ASYNC_ENGINE is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker
+
+                _ASYNC_ENGINE = create_async_app_engine(DATABASE_URL)
+                # expire_on_commit=False: response models are serialised after
+                # the session work, outside the greenlet that could reload them.
+                _ASYNC_SESSIONMAKER = async_sessionmaker(
+                    _ASYNC_ENGINE, autoflush=False, expire_on_commit=False
+                )
+    return _ASYNC_ENGINE
+
+
+def get_async_sessionmaker():
+    """``async_sessionmaker`` bound to the process-wide async engine."""
+    get_async_engine()
+    return _ASYNC_SESSIONMAKER
+
+
+async def get_async_db():
+    """Async twin of :func:`get_db` yielding an ``AsyncSession``."""
+    db = get_async_sessionmaker()()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (shutdown hook, tests)."""
+    global _ASYNC_ENGINE, _ASYNC_SESSIONMAKER
+    with _ASYNC_LOCK:
+        built, _ASYNC_ENGINE, _ASYNC_SESSIONMAKER = _ASYNC_ENGINE, None, None
+    if built is not None:
+        await built.dispose()
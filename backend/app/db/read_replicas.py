@@ -0,0 +1,219 @@
+"""Read-replica session routing for listing and export endpoints.
+
+Routes opt in by depending on :func:`get_read_db` (or
+:func:`get_async_read_db`) instead of ``get_db``.  Those sessions go to one of
+the replicas in ``TENANTRA_DB_REPLICA_URLS`` (comma separated) as long as its
+replication lag is within ``TENANTRA_DB_REPLICA_MAX_LAG_SECONDS``; otherwise,
+or when no replica is configured or reachable, they fall back to the primary.
+
+Lag is probed at most every ``TENANTRA_DB_REPLICA_CHECK_SECONDS`` per replica
+and cached, so routing costs nothing on most requests.  Writes, auth lookups,
+anything that must read its own writes and response-cached endpoints (a
+stale replica read would be cached under the new tag version) stay on
+``get_db``.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.database import PROCESS_ROLE, SessionLocal, create_app_engine, get_async_sessionmaker
+
+logger = logging.getLogger("tenantra.read_replicas")
+
+MAX_LAG_SECONDS = float(os.getenv("TENANTRA_DB_REPLICA_MAX_LAG_SECONDS", "10"))
+CHECK_SECONDS = float(os.getenv("TENANTRA_DB_REPLICA_CHECK_SECONDS", "5"))
+
+# Zero while the standby has replayed everything it received, so an idle
+# primary does not read as a lagging replica.
+_PG_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+LagProbe = Callable[[Engine], float]
+
+
+def probe_lag(engine: Engine) -> float:
+    """Replication lag in seconds (SQLite stand-ins report no lag)."""
+    if engine.dialect.name != "postgresql":
+        return 0.0
+    with engine.connect() as conn:
+        return float(conn.execute(_PG_LAG_SQL).scalar() or 0.0)
+
+
+@dataclass
+class Replica:
+    url: str
+    engine: Engine
+    sessionmaker: sessionmaker
+    role: str
+    lag: Optional[float] = None  # None until probed, or while unreachable
+    checked_at: float = float("-inf")
+    _async_sessionmaker: object = field(default=None, repr=False)
+    _probe_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def async_sessionmaker(self):
+        if self._async_sessionmaker is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker
+
+            from app.database import create_async_app_engine
+
+            self._async_sessionmaker = async_sessionmaker(
+                create_async_app_engine(self.url, self.role), autoflush=False, expire_on_commit=False
+            )
+        return self._async_sessionmaker
+
+
+class ReplicaRouter:
+    """Pick a replica whose cached lag is within bounds, else the primary."""
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        *,
+        max_lag: float = MAX_LAG_SECONDS,
+        check_interval: float = CHECK_SECONDS,
+        lag_probe: LagProbe = probe_lag,
+    ) -> None:
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._probe = lag_probe
+        self.replicas: List[Replica] = []
+        for index, url in enumerate(urls):
+            role = f"{PROCESS_ROLE}-replica{index}"
+            engine = create_app_engine(url, role)
+            self.replicas.append(
+                Replica(
+                    url=url,
+                    engine=engine,
+                    sessionmaker=sessionmaker(autocommit=False, autoflush=False, bind=engine),
+                    role=role,
+                )
+            )
+        self._cursor = itertools.count()
+
+    def probe_due(self) -> bool:
+        now = time.monotonic()
+        return any(now - replica.checked_at >= self.check_interval for replica in self.replicas)
+
+    def _refresh(self, replica: Replica) -> None:
+        if time.monotonic() - replica.checked_at < self.check_interval:
+            return
+        # One prober per replica; concurrent callers use the last reading.
+        if not replica._probe_lock.acquire(blocking=False):
+            return
+        try:
+            try:
+                replica.lag = self._probe(replica.engine)
+            except Exception:
+                logger.warning("Replica %s lag probe failed; routing reads to primary", replica.role, exc_info=True)
+                replica.lag = None
+            replica.checked_at = time.monotonic()
+        finally:
+            replica._probe_lock.release()
+
+    def pick(self) -> Optional[Replica]:
+        """Next in-bounds replica (round robin), or ``None`` for the primary."""
+        if not self.replicas:
+            return None
+        start = next(self._cursor)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            self._refresh(replica)
+            if replica.lag is not None and replica.lag <= self.max_lag:
+                _record_route(replica.role)
+                return replica
+        _record_route("primary")
+        return None
+
+    def dispose(self) -> None:
+        # Async replica engines are left to the garbage collector; their
+        # dispose() needs a running loop.
+        for replica in self.replicas:
+            replica.engine.dispose()
+
+
+def _record_route(target: str) -> None:
+    from app.observability.db_pool import DB_READ_ROUTES
+
+    DB_READ_ROUTES.labels(target=target).inc()
+
+
+def _split(raw: str) -> List[str]:
+    return [item.strip() for item in raw.split(",") if item.strip()]
+
+
+_ROUTER: Optional[ReplicaRouter] = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_replica_router() -> ReplicaRouter:
+    global _ROUTER
+    if _ROUTER is None:
+        with _ROUTER_LOCK:
+            if _ROUTER is None:
+                _ROUTER = ReplicaRouter(_split(os.getenv("TENANTRA_DB_REPLICA_URLS", "")))
+    return _ROUTER
+
+
+def configure(urls: Sequence[str], **kwargs) -> ReplicaRouter:
+    """Replace the process router (tests, admin tooling)."""
+    global _ROUTER
+    router = ReplicaRouter(urls, **kwargs)
+    with _ROUTER_LOCK:
+        previous, _ROUTER = _ROUTER, router
+    if previous is not None:
+        previous.dispose()
+    return router
+
+
+def reset() -> None:
+    """Drop the router so the next call re-reads the environment."""
+    global _ROUTER
+    with _ROUTER_LOCK:
+        previous, _ROUTER = _ROUTER, None
+    if previous is not None:
+        previous.dispose()
+
+
+@contextmanager
+def read_session() -> Iterator[Session]:
+    """Read-only session outside request dependencies (streamed response bodies, jobs)."""
+    replica = get_replica_router().pick()
+    db = replica.sessionmaker() if replica is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db():
+    """Yield a read-only session: a fresh-enough replica or the primary."""
+    with read_session() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Async twin of :func:`get_read_db`; lag probes run off the event loop."""
+    router = get_replica_router()
+    replica = await run_in_threadpool(router.pick) if router.probe_due() else router.pick()
+    factory = replica.async_sessionmaker() if replica is not None else get_async_sessionmaker()
+    db = factory()
+    try:
+        yield db
+    finally:
+        await db.close()
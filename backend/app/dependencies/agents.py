@@ -1,10 +1,59 @@
 from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+import hashlib
+import os
 import secrets
 
+from app.cache.bus import broadcast_on_commit
+from app.cache.invalidation import tenant_evictor, tenant_namespace
+from app.cache.ttl import get_cache
 from app.database import get_db
 from app.models.agent import Agent
 from app.core.security import verify_password
+from app.services.agent_heartbeats import record_heartbeat
+
+# Successful bcrypt checks are remembered briefly so polling agents (config
+# long-polls, 304s) skip the hash.  Entries hold the stored hash they were
+# checked against, so a rotated token never matches a stale entry; Agent
+# commits also evict the tenant's entries in every process.
+AGENT_TOKEN_CACHE_TTL = float(os.getenv("TENANTRA_AGENT_TOKEN_CACHE_TTL", "60"))
+
+_VERIFIED_TOKENS = get_cache("agent_tokens", ttl_seconds=AGENT_TOKEN_CACHE_TTL, maxsize=50000)
+
+
+def _token_matches(stored: str, agent_token: str) -> bool:
+    if stored.startswith("$2"):
+        try:
+            return verify_password(agent_token, stored)
+        except Exception:
+            return False
+    return secrets.compare_digest(stored, agent_token)
+
+
+def _verified_key(agent_id: int, agent_token: str) -> tuple:
+    return agent_id, hashlib.sha256(agent_token.encode("utf-8")).hexdigest()
+
+
+def _recently_verified(agent: Agent, stored: str, agent_token: str) -> bool:
+    return bool(stored) and _VERIFIED_TOKENS.peek(_verified_key(agent.id, agent_token)) == stored
+
+
+def _remember_verified(agent: Agent, stored: str, agent_token: str) -> None:
+    if stored.startswith("$2"):
+        _VERIFIED_TOKENS.set(_verified_key(agent.id, agent_token), stored, namespace=tenant_namespace(agent.tenant_id))
+
+
+def _admit_agent(agent: Agent, valid: bool) -> Agent:
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid agent token")
+
+    if not getattr(agent, "is_active", True):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Agent inactive")
+    record_heartbeat(agent.id, agent.tenant_id)
+    return agent
+
 
 def verify_agent_token(
     agent_id: int,
@@ -14,23 +63,34 @@ def verify_agent_token(
     agent = db.query(Agent).filter(Agent.id == agent_id).first()
     if not agent:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found")
-    
     stored = agent.token or ""
-    valid = False
-    if stored.startswith("$2"):
-        try:
-            valid = verify_password(agent_token, stored)
-        except Exception:
-            valid = False
-    else:
-        valid = secrets.compare_digest(stored, agent_token)
-
+    valid = _recently_verified(agent, stored, agent_token)
     if not valid:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid agent token")
+        valid = _token_matches(stored, agent_token)
+        if valid:
+            _remember_verified(agent, stored, agent_token)
+    return _admit_agent(agent, valid)
 
-    if not getattr(agent, "is_active", True):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Agent inactive")
-    return agent
+
+async def verify_agent_token_async(
+    agent_id: int,
+    agent_token: str,
+    db: AsyncSession,
+) -> Agent:
+    """``verify_agent_token`` for async routes; bcrypt runs off the event loop."""
+    agent = await db.get(Agent, agent_id)
+    if not agent:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found")
+    stored = agent.token or ""
+    valid = _recently_verified(agent, stored, agent_token)
+    if not valid:
+        if stored.startswith("$2"):
+            valid = await run_in_threadpool(_token_matches, stored, agent_token)
+        else:
+            valid = _token_matches(stored, agent_token)
+        if valid:
+            _remember_verified(agent, stored, agent_token)
+    return _admit_agent(agent, valid)
 
 
 def get_current_agent(
@@ -39,3 +99,6 @@ def get_current_agent(
     db: Session = Depends(get_db),
 ) -> Agent:
     return verify_agent_token(agent_id, agent_token, db)
+
+
+broadcast_on_commit(Agent, "agent_tokens", tenant_evictor(_VERIFIED_TOKENS, global_fans_out=False))
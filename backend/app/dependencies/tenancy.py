@@ -10,11 +10,15 @@ from app.core.auth import get_current_user
 from app.models.user import User
 
 
-def tenant_scope_dependency():
+_ADMIN_ROLES = {"admin", "administrator", "super_admin", "system_admin", "msp_admin"}
+
+
+def tenant_scope_dependency(*, require_admin: bool = False):
     """FastAPI dependency factory to resolve the effective tenant scope.
 
     Tenant users are forced to operate within their tenant. MSP/global users
     (tenant_id is None) must provide the explicit tenant_id query parameter.
+    With ``require_admin`` non-admin users are rejected with 403.
     """
 
     def _resolver(
@@ -24,6 +28,8 @@ def tenant_scope_dependency():
         ),
         current_user: User = Depends(get_current_user),
     ) -> int:
+        if require_admin and (getattr(current_user, "role", "") or "").strip().lower() not in _ADMIN_ROLES:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
         user_tenant = getattr(current_user, "tenant_id", None)
         if user_tenant is None:
             if tenant_id is None:
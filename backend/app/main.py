@@ -34,7 +34,7 @@ from app.middleware.request_logging import RequestLoggingMiddleware  # type: ign
 from app.middleware.security_headers import SecurityHeadersMiddleware  # type: ignore
 from app.middleware.dynamic_cors import DynamicCORSMiddleware  # type: ignore
 from app.middleware.rate_limit import RateLimitMiddleware  # type: ignore
-from app.observability.metrics import request_metrics_middleware  # type: ignore
+from app.observability.metrics import RequestMetricsMiddleware  # type: ignore
 
 # Ensure all SQLAlchemy models are registered at import time so that string-based
 # relationship() declarations resolve properly during mapper configuration.
@@ -82,7 +82,8 @@ def create_app() -> FastAPI:
     _init_logging()
     app = FastAPI(title="Tenantra Backend", version=os.getenv("APP_VERSION", "1.0"))
 
-    # Middlewares
+    # Middlewares (pure ASGI; the last one added runs first and creates the
+    # shared per-request context the inner layers reuse)
     app.add_middleware(CorrelationIdMiddleware)
     app.add_middleware(RequestLoggingMiddleware)
     app.add_middleware(SecurityHeadersMiddleware)
@@ -90,7 +91,7 @@ def create_app() -> FastAPI:
     app.add_middleware(RateLimitMiddleware)
 
     # Metrics
-    app.middleware("http")(request_metrics_middleware())
+    app.add_middleware(RequestMetricsMiddleware)
 
     def _include_if_exists(module_path: str, prefix: str) -> None:
         """Import `<module_path>.router` if present and include it with `prefix`."""
@@ -120,6 +121,7 @@ def create_app() -> FastAPI:
         "app.routes.integrity",
         "app.routes.compliance",
         "app.routes.compliance_export",
+        "app.routes.compliance_matrix",
         "app.routes.export",
         "app.routes.assets",
         "app.routes.visibility",
@@ -171,8 +173,27 @@ def create_app() -> FastAPI:
     @app.on_event("startup")
     def _startup_tasks() -> None:
         """Bootstrap seed data and optional module import at startup."""
+        from app.cache import bus as cache_bus
+        from app.services import cors_policy
+
         bootstrap_test_data()
         _maybe_import_modules()
+        cors_policy.get_policy_service().refresh()
+        cache_bus.start()
+
+    @app.on_event("shutdown")
+    async def _shutdown_tasks() -> None:
+        """Flush buffered agent logs and heartbeats before the worker exits."""
+        from app.cache import bus as cache_bus
+        from app.database import dispose_async_engine
+        from app.observability.metrics import mark_process_dead
+        from app.services import agent_heartbeats, agent_log_ingest
+
+        agent_log_ingest.shutdown()
+        agent_heartbeats.shutdown()
+        cache_bus.stop()
+        mark_process_dead()
+        await dispose_async_engine()
 
     def custom_openapi():
         if app.openapi_schema:
@@ -1,20 +1,32 @@
 import logging
-import time
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.context import get_request_context
 
 access_log = logging.getLogger("tenantra.access")
 
-class AccessLogMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        t0 = time.perf_counter()
-        ip = request.headers.get("x-forwarded-for", request.client.host if request.client else "-")
-        ua = request.headers.get("user-agent", "-")
-        method = request.method
-        path = request.url.path
-        response = await call_next(request)
-        dt_ms = int((time.perf_counter() - t0) * 1000)
-        clen = response.headers.get("content-length", "-")
-        access_log.info('%s - - "%s %s" %s %s "%s" %dms',
-                        ip, method, path, response.status_code, clen, ua, dt_ms)
-        return response
+class AccessLogMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        ctx = get_request_context(scope)
+        ip = ctx.headers.get("x-forwarded-for", ctx.client_host or "-")
+        ua = ctx.headers.get("user-agent", "-")
+
+        async def send_logged(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                clen = "-"
+                for key, value in message.get("headers", []):
+                    if key == b"content-length":
+                        clen = value.decode("latin-1")
+                        break
+                dt_ms = int(ctx.elapsed * 1000)
+                access_log.info('%s - - "%s %s" %s %s "%s" %dms',
+                                ip, ctx.method, ctx.path, message["status"], clen, ua, dt_ms)
+            await send(message)
+
+        await self.app(scope, receive, send_logged)
@@ -0,0 +1,80 @@
+"""Per-request context shared by the pure-ASGI middleware stack.
+
+The outermost middleware creates one :class:`RequestContext` per HTTP request
+and stores it in the ASGI scope; every other layer reuses it instead of
+re-parsing headers, regenerating request ids or decoding the bearer token.
+Handlers can still read ``request.state.request_id`` as before.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+SCOPE_KEY = "tenantra.request_context"
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_UNSET: Any = object()
+
+
+@dataclass
+class RequestContext:
+    request_id: str
+    method: str
+    path: str
+    scheme: str
+    headers: Headers
+    client_host: Optional[str]
+    started: float = field(default_factory=time.perf_counter)
+    status: Optional[int] = None
+    # Tenant of the authenticated user; set by the auth dependencies once the
+    # token has been resolved to a user, never taken from request headers.
+    tenant_id: Optional[str] = None
+    extras: Dict[str, Any] = field(default_factory=dict)
+    _user_id: Any = field(default=_UNSET, repr=False)
+
+    @property
+    def user_id(self) -> Optional[str]:
+        """Subject of the bearer token, decoded at most once per request."""
+        if self._user_id is _UNSET:
+            self._user_id = None
+            auth = self.headers.get("authorization", "")
+            if auth.lower().startswith("bearer "):
+                try:
+                    from app.core.security import decode_access_token
+
+                    payload = decode_access_token(auth.split(" ", 1)[1])
+                    if payload and "sub" in payload:
+                        self._user_id = payload["sub"]
+                except Exception:
+                    pass
+        return self._user_id
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+def get_request_context(scope: Scope) -> RequestContext:
+    """Return the context for ``scope``, creating it on first access."""
+    ctx = scope.get(SCOPE_KEY)
+    if ctx is None:
+        headers = Headers(scope=scope)
+        client = scope.get("client")
+        ctx = RequestContext(
+            request_id=headers.get(REQUEST_ID_HEADER) or str(uuid.uuid4()),
+            method=scope.get("method", "GET").upper(),
+            path=scope.get("path", ""),
+            scheme=scope.get("scheme", "http"),
+            headers=headers,
+            client_host=client[0] if client else None,
+        )
+        scope[SCOPE_KEY] = ctx
+        # Keep ``request.state.request_id`` available to route handlers.
+        scope.setdefault("state", {})["request_id"] = ctx.request_id
+    return ctx
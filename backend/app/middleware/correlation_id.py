@@ -1,14 +1,27 @@
-import uuid
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
-
-HEADER = "X-Request-ID"
-
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        rid = request.headers.get(HEADER) or str(uuid.uuid4())
-        # make request id available to handlers via state
-        request.state.request_id = rid
-        response = await call_next(request)
-        response.headers.setdefault(HEADER, rid)
-        return response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.context import REQUEST_ID_HEADER, get_request_context
+
+HEADER = REQUEST_ID_HEADER
+
+class CorrelationIdMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # The shared context reuses an incoming X-Request-ID or mints one and
+        # exposes it to handlers via request.state.request_id.
+        rid = get_request_context(scope).request_id
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if HEADER not in headers:
+                    headers.append(HEADER, rid)
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
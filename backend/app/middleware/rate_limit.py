@@ -1,58 +1,65 @@
-import time
-import threading
-from collections import defaultdict, deque
-from typing import Deque, Dict, Tuple, Optional, Callable
-from starlette.middleware.base import BaseHTTPMiddleware
+from dataclasses import dataclass
+from typing import Dict, Tuple, Optional, Callable
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
 from starlette.responses import JSONResponse
-from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import os
 
+from app.middleware.context import RequestContext, get_request_context
+from app.middleware.route_matcher import RouteMatcher, split_method
+from app.services.rate_limiter import RateLimitDecision, get_rate_limiter
+
 class RateLimiter:
-    def __init__(self, limit: int, window_sec: int):
+    """A limit/window pair bound to one namespace of the shared rate-limit service."""
+
+    def __init__(self, limit: int, window_sec: int, namespace: str = "http"):
         self.limit = int(limit)
         self.window = int(window_sec)
-        self.buckets: Dict[str, Deque[float]] = defaultdict(deque)
-        self.lock = threading.Lock()
-
-    def allow(self, key: str) -> Tuple[bool, int]:
-        now = time.time()
-        with self.lock:
-            q = self.buckets[key]
-            while q and (now - q[0]) > self.window:
-                q.popleft()
-            if len(q) < self.limit:
-                q.append(now)
-                remaining = self.limit - len(q)
-                return True, remaining
-            else:
-                retry = max(1, int(self.window - (now - q[0])))
-                return False, retry
+        self.namespace = namespace
+
+    async def check(self, key: str) -> RateLimitDecision:
+        return await get_rate_limiter().ahit(self.namespace, key, limit=self.limit, window=self.window)
 
 def _parse_routes(spec: str) -> Dict[str, Tuple[int,int]]:
+    """Parse ``"[METHOD[|METHOD] ]/path/{param}:limit/window,..."`` into a dict."""
     out = {}
     for part in [p.strip() for p in (spec or '').split(',') if p.strip()]:
         if ':' in part and '/' in part:
-            path, lw = part.split(':', 1)
+            path, lw = part.rsplit(':', 1)
             limit, window = lw.split('/', 1)
             out[path.strip()] = (int(limit), int(window))
     return out
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, *, default_limit: int = 100, default_window: int = 900, route_overrides: Optional[Dict[str, Tuple[int,int]]] = None, key_func: Optional[Callable[[Request], str]] = None):
-        super().__init__(app)
+def _default_key(ctx: RequestContext) -> str:
+    tenant = ctx.headers.get('x-tenant-id') or 'global'
+    client = ctx.headers.get('x-forwarded-for', ctx.client_host or 'unknown')
+    user = ctx.headers.get('x-user-id') or ctx.headers.get('x-user-guid') or ''
+    return f"{tenant}:{user}:{client}"
+
+@dataclass(frozen=True)
+class RatePolicy:
+    skip: bool = False
+    limiter: Optional[RateLimiter] = None
+
+_SKIP = RatePolicy(skip=True)
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, *, default_limit: int = 100, default_window: int = 900, route_overrides: Optional[Dict[str, Tuple[int,int]]] = None, key_func: Optional[Callable[[Request], str]] = None):
+        self.app = app
         self.default = RateLimiter(default_limit, default_window)
-        self.routes = {path: RateLimiter(l, w) for path, (l, w) in (route_overrides or {}).items()}
-        def default_key(req: Request) -> str:
-            tenant = req.headers.get('x-tenant-id') or 'global'
-            client = req.headers.get('x-forwarded-for', req.client.host if req.client else 'unknown')
-            user = req.headers.get('x-user-id') or req.headers.get('x-user-guid') or ''
-            return f"{tenant}:{user}:{client}"
-
-        self.key_func = key_func or default_key
+        # Override keys are path templates, optionally prefixed with methods:
+        #   "/admin/settings", "/agents/{agent_id}/logs", "POST /auth/login", "/grafana/*"
+        self.routes = {rule: RateLimiter(l, w, namespace=f"http:{rule}") for rule, (l, w) in (route_overrides or {}).items()}
+        # Custom key functions keep the Request-based signature; the default
+        # reads straight from the shared request context.
+        self.key_func = key_func
         # Always-skipped exact paths
         self.always_skip = {'/health', '/metrics', '/openapi.json', '/docs', '/favicon.ico', '/api/health'}
         # Optional skip prefixes from env (comma-separated). Typical:
         #   RATE_LIMIT_SKIP="/api/auth,/auth,/api/support/settings/public,/support/settings/public"
+        # Entries match on segment boundaries and may use templates and methods
+        # ("GET /agents/{agent_id}/config").
         raw_skip = os.getenv('RATE_LIMIT_SKIP', '')
         self.skip_prefixes = [p.strip() for p in raw_skip.split(',') if p.strip()]
         # Provide sensible defaults to avoid throttling auth and public settings in dev
@@ -66,32 +73,67 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         for p in default_skips:
             if p not in self.skip_prefixes:
                 self.skip_prefixes.append(p)
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
-        # Skip OPTIONS preflight and some readonly endpoints
-        if request.method.upper() == 'OPTIONS' or path in self.always_skip:
-            return await call_next(request)
-        # Skip any configured prefixes
-        for pref in self.skip_prefixes:
-            if path.startswith(pref):
-                return await call_next(request)
-        limiter = self.routes.get(path, self.default)
-        key = self.key_func(request)
-        allowed, aux = limiter.allow(key)
-        if not allowed:
-            return JSONResponse(
+        self.policies = self._compile()
+
+    def _compile(self) -> RouteMatcher[RatePolicy]:
+        matcher: RouteMatcher[RatePolicy] = RouteMatcher()
+        for rule, limiter in self.routes.items():
+            methods, path = split_method(rule)
+            matcher.add(path, RatePolicy(limiter=limiter), methods=methods)
+        for path in self.always_skip:
+            matcher.add(path, _SKIP)
+        for rule in self.skip_prefixes:
+            methods, path = split_method(rule)
+            matcher.add(path if path.endswith('/*') else path.rstrip('/') + '/*', _SKIP, methods=methods)
+        return matcher
+
+    def resolve(self, method: str, path: str) -> Optional[RateLimiter]:
+        """Limiter for the request, or ``None`` when it is not rate limited.
+
+        A matching skip rule always wins (an override under a skipped prefix
+        stays skipped); otherwise the most specific override applies.
+        """
+        # Skip OPTIONS preflight
+        if method == 'OPTIONS':
+            return None
+        limiter = self.default
+        for match in self.policies.match_all(method, path):
+            policy = match.value
+            if policy.skip:
+                return None
+            limiter = policy.limiter
+        return limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        ctx = get_request_context(scope)
+        limiter = self.resolve(ctx.method, ctx.path)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        key = self.key_func(Request(scope, receive)) if self.key_func else _default_key(ctx)
+        decision = await limiter.check(key)
+        if not decision.allowed:
+            resp = JSONResponse(
                 status_code=429,
                 content={'detail': 'Too Many Requests'},
-                headers={'Retry-After': str(aux), 'X-RateLimit-Limit': str(limiter.limit), 'X-RateLimit-Remaining': '0'}
+                headers={'Retry-After': str(decision.retry_after_seconds), 'X-RateLimit-Limit': str(limiter.limit), 'X-RateLimit-Remaining': '0'}
             )
-        resp = await call_next(request)
-        try:
-            remaining = max(0, aux)
-            resp.headers['X-RateLimit-Limit'] = str(limiter.limit)
-            resp.headers['X-RateLimit-Remaining'] = str(remaining)
-        except Exception:
-            pass
-        return resp
+            await resp(scope, receive, send)
+            return
+        limit_value = str(limiter.limit)
+        remaining = str(decision.remaining)
+
+        async def send_with_limits(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers['X-RateLimit-Limit'] = limit_value
+                headers['X-RateLimit-Remaining'] = remaining
+            await send(message)
+
+        await self.app(scope, receive, send_with_limits)
 
 def build_rate_limit_middleware(app):
     default_l = int(os.getenv('RATE_LIMIT_DEFAULT', '100'))
@@ -1,37 +1,32 @@
-import uuid
 import logging
-from datetime import datetime
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.logging_conf import set_request_context
-from app.core.security import decode_access_token
+from app.middleware.context import get_request_context
 
 log = logging.getLogger("tenantra.request")
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        req_id = uuid.uuid4().hex[:12]
-        user_id = None
-        # Try to read user id from Bearer token
-        auth = request.headers.get("authorization", "")
-        if auth.lower().startswith("bearer "):
-            token = auth.split(" ", 1)[1]
-            try:
-                payload = decode_access_token(token)
-                if payload and "sub" in payload:
-                    user_id = payload["sub"]
-            except Exception:
-                pass
+class RequestLoggingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        set_request_context(request_id=req_id, user_id=user_id, path=request.url.path, method=request.method, status=None)
-        started = datetime.utcnow()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        ctx = get_request_context(scope)
+        set_request_context(request_id=ctx.request_id, user_id=ctx.user_id, path=ctx.path, method=ctx.method, status=None)
+
+        async def send_logged(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                ctx.status = message["status"]
+                set_request_context(request_id=ctx.request_id, user_id=ctx.user_id, path=ctx.path, method=ctx.method, status=str(ctx.status))
+                # Log when headers go out so streaming responses are not held back.
+                log.info("REQ %s %s -> %s in %dms", ctx.method, ctx.path, ctx.status, int(ctx.elapsed * 1000))
+            await send(message)
 
         try:
-            response = await call_next(request)
-            set_request_context(status=str(response.status_code))
-            log.info("REQ %s %s -> %s in %dms", request.method, request.url.path, response.status_code, int((datetime.utcnow()-started).total_seconds()*1000))
-            return response
+            await self.app(scope, receive, send_logged)
         except Exception as ex:
-            set_request_context(status="500")
-            log.exception("Unhandled error for %s %s: %s", request.method, request.url.path, ex)
+            set_request_context(request_id=ctx.request_id, user_id=ctx.user_id, path=ctx.path, method=ctx.method, status="500")
+            log.exception("Unhandled error for %s %s: %s", ctx.method, ctx.path, ex)
             raise
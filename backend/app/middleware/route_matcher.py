@@ -0,0 +1,168 @@
+"""Compiled path-template matcher shared by the HTTP middleware.
+
+Patterns are stored in a radix tree keyed by path segment, so resolving a
+request walks the tree once no matter how many rules are registered.  A
+pattern may use:
+
+* literal segments: ``/admin/settings``
+* parameters: ``/agents/{agent_id}/logs`` (matches exactly one segment)
+* a trailing catch-all parameter: ``/grafana/{path:path}``
+* a trailing ``/*`` to register a *prefix* rule that covers the path and
+  everything below it (on segment boundaries): ``/api/auth/*``
+
+Every rule may be limited to specific HTTP methods; a method-specific rule
+wins over a method-agnostic one at the same node.  Literal segments win over
+parameters, falling back to the parameter branch when the literal branch
+does not lead to a match.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Generic, Iterable, List, NamedTuple, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_ANY_METHOD = "*"
+
+
+class RouteMatch(NamedTuple):
+    template: str
+    value: Any
+
+
+class _Node:
+    __slots__ = ("static", "param", "exact", "prefix", "catch_all")
+
+    def __init__(self) -> None:
+        self.static: Dict[str, _Node] = {}
+        self.param: Optional[_Node] = None
+        self.exact: Dict[str, RouteMatch] = {}
+        self.prefix: Dict[str, RouteMatch] = {}
+        self.catch_all: Dict[str, RouteMatch] = {}
+
+
+def _segments(path: str) -> List[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+def _is_param(segment: str) -> bool:
+    return len(segment) > 2 and segment[0] == "{" and segment[-1] == "}"
+
+
+def _is_catch_all(segment: str) -> bool:
+    return _is_param(segment) and segment[1:-1].partition(":")[2] == "path"
+
+
+def _lookup(table: Dict[str, RouteMatch], method: str) -> Optional[RouteMatch]:
+    if not table:
+        return None
+    return table.get(method) or table.get(_ANY_METHOD)
+
+
+class RouteMatcher(Generic[T]):
+    """Radix tree mapping path templates (and methods) to policy values."""
+
+    def __init__(self) -> None:
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, pattern: str, value: T, *, methods: Optional[Iterable[str]] = None) -> None:
+        """Register ``value`` for ``pattern``; later registrations replace earlier ones."""
+        pattern = pattern.strip() or "/"
+        segments = _segments(pattern)
+        kind = "exact"
+        if segments and segments[-1] == "*":
+            segments.pop()
+            kind = "prefix"
+            template = "/" + "/".join(segments)
+        else:
+            template = "/" + "/".join(segments)
+            if segments and _is_catch_all(segments[-1]):
+                segments.pop()
+                kind = "catch_all"
+        node = self._root
+        for segment in segments:
+            if _is_param(segment):
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _Node())
+        table: Dict[str, RouteMatch] = getattr(node, kind)
+        match = RouteMatch(template, value)
+        for method in [m.upper() for m in methods] if methods else [_ANY_METHOD]:
+            if method not in table:
+                self._size += 1
+            table[method] = match
+
+    def match_all(self, method: str, path: str) -> List[RouteMatch]:
+        """All rules covering the request, least specific first.
+
+        Prefix rules along the matched branch come first (shallowest to
+        deepest), followed by the exact or catch-all template if one matched.
+        """
+        exact, prefixes = self._walk(self._root, _segments(path), 0, method.upper())
+        if exact is not None:
+            prefixes.append(exact)
+        return prefixes
+
+    def match(self, method: str, path: str) -> Optional[RouteMatch]:
+        """The most specific rule covering the request, or ``None``."""
+        matches = self.match_all(method, path)
+        return matches[-1] if matches else None
+
+    def _walk(
+        self, node: _Node, segments: List[str], index: int, method: str
+    ) -> Tuple[Optional[RouteMatch], List[RouteMatch]]:
+        prefixes: List[RouteMatch] = []
+        prefix = _lookup(node.prefix, method)
+        if prefix is not None:
+            prefixes.append(prefix)
+        if index == len(segments):
+            return _lookup(node.exact, method), prefixes
+
+        best: List[RouteMatch] = []
+        for child in (node.static.get(segments[index]), node.param):
+            if child is None:
+                continue
+            exact, deeper = self._walk(child, segments, index + 1, method)
+            if exact is not None:
+                return exact, prefixes + deeper
+            if len(deeper) > len(best):
+                best = deeper
+        catch_all = _lookup(node.catch_all, method)
+        if catch_all is not None:
+            return catch_all, prefixes
+        return None, prefixes + best
+
+
+def split_method(rule: str) -> Tuple[Optional[List[str]], str]:
+    """Split ``"GET|POST /path"`` into ``(["GET", "POST"], "/path")``."""
+    rule = rule.strip()
+    head, sep, rest = rule.partition(" ")
+    if sep and not head.startswith("/"):
+        return [m for m in head.upper().split("|") if m] or None, rest.strip()
+    return None, rule
+
+
+def build_app_matcher(app: Any) -> RouteMatcher[str]:
+    """Index the templates of every route mounted on a Starlette/FastAPI app.
+
+    Values are the route template itself, which the metrics middleware uses
+    as a bounded-cardinality ``path`` label.
+    """
+    matcher: RouteMatcher[str] = RouteMatcher()
+    for route in getattr(app, "routes", []) or []:
+        template = getattr(route, "path", None)
+        if not template:
+            continue
+        methods = getattr(route, "methods", None)
+        if hasattr(route, "routes") and not methods:
+            # Mounted sub-application or static files: cover everything below.
+            matcher.add(template.rstrip("/") + "/*", template.rstrip("/") or "/")
+        else:
+            matcher.add(template, template, methods=methods)
+    return matcher
@@ -1,12 +1,12 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import os
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
         self.hsts = os.getenv("SEC_HSTS", "max-age=63072000; includeSubDomains; preload")
+        self.force_hsts = os.getenv("SEC_FORCE_HSTS", "false").lower() in ("1", "true", "yes")
         self.frame = os.getenv("SEC_FRAME_OPTIONS", "DENY")
         self.cto = os.getenv("SEC_CONTENT_TYPE_OPTIONS", "nosniff")
         self.referrer = os.getenv("SEC_REFERRER_POLICY", "no-referrer")
@@ -17,20 +17,37 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             "default-src 'self'; script-src 'self'; style-src 'self'; img-src 'self' data:; "
             "font-src 'self'; connect-src 'self'; frame-ancestors 'none'; base-uri 'self'; form-action 'self'",
         )
+        # Header sets are fixed for the process lifetime, so build them once.
+        self._common = [
+            ("X-Content-Type-Options", self.cto),
+            ("Referrer-Policy", self.referrer),
+        ]
+        self._strict = [
+            ("X-Frame-Options", self.frame),
+            ("Cross-Origin-Opener-Policy", self.coop),
+            ("Cross-Origin-Embedder-Policy", self.coep),
+            ("Content-Security-Policy", self.csp),
+        ]
 
-    async def dispatch(self, request: Request, call_next):
-        resp = await call_next(request)
-        path = request.url.path or ""
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope.get("path") or ""
         # For proxied Grafana paths, avoid setting restrictive headers
         is_grafana = path.startswith("/grafana")
-        if request.url.scheme == "https" or os.getenv("SEC_FORCE_HSTS", "false").lower() in ("1","true","yes"):
-            resp.headers.setdefault("Strict-Transport-Security", self.hsts)
-        if not is_grafana:
-            resp.headers.setdefault("X-Frame-Options", self.frame)
-        resp.headers.setdefault("X-Content-Type-Options", self.cto)
-        resp.headers.setdefault("Referrer-Policy", self.referrer)
-        if not is_grafana:
-            resp.headers.setdefault("Cross-Origin-Opener-Policy", self.coop)
-            resp.headers.setdefault("Cross-Origin-Embedder-Policy", self.coep)
-            resp.headers.setdefault("Content-Security-Policy", self.csp)
-        return resp
+        add_hsts = scope.get("scheme") == "https" or self.force_hsts
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if add_hsts:
+                    headers.setdefault("Strict-Transport-Security", self.hsts)
+                for key, value in self._common:
+                    headers.setdefault(key, value)
+                if not is_grafana:
+                    for key, value in self._strict:
+                        headers.setdefault(key, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
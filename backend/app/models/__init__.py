@@ -30,6 +30,7 @@ except Exception:
     pass
 try:
     from .compliance_result import ComplianceResult  # noqa: F401
+    from .compliance_daily_rollup import ComplianceDailyRollup  # noqa: F401
 except Exception:
     pass
 try:
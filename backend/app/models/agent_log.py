@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 from app.models.base import TimestampMixin, ModelMixin
@@ -12,3 +12,7 @@ class AgentLog(Base, TimestampMixin, ModelMixin):
     message = Column(Text, nullable=False)
 
     agent = relationship("Agent", back_populates="logs")
+
+    __table_args__ = (
+        Index("ix_agent_logs_agent_created", "agent_id", "created_at", "id"),
+    )
@@ -3,7 +3,7 @@ from __future__ import annotations
 import datetime
 import json
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Index
 from sqlalchemy.orm import relationship
@@ -35,13 +35,23 @@ class AuditLog(Base, TimestampMixin, ModelMixin):
 
     @property
     def details(self) -> Optional[Dict[str, Any]]:
-        if not self.details_enc:
+        return self.decode_details(self.details_enc, log_id=self.id)
+
+    @staticmethod
+    def decode_details(
+        details_enc: Optional[str],
+        decrypt: Optional[Callable[[str], str]] = None,
+        *,
+        log_id: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Decrypt and parse stored details; bulk readers pass a reusable ``aes_decryptor``."""
+        if not details_enc:
             return None
         try:
-            decrypted = decrypt_data(self.details_enc, get_enc_key())
+            decrypted = decrypt(details_enc) if decrypt else decrypt_data(details_enc, get_enc_key())
             return json.loads(decrypted) if decrypted else None
         except Exception:
-            logger.warning("Failed to decrypt and parse audit log details for log_id=%s", self.id, exc_info=True)
+            logger.warning("Failed to decrypt and parse audit log details for log_id=%s", log_id, exc_info=True)
             return None
 
     @details.setter
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, String, UniqueConstraint
+from app.db.base_class import Base
+from app.models.base import ModelMixin
+
+
+class ComplianceDailyRollup(Base, ModelMixin):
+    """Pass/fail counts of ``ComplianceResult`` rows per tenant, module and UTC day.
+
+    Maintained by :mod:`app.services.compliance_rollups`; never written directly.
+    """
+
+    __tablename__ = "compliance_daily_rollups"
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    module = Column(String(100), nullable=False)
+    day = Column(Date, nullable=False)
+    pass_count = Column(Integer, nullable=False, default=0, server_default="0")
+    fail_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "module", "day", name="uq_compliance_daily_rollups_tenant_module_day"),
+    )
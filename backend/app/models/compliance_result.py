@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 from datetime import datetime
@@ -16,3 +16,7 @@ class ComplianceResult(Base, TimestampMixin, ModelMixin):
     details = Column(String, nullable=True)
 
     tenant = relationship("Tenant", back_populates="compliance_results")
+
+    __table_args__ = (
+        Index("ix_compliance_results_tenant_module_recorded", "tenant_id", "module", "recorded_at"),
+    )
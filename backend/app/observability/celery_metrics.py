@@ -0,0 +1,76 @@
+"""Celery signal handlers feeding the task metrics in ``app.observability.metrics``.
+
+Connected from ``app.celery_app`` so the beat, worker and any publishing
+process share the same hooks:
+
+* ``before_task_publish`` stamps the publish time into the message headers;
+* ``task_prerun`` records queue latency and starts the run timer;
+* ``task_postrun`` / ``task_retry`` record duration, final state and retries;
+* ``worker_process_shutdown`` retires the child's multi-process gauge files.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict
+
+from celery import signals
+
+from app.observability.metrics import (
+    mark_process_dead,
+    record_celery_queue_latency,
+    record_celery_retry,
+    record_celery_task,
+)
+
+PUBLISHED_AT_HEADER = "tenantra_published_at"
+
+_STARTED: Dict[str, float] = {}
+_INSTALLED = False
+
+
+def _task_name(task=None, sender=None) -> str:
+    return getattr(task, "name", None) or getattr(sender, "name", None) or str(sender or "unknown")
+
+
+def _on_publish(sender=None, headers=None, **_kwargs) -> None:
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+def _on_prerun(task_id=None, task=None, **_kwargs) -> None:
+    if task_id:
+        _STARTED[task_id] = time.monotonic()
+    published = getattr(getattr(task, "request", None), PUBLISHED_AT_HEADER, None)
+    if published is not None:
+        try:
+            record_celery_queue_latency(_task_name(task), time.time() - float(published))
+        except (TypeError, ValueError):
+            pass
+
+
+def _on_postrun(task_id=None, task=None, state=None, **_kwargs) -> None:
+    started = _STARTED.pop(task_id, None) if task_id else None
+    duration = time.monotonic() - started if started is not None else None
+    record_celery_task(_task_name(task), state or "UNKNOWN", duration)
+
+
+def _on_retry(sender=None, **_kwargs) -> None:
+    record_celery_retry(_task_name(sender=sender))
+
+
+def _on_worker_process_shutdown(pid=None, **_kwargs) -> None:
+    mark_process_dead(pid)
+
+
+def install() -> None:
+    """Connect the handlers once per process."""
+    global _INSTALLED
+    if _INSTALLED:
+        return
+    signals.before_task_publish.connect(_on_publish, weak=False)
+    signals.task_prerun.connect(_on_prerun, weak=False)
+    signals.task_postrun.connect(_on_postrun, weak=False)
+    signals.task_retry.connect(_on_retry, weak=False)
+    signals.worker_process_shutdown.connect(_on_worker_process_shutdown, weak=False)
+    _INSTALLED = True
@@ -0,0 +1,135 @@
+"""Connection-pool instrumentation for the shared SQLAlchemy engine.
+
+``TimedQueuePool`` measures how long each checkout waits for a connection
+(including connects made to grow the pool) and counts pool timeouts; pool
+events keep the checked-out/overflow gauges current.  All series carry a
+``role`` label (``api``, ``worker``, ...) so API and Celery pools can be told
+apart once multi-process metrics are aggregated; the async engine reports
+under ``<role>-async``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.observability.metrics import REGISTRY
+
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total",
+    "Connections checked out of the SQLAlchemy pool",
+    ["role"],
+    registry=REGISTRY,
+)
+
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after pool_timeout seconds",
+    ["role"],
+    registry=REGISTRY,
+)
+
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection (includes new connects)",
+    ["role"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    registry=REGISTRY,
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out",
+    ["role"],
+    registry=REGISTRY,
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size (negative while the pool is still filling)",
+    ["role"],
+    registry=REGISTRY,
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured pool_size",
+    ["role"],
+    registry=REGISTRY,
+    multiprocess_mode="livesum",
+)
+
+DB_READ_ROUTES = Counter(
+    "db_read_sessions_total",
+    "Read-only sessions opened, by target (replica role or primary)",
+    ["target"],
+    registry=REGISTRY,
+)
+
+
+class _TimedCheckout:
+    """Mixin recording checkout wait time and timeouts for a queue pool."""
+
+    metrics_role = "api"
+
+    def _do_get(self):  # noqa: D401 - SQLAlchemy hook
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(role=self.metrics_role).inc()
+            raise
+        finally:
+            DB_POOL_WAIT.labels(role=self.metrics_role).observe(time.perf_counter() - start)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep its metric label.
+        pool = super().recreate()
+        pool.metrics_role = self.metrics_role
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool that records checkout wait time and timeouts."""
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """Async-engine variant of :class:`TimedQueuePool`."""
+
+
+def instrument_engine(engine: Engine, role: str) -> None:
+    """Attach pool gauges/counters to ``engine`` (no-op for non-queue pools)."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    if isinstance(pool, _TimedCheckout):
+        pool.metrics_role = role
+    DB_POOL_SIZE.labels(role=role).set(pool.size())
+
+    checked_out = DB_POOL_CHECKED_OUT.labels(role=role)
+    overflow = DB_POOL_OVERFLOW.labels(role=role)
+    checkouts = DB_POOL_CHECKOUTS.labels(role=role)
+
+    # "checkin" fires before the pool updates its own counters, so track
+    # checked-out connections from the events rather than pool.checkedout().
+    def _on_checkout(*_args) -> None:
+        checkouts.inc()
+        checked_out.inc()
+        overflow.set(pool.overflow())
+
+    def _on_checkin(*_args) -> None:
+        checked_out.dec()
+
+    def _on_close(*_args) -> None:
+        overflow.set(pool.overflow())
+
+    event.listen(pool, "checkout", _on_checkout)
+    event.listen(pool, "checkin", _on_checkin)
+    event.listen(pool, "close", _on_close)
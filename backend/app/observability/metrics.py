@@ -1,14 +1,55 @@
 # backend/app/observability/metrics.py
 from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST
-import time
 from fastapi import Request, Response
-from typing import Callable
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Any, Callable, Optional, Set, Tuple
+import math
 import os
+import threading
+
+from app.middleware.context import get_request_context
+from app.middleware.route_matcher import RouteMatcher, build_app_matcher
 
 # Dedicated registry (explicit to avoid accidental global pollution)
 REGISTRY = CollectorRegistry(auto_describe=True)
 
-# Request counters & latency by method/path
+# Multi-process mode: when PROMETHEUS_MULTIPROC_DIR is set (before this module
+# is imported), every uvicorn and Celery worker process writes its samples to
+# mmap files in that directory and /metrics aggregates all of them.  The
+# directory must be shared by the API and worker containers and emptied
+# before the processes start.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.getenv("prometheus_multiproc_dir")
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _latency_buckets() -> Tuple[float, ...]:
+    """Latency buckets for ``http_request_duration_seconds``.
+
+    ``TENANTRA_METRIC_HISTOGRAM=classic`` (default) uses the explicit
+    ``TENANTRA_METRIC_LATENCY_BUCKETS`` list.  ``exponential`` spaces the
+    buckets geometrically from 1ms to 60s with growth factor
+    ``2 ** 2 ** -resolution``, so each power of two is split into
+    ``2 ** resolution`` buckets.
+
+    Either way these are classic histogram buckets, one series each per
+    (method, path); this does not emit Prometheus native histograms.
+    ``TENANTRA_METRIC_HISTOGRAM_RESOLUTION`` 0 (default) is 17 buckets, 1 is
+    33 and 2 is 65.  Higher resolutions are clamped to 2.
+    """
+    if os.getenv("TENANTRA_METRIC_HISTOGRAM", "classic").strip().lower() == "exponential":
+        resolution = min(max(int(os.getenv("TENANTRA_METRIC_HISTOGRAM_RESOLUTION", "0")), 0), 2)
+        factor = 2 ** (2 ** -resolution)
+        lowest, highest = 0.001, 60.0
+        count = int(math.ceil(math.log(highest / lowest, factor)))
+        return tuple(round(lowest * factor ** i, 6) for i in range(count + 1))
+    return tuple(
+        float(x) for x in os.getenv("TENANTRA_METRIC_LATENCY_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2,5").split(",")
+    )
+
+
+# Request counters & latency by method/route template
 REQ_COUNT = Counter(
     "http_requests_total",
     "Total HTTP requests",
@@ -21,12 +62,48 @@ REQ_LATENCY = Histogram(
     "HTTP request latency in seconds",
     ["method", "path"],
     # Optional: buckets tuned via env, else sensible defaults
-    buckets=tuple(
-        float(x) for x in os.getenv("TENANTRA_METRIC_LATENCY_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2,5").split(",")
-    ),
+    buckets=_latency_buckets(),
     registry=REGISTRY,
 )
 
+# Opt-in per-tenant request counts for authenticated requests.  Only the first
+# TENANT_LABEL_MAX tenants seen by a process get their own label value; the
+# rest share OTHER_TENANT.
+TENANT_LABELS = _env_flag("TENANTRA_METRIC_TENANT_LABELS")
+TENANT_LABEL_MAX = max(int(os.getenv("TENANTRA_METRIC_TENANT_LABEL_MAX", "50")), 0)
+OTHER_TENANT = "__other__"
+
+TENANT_REQ_COUNT = Counter(
+    "http_tenant_requests_total",
+    "Total HTTP requests per tenant (opt-in, cardinality capped) grouped by status class",
+    ["tenant", "status_class"],
+    registry=REGISTRY,
+)
+
+
+class LabelValueCap:
+    """Admits at most ``limit`` distinct label values; later ones map to ``overflow``."""
+
+    def __init__(self, limit: int, overflow: str = OTHER_TENANT) -> None:
+        self.limit = limit
+        self.overflow = overflow
+        self._seen: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, value: str) -> str:
+        if value in self._seen:
+            return value
+        with self._lock:
+            if value in self._seen:
+                return value
+            if len(self._seen) >= self.limit:
+                return self.overflow
+            self._seen.add(value)
+            return value
+
+
+_TENANT_CAP = LabelValueCap(TENANT_LABEL_MAX)
+
 NOTIF_SENT = Counter(
     "notifications_sent_total",
     "Notifications sent grouped by channel and status",
@@ -66,6 +143,8 @@ GRAFANA_HEALTH = Gauge(
     "grafana_health_status",
     "Grafana health status (1=healthy, 0=misconfigured or unreachable)",
     registry=REGISTRY,
+    # Aggregated across worker processes: report the latest observation.
+    multiprocess_mode="mostrecent",
 )
 
 GRAFANA_MISCONFIG = Counter(
@@ -75,29 +154,124 @@ GRAFANA_MISCONFIG = Counter(
     registry=REGISTRY,
 )
 
-def request_metrics_middleware() -> Callable:
+CELERY_TASKS = Counter(
+    "celery_tasks_total",
+    "Celery tasks finished grouped by task name and final state",
+    ["task", "state"],
+    registry=REGISTRY,
+)
+
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time in seconds",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+    registry=REGISTRY,
+)
+
+CELERY_TASK_QUEUE_LATENCY = Histogram(
+    "celery_task_queue_latency_seconds",
+    "Time between a Celery task being published and a worker starting it",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+    registry=REGISTRY,
+)
+
+CELERY_TASK_RETRIES = Counter(
+    "celery_task_retries_total",
+    "Celery task retries grouped by task name",
+    ["task"],
+    registry=REGISTRY,
+)
+
+CACHE_EVENTS = Counter(
+    "app_cache_events_total",
+    "In-process cache lookups and evictions (hit, miss, stale, eviction, expired, load_error)",
+    ["cache", "event"],
+    registry=REGISTRY,
+)
+
+CACHE_ENTRIES = Gauge(
+    "app_cache_entries",
+    "Entries currently held by an in-process cache",
+    ["cache"],
+    registry=REGISTRY,
+    multiprocess_mode="livesum",
+)
+
+CACHE_BUS_MESSAGES = Counter(
+    "app_cache_bus_messages_total",
+    "Cross-process cache invalidation messages (published, received, publish_error, disconnect)",
+    ["event"],
+    registry=REGISTRY,
+)
+
+UNMATCHED_PATH_LABEL = "<unmatched>"
+
+
+class RequestMetricsMiddleware:
     """
-    Returns an ASGI middleware function suitable for `app.middleware("http")(...)`.
-    Records request count and latency with method/path/status labels.
+    Pure-ASGI middleware recording request count and latency with
+    method/path/status labels.  Status is captured from ``http.response.start``
+    so streaming bodies pass through untouched.
+
+    The ``path`` label is the matched route template (``/agents/{agent_id}/logs``)
+    rather than the raw URL, so ids in paths do not create new series.  With
+    ``TENANTRA_METRIC_TENANT_LABELS`` enabled, authenticated requests are also
+    counted per tenant of the resolved user (never a client-sent header, so
+    junk values cannot use up the cap), capped by
+    ``TENANTRA_METRIC_TENANT_LABEL_MAX``.
     """
-    async def _middleware(request: Request, call_next):
-        method = request.method
-        path = request.url.path
-        start = time.perf_counter()
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._routes: Optional[RouteMatcher[str]] = None
+        self._routes_for: Optional[Any] = None
+        self._route_count = -1
+
+    def path_label(self, scope: Scope, method: str, path: str) -> str:
+        app = scope.get("app")
+        routes = getattr(app, "routes", None)
+        if routes is None:
+            return UNMATCHED_PATH_LABEL
+        # Routes are registered after the middleware is built, so index lazily
+        # and re-index if the router changes.
+        if self._routes is None or self._routes_for is not app or self._route_count != len(routes):
+            self._routes = build_app_matcher(app)
+            self._routes_for = app
+            self._route_count = len(routes)
+        match = self._routes.match(method, path)
+        return match.value if match is not None else UNMATCHED_PATH_LABEL
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        ctx = get_request_context(scope)
         status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
         try:
-            response = await call_next(request)
-            status = getattr(response, "status_code", 200)
-            return response
+            await self.app(scope, receive, send_with_status)
         finally:
-            dt = time.perf_counter() - start
+            dt = ctx.elapsed
             try:
-                REQ_COUNT.labels(method=method, path=path, status=str(status)).inc()
-                REQ_LATENCY.labels(method=method, path=path).observe(dt)
+                path = self.path_label(scope, ctx.method, ctx.path)
+                REQ_COUNT.labels(method=ctx.method, path=path, status=str(status)).inc()
+                REQ_LATENCY.labels(method=ctx.method, path=path).observe(dt)
+                if TENANT_LABELS and ctx.tenant_id:
+                    TENANT_REQ_COUNT.labels(
+                        tenant=_TENANT_CAP(ctx.tenant_id),
+                        status_class=f"{status // 100}xx",
+                    ).inc()
             except Exception:
                 # Best-effort metrics should never break requests
                 pass
-    return _middleware
 
 def metrics_endpoint() -> Callable[[Request], Response]:
     """
@@ -105,11 +279,35 @@ def metrics_endpoint() -> Callable[[Request], Response]:
     Using a factory avoids re-importing registry on each call.
     """
     def _endpoint(_request: Request) -> Response:
-        data = generate_latest(REGISTRY)
-        return Response(content=data, media_type=CONTENT_TYPE_LATEST)
+        return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
     return _endpoint
 
 
+def render_latest() -> bytes:
+    """Prometheus text for this process, or for all processes in multi-process mode."""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        # A fresh registry per scrape: MultiProcessCollector reads every
+        # worker's mmap files, including the ones this process wrote.
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=MULTIPROC_DIR)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """Drop live-gauge files of an exited worker (no-op outside multi-process mode)."""
+    if not MULTIPROC_DIR:
+        return
+    try:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid(), path=MULTIPROC_DIR)
+    except Exception:
+        pass
+
+
 # Helper recording functions (import where needed)
 def record_notification_delivery(channel: str, ok: bool) -> None:
     try:
@@ -155,3 +353,47 @@ def record_grafana_misconfig() -> None:
         GRAFANA_MISCONFIG.inc()
     except Exception:
         pass
+
+
+def record_celery_task(task: str, state: str, duration: Optional[float] = None) -> None:
+    try:
+        CELERY_TASKS.labels(task=task or "unknown", state=state or "unknown").inc()
+        if duration is not None:
+            CELERY_TASK_DURATION.labels(task=task or "unknown").observe(duration)
+    except Exception:
+        pass
+
+
+def record_celery_queue_latency(task: str, seconds: float) -> None:
+    try:
+        CELERY_TASK_QUEUE_LATENCY.labels(task=task or "unknown").observe(max(seconds, 0.0))
+    except Exception:
+        pass
+
+
+def record_celery_retry(task: str) -> None:
+    try:
+        CELERY_TASK_RETRIES.labels(task=task or "unknown").inc()
+    except Exception:
+        pass
+
+
+def record_cache_event(cache: str, event: str, count: int = 1) -> None:
+    try:
+        CACHE_EVENTS.labels(cache=cache, event=event).inc(count)
+    except Exception:
+        pass
+
+
+def record_cache_size(cache: str, size: int) -> None:
+    try:
+        CACHE_ENTRIES.labels(cache=cache).set(size)
+    except Exception:
+        pass
+
+
+def record_cache_bus_event(event: str) -> None:
+    try:
+        CACHE_BUS_MESSAGES.labels(event=event).inc()
+    except Exception:
+        pass
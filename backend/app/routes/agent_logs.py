@@ -1,8 +1,10 @@
+import json
 from datetime import datetime
 from typing import Dict, List
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.auth import get_admin_user
 from app.database import get_db
@@ -10,6 +12,9 @@ from app.models.agent import Agent
 from app.models.agent_log import AgentLog
 from app.models.user import User
 from app.dependencies.agents import verify_agent_token
+from app.services import agent_log_ingest
+from app.utils.agent_payloads import iter_request_body
+from app.utils.pagination import PageParams, apply_page_headers, page_params, paginate
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/agents", tags=["Agent Logs"])
@@ -49,20 +54,94 @@ def create_agent_log(
     return {"status": "created", "log_id": log.id}
 
 
+_MAX_REPORTED_ERRORS = 20
+
+
+async def _enqueue(buffer: agent_log_ingest.AgentLogBuffer, rows: List[dict], accepted: int) -> None:
+    if buffer.offer(rows):
+        return
+    # Buffer is full: try to drain it ourselves before pushing back on the agent.
+    await run_in_threadpool(buffer.flush)
+    if buffer.offer(rows):
+        return
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={"message": "Log ingest buffer is full, retry later", "accepted": accepted},
+        headers={"Retry-After": str(max(int(buffer.flush_seconds), 1))},
+    )
+
+
+@router.post("/{agent_id}/logs/stream", response_model=Dict[str, object], status_code=status.HTTP_202_ACCEPTED)
+async def stream_agent_logs(
+    agent_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    agent_token: str = Header(..., alias="X-Agent-Token"),
+):
+    """Ingest newline-delimited JSON log entries (optionally gzip-encoded).
+
+    Each line is ``{"severity": ..., "message": ..., "created_at": ...}``.
+    The token is verified once per upload; parsed rows are handed to the
+    shared bulk-insert buffer as the body streams in.
+    """
+    await run_in_threadpool(verify_agent_token, agent_id, agent_token, db)
+    await run_in_threadpool(db.close)
+
+    buffer = agent_log_ingest.get_buffer()
+    now = datetime.utcnow()
+    accepted = 0
+    rejected = 0
+    errors: List[Dict[str, object]] = []
+    pending: List[dict] = []
+    line_no = 0
+
+    def _consume(line: bytes) -> None:
+        nonlocal rejected, line_no
+        line_no += 1
+        if not line.strip():
+            return
+        try:
+            pending.append(agent_log_ingest.build_row(agent_id, json.loads(line), now))
+        except ValueError as exc:
+            rejected += 1
+            if len(errors) < _MAX_REPORTED_ERRORS:
+                errors.append({"line": line_no, "error": str(exc)})
+
+    tail = b""
+    async for chunk in iter_request_body(request, agent_log_ingest.MAX_STREAM_BYTES):
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            _consume(line)
+        if len(pending) >= buffer.flush_rows:
+            await _enqueue(buffer, pending, accepted)
+            accepted += len(pending)
+            pending = []
+    if tail:
+        _consume(tail)
+    if pending:
+        await _enqueue(buffer, pending, accepted)
+        accepted += len(pending)
+    return {"status": "accepted", "accepted": accepted, "rejected": rejected, "errors": errors}
+
+
 @router.get("/{agent_id}/logs", response_model=List[dict])
 def get_agent_logs(
     agent_id: int,
+    response: Response,
+    params: PageParams = Depends(page_params()),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_admin_user),
 ):
+    """Newest-first agent logs using keyset pagination.
+
+    The body stays a plain list; when more rows exist the cursor for the next
+    page is returned in the ``X-Next-Cursor`` header.
+    """
     _ensure_agent_for_tenant(agent_id, current_user, db)
-    logs = (
-        db.query(AgentLog)
-        .filter(AgentLog.agent_id == agent_id)
-        .order_by(AgentLog.created_at.desc())
-        .limit(100)
-        .all()
-    )
+    query = db.query(AgentLog).filter(AgentLog.agent_id == agent_id)
+    page = paginate(query, AgentLog.created_at, AgentLog.id, params)
+    apply_page_headers(response, page)
     return [
         {
             "id": log.id,
@@ -70,5 +149,5 @@ def get_agent_logs(
             "message": log.message,
             "created_at": log.created_at.isoformat()
         }
-        for log in logs
+        for log in page.items
     ]
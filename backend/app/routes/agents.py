@@ -4,20 +4,22 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import json
 
-from fastapi import APIRouter, Body, Depends, Header, HTTPException, status
-from pydantic import BaseModel, Field, root_validator
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, constr, root_validator
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_admin_user
-from app.database import get_db
-from app.dependencies.agents import verify_agent_token
+from app.database import get_async_db, get_db
+from app.dependencies.agents import verify_agent_token_async
 from app.models.agent import Agent
 from app.models.module import Module
-from app.models.module_agent_mapping import ModuleAgentMapping
 from app.models.scan_module_result import ScanModuleResult
-from app.models.tenant_module import TenantModule
 from app.models.user import User
-from app.services import agent_enrollment
+from app.services import agent_config, agent_enrollment, agent_results
+from app.utils.agent_payloads import decode_payload, read_request_body
 
 router = APIRouter(prefix="/agents", tags=["Agents"])
 
@@ -31,6 +33,22 @@ class SelfEnrollRequest(BaseModel):
     name: str = Field(..., min_length=1)
 
 
+class BulkEnrollRequest(BaseModel):
+    names: Optional[List[constr(strip_whitespace=True, min_length=1, max_length=255)]] = None
+    count: Optional[int] = Field(None, ge=1, le=agent_enrollment.BULK_ENROLL_MAX)
+    name_prefix: constr(strip_whitespace=True, min_length=1, max_length=200) = "agent"
+    passphrase: str = Field(..., min_length=12, description="Used to encrypt the returned credentials bundle")
+
+    @root_validator(skip_on_failure=True)
+    def _ensure_targets(cls, values):
+        names, count = values.get("names"), values.get("count")
+        if bool(names) == bool(count):
+            raise ValueError("Provide exactly one of names or count")
+        if names and len(names) > agent_enrollment.BULK_ENROLL_MAX:
+            raise ValueError(f"At most {agent_enrollment.BULK_ENROLL_MAX} agents per request")
+        return values
+
+
 class AgentResultSubmission(BaseModel):
     agent_id: int
     module_id: Optional[int] = None
@@ -63,6 +81,36 @@ def enroll_agent(
     return {"agent_id": agent.id, "token": token}
 
 
+@router.post("/enroll/bulk", status_code=status.HTTP_201_CREATED)
+def bulk_enroll_agents(
+    payload: BulkEnrollRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user),
+) -> StreamingResponse:
+    """Enroll many agents in one transaction and stream back an encrypted credentials bundle.
+
+    The bundle is NDJSON: a header line with the KDF parameters followed by one
+    AES-GCM sealed ``{"agent_id", "name", "token"}`` record per agent, keyed by
+    ``passphrase``.  Decrypt it with ``python -m app.scripts.bulk_enroll_agents decrypt``.
+    """
+    if current_user.tenant_id is None:
+        raise HTTPException(status_code=400, detail="Admin must belong to a tenant")
+    names = payload.names or [f"{payload.name_prefix}-{index:05d}" for index in range(1, payload.count + 1)]
+    credentials = agent_enrollment.bulk_create_agents(db, tenant_id=current_user.tenant_id, names=names)
+    return StreamingResponse(
+        agent_enrollment.iter_credentials_bundle(
+            credentials, payload.passphrase, tenant_id=current_user.tenant_id
+        ),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/x-ndjson",
+        headers={
+            "X-Agents-Created": str(len(credentials)),
+            "Content-Disposition": 'attachment; filename="agent-credentials.ndjson"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
 @router.post("/enrollment-tokens", status_code=201)
 def create_enrollment_token(
     payload: EnrollmentTokenRequest,
@@ -83,41 +131,34 @@ def create_enrollment_token(
 
 
 @router.get("/config/{agent_id}")
-def get_config(
+async def get_config(
     agent_id: int,
+    request: Request,
+    wait: int = Query(0, ge=0, le=agent_config.MAX_WAIT_SECONDS),
     agent_token: str = Header(..., alias="X-Agent-Token"),
-    db: Session = Depends(get_db),
-) -> Dict[str, object]:
-    agent = verify_agent_token(agent_id, agent_token, db)
-
-    modules: List[Module] = db.query(Module).all()
-    tenant_overrides: Dict[int, bool] = {}
-    if agent.tenant_id:
-        rows = (
-            db.query(TenantModule)
-            .filter(TenantModule.tenant_id == agent.tenant_id)
-            .all()
-        )
-        tenant_overrides = {row.module_id: bool(row.enabled) for row in rows}
-
-    agent_overrides = {
-        row.module_id: bool(row.enabled)
-        for row in db.query(ModuleAgentMapping).filter(ModuleAgentMapping.agent_id == agent.id).all()
-    }
-
-    enabled = []
-    for module in modules:
-        base_enabled = module.is_effectively_enabled
-        if module.id in agent_overrides:
-            effective = agent_overrides[module.id]
-        elif module.id in tenant_overrides:
-            effective = tenant_overrides[module.id]
-        else:
-            effective = base_enabled
-        if effective:
-            enabled.append(module.name)
-
-    return {"agent_id": agent.id, "modules": enabled}
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """Return the agent's enabled modules with a strong ETag.
+
+    Agents send ``If-None-Match`` with the last ETag they applied and receive
+    ``304`` when nothing changed.  With ``wait=N`` an unchanged config is held
+    open for up to N seconds and answered as soon as it changes.
+    """
+    agent = await verify_agent_token_async(agent_id, agent_token, db)
+    tenant_id, resolved_agent_id = agent.tenant_id, agent.id
+    config = await db.run_sync(agent_config.get_compiled_config, tenant_id, resolved_agent_id)
+
+    if_none_match = request.headers.get("if-none-match")
+    if wait and agent_config.etag_matches(if_none_match, config.etag):
+        # Release the pooled connection before parking the request.
+        await db.close()
+        if await agent_config.wait_for_change(config, wait):
+            config = await db.run_sync(agent_config.get_compiled_config, tenant_id, resolved_agent_id)
+
+    headers = {"ETag": config.etag, "Cache-Control": "no-cache"}
+    if agent_config.etag_matches(if_none_match, config.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=config.body, media_type="application/json", headers=headers)
 
 
 @router.post("/enroll/self", status_code=201)
@@ -138,17 +179,18 @@ def self_enroll_agent(
 
 
 @router.post("/results", status_code=status.HTTP_201_CREATED)
-def submit_agent_result(
+async def submit_agent_result(
     payload: AgentResultSubmission,
     agent_token: str = Header(..., alias="X-Agent-Token"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Dict[str, object]:
-    agent = verify_agent_token(payload.agent_id, agent_token, db)
+    agent = await verify_agent_token_async(payload.agent_id, agent_token, db)
     module = None
     if payload.module_id:
-        module = db.query(Module).filter(Module.id == payload.module_id).first()
+        module = await db.get(Module, payload.module_id)
     if module is None and payload.module_name:
-        module = db.query(Module).filter(Module.name == payload.module_name).first()
+        result = await db.execute(select(Module).where(Module.name == payload.module_name).limit(1))
+        module = result.scalars().first()
     if module is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Module not found")
 
@@ -161,6 +203,40 @@ def submit_agent_result(
         recorded_at=datetime.utcnow(),
     )
     db.add(record)
-    db.commit()
-    db.refresh(record)
+    await db.commit()
     return {"id": record.id, "status": record.status}
+
+
+@router.post("/results/batch")
+async def submit_agent_results_batch(
+    request: Request,
+    agent_token: str = Header(..., alias="X-Agent-Token"),
+    db: AsyncSession = Depends(get_async_db),
+) -> Dict[str, object]:
+    """Store many module results in one call.
+
+    Body: ``{"agent_id": int, "results": [AgentResultSubmission-like items]}``
+    encoded as JSON or msgpack, optionally with ``Content-Encoding: gzip``.
+    The agent token is verified once for the whole batch and each item gets its
+    own outcome, so one bad entry does not reject the rest.
+    """
+    raw = await read_request_body(request, agent_results.MAX_BATCH_BYTES)
+    payload = decode_payload(raw, request.headers.get("content-type"))
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Batch payload must be an object")
+    agent_id = payload.get("agent_id")
+    items = payload.get("results")
+    if not isinstance(agent_id, int) or isinstance(agent_id, bool):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="agent_id is required")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="results must be a list")
+    if len(items) > agent_results.MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {agent_results.MAX_BATCH_ITEMS} results",
+        )
+
+    agent = await verify_agent_token_async(agent_id, agent_token, db)
+    outcomes = await db.run_sync(agent_results.ingest_results, agent, items)
+    accepted = sum(1 for outcome in outcomes if outcome["status"] == "created")
+    return {"accepted": accepted, "rejected": len(outcomes) - accepted, "items": outcomes}
@@ -4,25 +4,32 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_admin_user
+from app.core.permissions import ROLE_SUPER
 from app.database import get_db
 from app.models.agent import Agent
 from app.models.user import User
+from app.services import agent_heartbeats
 
 
 router = APIRouter(prefix="/admin/agents", tags=["Admin Agents"])
 
 
 def _serialize(a: Agent) -> Dict[str, object]:
+    last_seen = getattr(a, "last_seen_at", None)
+    # Prefer the in-memory heartbeat when it is newer than the last flushed value.
+    pending = agent_heartbeats.get_accumulator().last_seen(a.id)
+    if pending is not None and (last_seen is None or pending > last_seen):
+        last_seen = pending
     return {
         "id": a.id,
         "name": a.name,
         "tenant_id": a.tenant_id,
         "is_active": a.is_active,
-        "last_seen_at": getattr(a, "last_seen_at", None),
+        "last_seen_at": last_seen,
     }
 
 
@@ -38,3 +45,20 @@ def list_agents(
     rows = q.order_by(Agent.id.asc()).limit(500).all()
     return [_serialize(r) for r in rows]
 
+
+@router.get("/liveness", response_model=Dict[str, object])
+def fleet_liveness(
+    tenant_id: Optional[int] = Query(None),
+    current_user: User = Depends(get_admin_user),
+) -> Dict[str, object]:
+    """Online/stale/offline breakdown from this worker's heartbeat accumulator (no DB access).
+
+    Only super admins may omit ``tenant_id`` or name another tenant; other
+    admins always see their own tenant's fleet.
+    """
+    if (current_user.role or "").lower() != ROLE_SUPER:
+        own_tenant = current_user.tenant_id
+        if own_tenant is None or (tenant_id is not None and tenant_id != own_tenant):
+            raise HTTPException(status_code=403, detail="Forbidden tenant scope")
+        tenant_id = own_tenant
+    return agent_heartbeats.get_accumulator().liveness(tenant_id=tenant_id)
@@ -4,11 +4,11 @@ from dataclasses import dataclass
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 import hashlib
 import json
-import copy
-import threading
+import os
 from contextlib import nullcontext
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from urllib.parse import urlparse, urlunparse
@@ -25,6 +25,9 @@ from pydantic import (
     validator,
 )
 
+from app.cache.bus import broadcast_on_commit
+from app.cache.invalidation import tenant_evictor, tenant_namespace
+from app.cache.ttl import get_cache
 from app.core.auth import get_admin_user, get_settings_user
 from app.database import get_db
 from app.models.app_setting import AppSetting
@@ -54,37 +57,22 @@ def _span(name: str):
     return nullcontext()
 
 
-_SETTINGS_CACHE: Dict[str, Tuple[List[dict], str]] = {}
-_SETTINGS_CACHE_LOCK = threading.Lock()
+SETTINGS_CACHE_TTL = float(os.getenv("TENANTRA_SETTINGS_CACHE_TTL", "300"))
 
+# _SettingsSnapshot (response bytes + ETag) per scope.  AppSetting commits in any process
+# invalidate the affected scope through the cache bus.
+_SETTINGS_CACHE = get_cache("app_settings", ttl_seconds=SETTINGS_CACHE_TTL, maxsize=2048)
 
-def _cache_key(tenant_id: Optional[int]) -> str:
-    return "global" if tenant_id is None else f"tenant:{tenant_id}"
 
-
-def _get_cached_settings(tenant_id: Optional[int]) -> Optional[Tuple[List[dict], str]]:
-    key = _cache_key(tenant_id)
-    with _SETTINGS_CACHE_LOCK:
-        entry = _SETTINGS_CACHE.get(key)
-    if not entry:
-        return None
-    payload, etag = entry
-    return copy.deepcopy(payload), etag
-
-
-def _set_cached_settings(tenant_id: Optional[int], payload: List[dict], etag: str) -> None:
-    key = _cache_key(tenant_id)
-    with _SETTINGS_CACHE_LOCK:
-        _SETTINGS_CACHE[key] = (copy.deepcopy(payload), etag)
+def _invalidate_cache(*tenant_ids: Optional[int]) -> None:
+    if not tenant_ids:
+        _SETTINGS_CACHE.clear()
+        return
+    _SETTINGS_CACHE.invalidate_namespace(*(tenant_namespace(tenant_id) for tenant_id in tenant_ids))
 
 
-def _invalidate_cache(*tenant_ids: Optional[int]) -> None:
-    with _SETTINGS_CACHE_LOCK:
-        if not tenant_ids:
-            _SETTINGS_CACHE.clear()
-            return
-        for tenant_id in tenant_ids:
-            _SETTINGS_CACHE.pop(_cache_key(tenant_id), None)
+# Snapshots are per scope (not merged), so global rows only evict "global".
+broadcast_on_commit(AppSetting, "app_settings", tenant_evictor(_SETTINGS_CACHE, global_fans_out=False))
 
 
 _UNSET = object()
@@ -100,30 +88,36 @@ def _serialize(setting: AppSetting, *, value: Any = _UNSET) -> dict:
     }
 
 
-def _compute_etag(items: List[dict], tenant_key: Optional[str] = None) -> str:
-    payload = {"items": items}
-    if tenant_key is not None:
-        payload["tenant"] = tenant_key
-    raw = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
-    return f'W/"{hashlib.sha256(raw).hexdigest()}"'
+@dataclass(frozen=True)
+class _SettingsSnapshot:
+    """One scope's settings as the exact response body, shared by every cache hit."""
 
+    body: bytes
+    etag: str
 
-def _apply_conditional_headers(
-    request: Request,
-    response: Response,
-    items: List[dict],
-    tenant_key: Optional[str] = None,
-    etag: Optional[str] = None,
-) -> Optional[Response]:
-    etag = etag or _compute_etag(items, tenant_key)
-    if request.headers.get("if-none-match") == etag:
-        return Response(
-            status_code=status.HTTP_304_NOT_MODIFIED,
-            headers={"ETag": etag, "Cache-Control": "no-cache"},
-        )
-    response.headers["ETag"] = etag
-    response.headers.setdefault("Cache-Control", "no-cache")
-    return None
+    @classmethod
+    def build(cls, items: List[dict], tenant_key: Optional[str] = None) -> "_SettingsSnapshot":
+        body = json.dumps(jsonable_encoder(items), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256()
+        if tenant_key is not None:
+            digest.update(f"tenant:{tenant_key}\n".encode("utf-8"))
+        digest.update(body)
+        return cls(body=body, etag=f'W/"{digest.hexdigest()}"')
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"ETag": self.etag, "Cache-Control": "no-cache"}
+
+    def items(self) -> List[dict]:
+        """Decoded copy of the payload for callers that need Python objects."""
+        return json.loads(self.body)
+
+
+def _snapshot_response(request: Optional[Request], snapshot: _SettingsSnapshot) -> Response:
+    """Serve ``snapshot`` as-is, or ``304`` when the client already has it."""
+    if request is not None and request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=snapshot.headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=snapshot.headers)
 
 
 class _PortTarget(BaseModel):
@@ -413,10 +407,15 @@ def _assert_scope_allowed(key: str, tenant_id: Optional[int]) -> None:
         raise HTTPException(status_code=403, detail=f"Setting '{key}' requires a tenant context")
 
 
-def _get_settings_payload(db: Session, tenant_id: Optional[int]) -> Tuple[List[dict], str]:
-    cached = _get_cached_settings(tenant_id)
-    if cached:
-        return cached
+def _get_settings_snapshot(db: Session, tenant_id: Optional[int]) -> _SettingsSnapshot:
+    return _SETTINGS_CACHE.get(
+        tenant_namespace(tenant_id),
+        lambda: _load_settings_snapshot(db, tenant_id),
+        namespace=tenant_namespace(tenant_id),
+    )
+
+
+def _load_settings_snapshot(db: Session, tenant_id: Optional[int]) -> _SettingsSnapshot:
     query = db.query(AppSetting)
     if tenant_id is None:
         query = query.filter(AppSetting.tenant_id.is_(None))
@@ -428,9 +427,7 @@ def _get_settings_payload(db: Session, tenant_id: Optional[int]) -> Tuple[List[d
         normalized_value = _normalize_value(row.key, row.value)
         serialized.append(_serialize(row, value=normalized_value))
     tenant_key = str(tenant_id) if tenant_id is not None else None
-    etag = _compute_etag(serialized, tenant_key)
-    _set_cached_settings(tenant_id, serialized, etag)
-    return serialized, etag
+    return _SettingsSnapshot.build(serialized, tenant_key)
 
 
 def _serialize_validation_errors(errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -508,31 +505,23 @@ def _apply_updates(
 @router.get("", response_model=List[dict])
 def list_global_settings(
     request: Request,
-    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_settings_user),
-) -> List[dict] | Response:
+) -> Response:
     with _span("app_settings.list_global"):
         try:
             ensure_settings_read_access(db, current_user)
         except PermissionError as exc:
             raise HTTPException(status_code=403, detail=str(exc))
-        payload, etag = _get_settings_payload(db, tenant_id=None)
-        conditional = _apply_conditional_headers(request, response, payload, etag=etag)
-        if conditional is not None:
-            return conditional  # type: ignore[return-value]
-        response.headers["ETag"] = etag
-        response.headers.setdefault("Cache-Control", "no-cache")
-        return payload
+        return _snapshot_response(request, _get_settings_snapshot(db, tenant_id=None))
 
 
 @router.put("", response_model=List[dict])
 def upsert_global_settings(
     payload: Dict[str, object],
-    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_admin_user),
-) -> List[dict]:
+) -> Response:
     if not isinstance(payload, dict):
         raise HTTPException(status_code=400, detail="Expected JSON object of key->value pairs")
     with _span("app_settings.upsert_global"):
@@ -568,41 +557,29 @@ def upsert_global_settings(
                 },
             )
         _invalidate_cache()
-        payload_snapshot, etag = _get_settings_payload(db, tenant_id=None)
-        response.headers["ETag"] = etag
-        response.headers.setdefault("Cache-Control", "no-cache")
-        return payload_snapshot
+        return _snapshot_response(None, _get_settings_snapshot(db, tenant_id=None))
 
 
 @router.get("/tenant", response_model=List[dict])
 def list_tenant_settings(
     request: Request,
-    response: Response,
     db: Session = Depends(get_db),
     user: User = Depends(get_settings_user),
-) -> List[dict] | Response:
+) -> Response:
     with _span("app_settings.list_tenant"):
         try:
             ensure_settings_read_access(db, user)
         except PermissionError as exc:
             raise HTTPException(status_code=403, detail=str(exc))
-        payload, etag = _get_settings_payload(db, tenant_id=user.tenant_id)
-        tenant_key = str(user.tenant_id) if user.tenant_id is not None else None
-        conditional = _apply_conditional_headers(request, response, payload, tenant_key=tenant_key, etag=etag)
-        if conditional is not None:
-            return conditional  # type: ignore[return-value]
-        response.headers["ETag"] = etag
-        response.headers.setdefault("Cache-Control", "no-cache")
-        return payload
+        return _snapshot_response(request, _get_settings_snapshot(db, tenant_id=user.tenant_id))
 
 
 @router.put("/tenant", response_model=List[dict])
 def upsert_tenant_settings(
     payload: Dict[str, object],
-    response: Response,
     db: Session = Depends(get_db),
     user: User = Depends(get_admin_user),
-) -> List[dict]:
+) -> Response:
     if not isinstance(payload, dict):
         raise HTTPException(status_code=400, detail="Expected JSON object of key->value pairs")
     with _span("app_settings.upsert_tenant"):
@@ -639,7 +616,4 @@ def upsert_tenant_settings(
                 },
             )
         _invalidate_cache(user.tenant_id)
-        payload_snapshot, etag = _get_settings_payload(db, tenant_id=user.tenant_id)
-        response.headers["ETag"] = etag
-        response.headers.setdefault("Cache-Control", "no-cache")
-        return payload_snapshot
+        return _snapshot_response(None, _get_settings_snapshot(db, tenant_id=user.tenant_id))
@@ -1,45 +1,38 @@
 """Audit log API endpoints."""
 
 import os
-import time
-import threading
-from collections import deque
 from datetime import datetime
-from typing import Any, Deque, Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_admin_user
-from app.database import get_db
+from app.db.read_replicas import get_read_db, read_session
+from app.db.session import get_db_session
 from app.models.audit_log import AuditLog
 from app.models.user import User
+from app.services.audit_export import FORMATS, ExportStats, export_chunks, format_available, iter_audit_batches
+from app.services.rate_limiter import get_rate_limiter
 from app.utils.audit import log_audit_event
+from app.utils.pagination import MAX_PAGE_SIZE, Page, PageParams, encode_cursor, estimate_count, paginate
 
 router = APIRouter(prefix="/audit-logs", tags=["Audit Logs"])
 
 _EXPORT_MAX = int(os.getenv("AUDIT_EXPORT_MAX_PER_MINUTE", "6"))
 _EXPORT_WINDOW = int(os.getenv("AUDIT_EXPORT_WINDOW_SECONDS", "60"))
-_EXPORT_LOCK = threading.Lock()
-_EXPORT_BUCKETS: Dict[int, Deque[float]] = {}
 
 
 def _enforce_export_rate_limit(user: User) -> None:
-    if _EXPORT_MAX <= 0:
-        return
-    now = time.monotonic()
-    key = int(getattr(user, "id", 0) or 0)
-    with _EXPORT_LOCK:
-        bucket = _EXPORT_BUCKETS.setdefault(key, deque())
-        while bucket and now - bucket[0] > _EXPORT_WINDOW:
-            bucket.popleft()
-        if len(bucket) >= _EXPORT_MAX:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many audit exports requested. Try again shortly.",
-            )
-        bucket.append(now)
+    key = str(int(getattr(user, "id", 0) or 0))
+    decision = get_rate_limiter().hit("audit-export", key, limit=_EXPORT_MAX, window=_EXPORT_WINDOW)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many audit exports requested. Try again shortly.",
+            headers={"Retry-After": str(decision.retry_after_seconds)},
+        )
 
 
 def _serialize_audit_log(log: AuditLog) -> Dict[str, Any]:
@@ -59,75 +52,78 @@ def _serialize_audit_log(log: AuditLog) -> Dict[str, Any]:
     return data
 
 
-@router.get("")
-def get_audit_logs(
-    user_id: Optional[int] = Query(None, description="Filter by user ID"),
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD) inclusive"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD) inclusive"),
-    result: Optional[str] = Query(None, description="Filter by result (success, failure, denied)"),
-    page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(50, ge=1, le=500, description="Number of records per page"),
-    db: Session = Depends(get_db),
-    _: User = Depends(get_admin_user),
-):
-    """Retrieve audit logs with optional filtering and pagination."""
-    query = db.query(AuditLog)
+def _filter_criteria(
+    user_id: Optional[int],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    result: Optional[str],
+) -> List[Any]:
+    criteria: List[Any] = []
     if user_id is not None:
-        query = query.filter(AuditLog.user_id == user_id)
+        criteria.append(AuditLog.user_id == user_id)
     try:
         if start_date:
             start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            query = query.filter(AuditLog.created_at >= start_dt)
+            criteria.append(AuditLog.created_at >= start_dt)
         if end_date:
             end_dt = datetime.strptime(end_date, "%Y-%m-%d")
             end_dt = end_dt.replace(hour=23, minute=59, second=59)
-            query = query.filter(AuditLog.created_at <= end_dt)
+            criteria.append(AuditLog.created_at <= end_dt)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format; expected YYYY-MM-DD")
     if result:
-        query = query.filter(AuditLog.result == result)
-    total = query.count()
-    logs: List[AuditLog] = (
-        query.order_by(AuditLog.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
-    return {
-        "total": total,
+        criteria.append(AuditLog.result == result)
+    return criteria
+
+
+@router.get("")
+def get_audit_logs(
+    user_id: Optional[int] = Query(None, description="Filter by user ID"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD) inclusive"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD) inclusive"),
+    result: Optional[str] = Query(None, description="Filter by result (success, failure, denied)"),
+    page: int = Query(1, ge=1, description="Page number (offset paging for older clients; prefer cursor)"),
+    page_size: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="Number of records per page"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page"),
+    include_estimate: bool = Query(False, description="Also return the planner's total_estimate"),
+    db: Session = Depends(get_read_db),
+    _: User = Depends(get_admin_user),
+):
+    """Retrieve audit logs with optional filtering and pagination.
+
+    Requests without a cursor carry the exact ``total``; follow
+    ``next_cursor`` for further pages so deep pages cost the same as the
+    first.  ``include_estimate`` adds ``total_estimate``, which is cheap on
+    large tables but only approximate.  ``page`` > 1 without a cursor still
+    works but scans the skipped rows.
+    """
+    query = db.query(AuditLog).filter(*_filter_criteria(user_id, start_date, end_date, result))
+    if cursor or page == 1:
+        result_page = paginate(query, AuditLog.created_at, AuditLog.id, PageParams(limit=page_size, cursor=cursor))
+    else:
+        logs: List[AuditLog] = (
+            query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size + 1)
+            .all()
+        )
+        # Hand the client a cursor so the pages after this one are keyset reads.
+        next_cursor = None
+        if len(logs) > page_size:
+            last = logs[page_size - 1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        result_page = Page(items=logs[:page_size], next_cursor=next_cursor)
+    body: Dict[str, Any] = {
         "page": page,
         "page_size": page_size,
-        "items": [_serialize_audit_log(log) for log in logs],
+        "items": [_serialize_audit_log(log) for log in result_page.items],
+        "next_cursor": result_page.next_cursor,
     }
-
-
-def _iter_csv(rows: List[Dict[str, Any]]):
-    # CSV header
-    header = ["timestamp", "user_id", "action", "result", "ip", "details"]
-    yield ",".join(header) + "\n"
-    for r in rows:
-        # Basic, safe CSV escaping for double-quotes
-        def esc(v: object) -> str:
-            s = "" if v is None else str(v)
-            s = s.replace("\r", " ").replace("\n", " ")
-            s = s.replace('"', '""')
-            return f'"{s}"'
-
-        details_value = r.get("details", "")
-        yield ",".join(
-            [
-                esc(
-                    r.get("created_at")
-                    if isinstance(r.get("created_at"), str)
-                    else r.get("timestamp", "")
-                ),
-                esc(r.get("user_id")),
-                esc(r.get("action")),
-                esc(r.get("result")),
-                esc(r.get("ip", "")),
-                esc(details_value),
-            ]
-        ) + "\n"
+    if cursor is None:
+        body["total"] = query.order_by(None).count()
+    if include_estimate:
+        body["total_estimate"] = estimate_count(query)
+    return body
 
 
 @router.get("/export")
@@ -136,50 +132,52 @@ def export_audit_logs(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     result: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$", description="csv, ndjson or parquet"),
+    gzip: bool = Query(False, description="Gzip-compress the file"),
     current_user: User = Depends(get_admin_user),
 ):
-    """Stream CSV export of audit logs with filters."""
+    """Stream an export of audit logs with filters.
+
+    Rows come from a server-side cursor on the replica router, batch by
+    batch, so memory does not grow with the date range.  The export's own
+    audit entry is written to the primary once the stream ends.
+    """
     _enforce_export_rate_limit(current_user)
-    query = db.query(AuditLog)
-    if user_id is not None:
-        query = query.filter(AuditLog.user_id == user_id)
-    try:
-        if start_date:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            query = query.filter(AuditLog.created_at >= start_dt)
-        if end_date:
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-            end_dt = end_dt.replace(hour=23, minute=59, second=59)
-            query = query.filter(AuditLog.created_at <= end_dt)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid date format; expected YYYY-MM-DD")
-    if result:
-        query = query.filter(AuditLog.result == result)
-    query = query.order_by(AuditLog.created_at.desc())
-    rows = query.all()
-    row_dicts = [_serialize_audit_log(row) for row in rows]
-    try:
-        log_audit_event(
-            db,
-            user_id=current_user.id,
-            action="audit_logs.export",
-            result="success",
-            ip=None,
-            details={
-                "filters": {
-                    "user_id": user_id,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "result": result,
-                },
-                "row_count": len(row_dicts),
-            },
+    criteria = _filter_criteria(user_id, start_date, end_date, result)
+    if not format_available(format):
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"{format} export is not supported on this server",
         )
-    except Exception:
-        pass
+    export_format = FORMATS[format]
+    filename = f"audit_logs.{export_format.extension}" + (".gz" if gzip else "")
+    filters = {"user_id": user_id, "start_date": start_date, "end_date": end_date, "result": result}
+
+    def _body():
+        stats = ExportStats()
+        try:
+            with read_session() as db:
+                yield from export_chunks(iter_audit_batches(db, criteria), format, compress=gzip, stats=stats)
+        finally:
+            _record_export(current_user.id, filters, format, gzip, stats)
+
     return StreamingResponse(
-        _iter_csv(row_dicts),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=audit_logs.csv"},
+        _body(),
+        media_type="application/gzip" if gzip else export_format.media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
+
+
+def _record_export(user_id: int, filters: Dict[str, Any], fmt: str, gzip: bool, stats: ExportStats) -> None:
+    try:
+        with get_db_session() as primary:
+            log_audit_event(
+                primary,
+                user_id=user_id,
+                action="audit_logs.export",
+                result="success" if stats.completed else "failure",
+                ip=None,
+                details={"filters": filters, "format": fmt, "gzip": gzip, "row_count": stats.rows},
+            )
+    except Exception:
+        pass
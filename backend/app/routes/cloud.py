@@ -5,13 +5,15 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
 from sqlalchemy.orm import Session
 
+from app.cache.response import cached_response, invalidate_on_commit
 from app.core.auth import get_current_user
 from app.database import get_db
 from app.models.cloud_account import CloudAccount, CloudAsset
 from app.models.user import User
+from app.utils.pagination import PageParams, apply_page_headers, page_params, paginate
 from app.schemas.cloud import (
     CloudAccountCreate,
     CloudAccountRead,
@@ -22,6 +24,10 @@ from app.schemas.cloud import (
 
 router = APIRouter(prefix="/cloud", tags=["Cloud Discovery"])
 
+# Assets carry no tenant_id, so asset writes invalidate every tenant's inventory.
+invalidate_on_commit(CloudAccount, "cloud")
+invalidate_on_commit(CloudAsset, "cloud")
+
 
 def _resolve_tenant(user: User, tenant_id: Optional[int]) -> int:
     if user.tenant_id is not None:
@@ -95,9 +101,11 @@ def sync_account(
 
 @router.get("/assets", response_model=List[CloudAssetRead])
 def list_assets(
+    response: Response,
     tenant_id: Optional[int] = Query(None),
     account_id: Optional[int] = Query(None),
     asset_type: Optional[str] = Query(None),
+    params: PageParams = Depends(page_params()),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> List[CloudAssetRead]:
@@ -107,8 +115,9 @@ def list_assets(
         query = query.filter(CloudAsset.account_id == account_id)
     if asset_type:
         query = query.filter(CloudAsset.asset_type == asset_type)
-    assets = query.order_by(CloudAsset.discovered_at.desc()).all()
-    return [CloudAssetRead.from_orm(asset) for asset in assets]
+    page = paginate(query, CloudAsset.discovered_at, CloudAsset.id, params)
+    apply_page_headers(response, page)
+    return [CloudAssetRead.from_orm(asset) for asset in page.items]
 
 
 @router.post("/assets", response_model=CloudAssetRead, status_code=201)
@@ -142,6 +151,7 @@ def create_asset(
 
 
 @router.get("/inventory", response_model=CloudInventoryResponse)
+@cached_response(tags=("cloud",), ttl=60)
 def inventory(
     tenant_id: Optional[int] = Query(None),
     db: Session = Depends(get_db),
@@ -9,19 +9,27 @@ tenant's compliance data.
 """
 
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta, date
 
-from app.database import get_db
-from app.core.auth import get_current_user
+from app.cache.response import cached_response, invalidate_on_commit
+from app.database import get_async_db, get_db
+from app.db.read_replicas import get_read_db
+from app.core.auth import get_current_user, get_current_user_async
+from app.models.compliance_daily_rollup import ComplianceDailyRollup
 from app.models.compliance_result import ComplianceResult
 from app.models.user import User
 from app.schemas.compliance import ComplianceTrendInsights, ComplianceTrendPoint
+from app.services import compliance_rollups  # noqa: F401  (keeps rollups in step with result writes)
 
 
 router = APIRouter(prefix="/compliance", tags=["Compliance"])
 
+invalidate_on_commit(ComplianceResult, "compliance")
+
 
 def _build_trend_rows(
     *,
@@ -35,26 +43,27 @@ def _build_trend_rows(
     buckets = [start_date + timedelta(days=i) for i in range(days)]
     counts: Dict[date, Dict[str, int]] = {bucket: {"pass": 0, "fail": 0} for bucket in buckets}
 
-    query = db.query(ComplianceResult).filter(
-        ComplianceResult.recorded_at >= datetime.combine(start_date, datetime.min.time()),
-        ComplianceResult.recorded_at <= datetime.combine(end_date, datetime.max.time()),
+    # Daily rollups: at most one row per (tenant, module, day), however many
+    # results were recorded.
+    query = db.query(
+        ComplianceDailyRollup.day,
+        func.sum(ComplianceDailyRollup.pass_count).label("passed"),
+        func.sum(ComplianceDailyRollup.fail_count).label("failed"),
+    ).filter(
+        ComplianceDailyRollup.day >= start_date,
+        ComplianceDailyRollup.day <= end_date,
     )
     if current_user.tenant_id is not None:
-        query = query.filter(ComplianceResult.tenant_id == current_user.tenant_id)
+        query = query.filter(ComplianceDailyRollup.tenant_id == current_user.tenant_id)
     if module:
-        query = query.filter(ComplianceResult.module == module)
+        query = query.filter(ComplianceDailyRollup.module == module)
 
-    results = query.all()
-    for row in results:
-        recorded_day = row.recorded_at.date()
-        bucket = counts.get(recorded_day)
+    for row in query.group_by(ComplianceDailyRollup.day):
+        bucket = counts.get(row.day)
         if not bucket:
             continue
-        status = (row.status or "").strip().lower()
-        if status == "pass":
-            bucket["pass"] += 1
-        else:
-            bucket["fail"] += 1
+        bucket["pass"] += int(row.passed or 0)
+        bucket["fail"] += int(row.failed or 0)
 
     return [
         {
@@ -67,17 +76,25 @@ def _build_trend_rows(
 
 
 @router.get("/trends", response_model=List[ComplianceTrendPoint])
-def compliance_trends(
+@cached_response(tags=("compliance",), ttl=60)
+async def compliance_trends(
     days: int = Query(30, ge=1, le=365, description="Number of days to include in the trend"),
     module: Optional[str] = Query(None, description="Filter results by module name"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ) -> List[Dict[str, object]]:
-    """Return compliance pass/fail counts per day over a time window."""
-    return _build_trend_rows(db=db, current_user=current_user, days=days, module=module)
+    """Return compliance pass/fail counts per day over a time window.
+
+    Reads the primary, not a replica: a miss right after a ``compliance``
+    tag bump must not cache a lagging replica's view for the full TTL.
+    """
+    return await db.run_sync(
+        lambda session: _build_trend_rows(db=session, current_user=current_user, days=days, module=module)
+    )
 
 
 @router.get("/trends/insights", response_model=ComplianceTrendInsights)
+@cached_response(tags=("compliance",), ttl=60)
 def compliance_trend_insights(
     days: int = Query(30, ge=1, le=365, description="Number of days to include in the trend"),
     module: Optional[str] = Query(None, description="Filter results by module name"),
@@ -114,7 +131,7 @@ def list_compliance_results(
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results to return"),
     module: Optional[str] = Query(None, description="Filter by module name"),
     status_filter: Optional[str] = Query(None, description="Filter by status (pass/fail)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ) -> List[Dict[str, object]]:
     query = db.query(ComplianceResult)
@@ -142,4 +159,4 @@ def list_compliance_results(
             }
         )
     return results
-
+
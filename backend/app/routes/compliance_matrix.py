@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.cache.response import cached_response, invalidate_on_commit
 from app.core.auth import get_current_user
 from app.database import get_db
 from app.models.compliance_framework import ComplianceFramework
@@ -16,12 +17,17 @@ from app.schemas.compliance import (
     ComplianceFrameworkCreate,
     ComplianceFrameworkRead,
     ComplianceMatrixResponse,
+    ComplianceMatrixSparseResponse,
     ComplianceRuleCreate,
     ComplianceRuleRead,
 )
+from app.services.compliance_matrix import get_matrix
 
 router = APIRouter(prefix="/compliance-matrix", tags=["Compliance"])
 
+for _model in (ComplianceFramework, ComplianceRule, ComplianceRuleFramework):
+    invalidate_on_commit(_model, "compliance-matrix")
+
 
 def _ensure_admin(user: User) -> None:
     if user.role not in {"admin", "super_admin"}:
@@ -34,8 +40,7 @@ def list_frameworks(
     current_user: User = Depends(get_current_user),
 ) -> List[ComplianceFrameworkRead]:
     _ensure_admin(current_user)
-    frameworks = db.query(ComplianceFramework).order_by(ComplianceFramework.name.asc()).all()
-    return [ComplianceFrameworkRead.from_orm(framework) for framework in frameworks]
+    return list(get_matrix(db).frameworks)
 
 
 @router.post("/frameworks", response_model=ComplianceFrameworkRead, status_code=201)
@@ -67,28 +72,10 @@ def list_rules(
     current_user: User = Depends(get_current_user),
 ) -> List[ComplianceRuleRead]:
     _ensure_admin(current_user)
-    query = db.query(ComplianceRule)
+    matrix = get_matrix(db)
     if framework_id is not None:
-        query = (
-            query.join(ComplianceRuleFramework)
-            .filter(ComplianceRuleFramework.framework_id == framework_id)
-        )
-    rules = query.order_by(ComplianceRule.control_id.asc()).all()
-    response: List[ComplianceRuleRead] = []
-    for rule in rules:
-        framework_ids = [link.framework_id for link in rule.framework_links]
-        response.append(
-            ComplianceRuleRead(
-                id=rule.id,
-                control_id=rule.control_id,
-                title=rule.title,
-                description=rule.description,
-                category=rule.category,
-                service_area=rule.service_area,
-                framework_ids=framework_ids,
-            )
-        )
-    return response
+        return matrix.rules_for(framework_id)
+    return list(matrix.rules)
 
 
 @router.post("/rules", response_model=ComplianceRuleRead, status_code=201)
@@ -108,12 +95,16 @@ def create_rule(
         category=payload.category,
         service_area=payload.service_area,
     )
+    framework_ids = list(payload.framework_ids or [])
+    if framework_ids:
+        query = db.query(ComplianceFramework.id).filter(ComplianceFramework.id.in_(framework_ids))
+        known = {row.id for row in query}
+        missing = next((framework_id for framework_id in framework_ids if framework_id not in known), None)
+        if missing is not None:
+            raise HTTPException(status_code=404, detail=f"Framework {missing} not found")
     db.add(rule)
     db.flush()
-    for idx, framework_id in enumerate(payload.framework_ids or []):
-        framework = db.query(ComplianceFramework).filter(ComplianceFramework.id == framework_id).first()
-        if not framework:
-            raise HTTPException(status_code=404, detail=f"Framework {framework_id} not found")
+    for idx, framework_id in enumerate(framework_ids):
         db.add(
             ComplianceRuleFramework(
                 rule_id=rule.id,
@@ -122,8 +113,6 @@ def create_rule(
             )
         )
     db.commit()
-    db.refresh(rule)
-    framework_ids = [link.framework_id for link in rule.framework_links]
     return ComplianceRuleRead(
         id=rule.id,
         control_id=rule.control_id,
@@ -135,26 +124,17 @@ def create_rule(
     )
 
 
-@router.get("/matrix", response_model=ComplianceMatrixResponse)
+@router.get("/matrix", response_model=Union[ComplianceMatrixResponse, ComplianceMatrixSparseResponse])
+@cached_response(tags=("compliance-matrix",), ttl=300)
 def compliance_matrix(
+    format: str = Query(
+        "dense",
+        pattern="^(dense|sparse)$",
+        description="dense: framework ids per rule; sparse: [rule, framework] index pairs",
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> ComplianceMatrixResponse:
+) -> Union[ComplianceMatrixResponse, ComplianceMatrixSparseResponse]:
     _ensure_admin(current_user)
-    frameworks = db.query(ComplianceFramework).order_by(ComplianceFramework.name.asc()).all()
-    rules = db.query(ComplianceRule).order_by(ComplianceRule.control_id.asc()).all()
-    return ComplianceMatrixResponse(
-        frameworks=[ComplianceFrameworkRead.from_orm(fw) for fw in frameworks],
-        rules=[
-            ComplianceRuleRead(
-                id=rule.id,
-                control_id=rule.control_id,
-                title=rule.title,
-                description=rule.description,
-                category=rule.category,
-                service_area=rule.service_area,
-                framework_ids=[link.framework_id for link in rule.framework_links],
-            )
-            for rule in rules
-        ],
-    )
+    matrix = get_matrix(db)
+    return matrix.sparse() if format == "sparse" else matrix.dense()
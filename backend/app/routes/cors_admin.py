@@ -6,6 +6,7 @@ from app.database import get_db
 from app.models.tenant_cors_origin import TenantCORSOrigin
 from app.models.user import User
 from app.core.auth import get_current_user
+from app.services import cors_policy
 
 router = APIRouter(prefix="/admin/cors", tags=["Admin CORS"])
 
@@ -51,6 +52,7 @@ def add_origin(
         raise HTTPException(status_code=400, detail="origin already exists for tenant")
     row = TenantCORSOrigin(tenant_id=tenant_id, origin=origin, is_global=is_global, enabled=True)
     db.add(row); db.commit(); db.refresh(row)
+    cors_policy.invalidate()
     return {"message": "origin added", "origin": _serialize(row)}
 
 @router.patch("/{origin_id}", response_model=dict)
@@ -70,6 +72,7 @@ def update_origin(
     if "origin" in data and (new := (data["origin"] or "").strip()):
         row.origin = new
     db.commit(); db.refresh(row)
+    cors_policy.invalidate()
     return {"message": "origin updated", "origin": _serialize(row)}
 
 @router.delete("/{origin_id}", response_model=dict)
@@ -82,4 +85,5 @@ def delete_origin(
     if not row:
         raise HTTPException(status_code=404, detail="origin not found")
     db.delete(row); db.commit()
+    cors_policy.invalidate()
     return {"message": "origin deleted", "deleted_id": origin_id}
@@ -1,23 +1,30 @@
 """Feature flags bootstrap endpoint.
 
-Returns a map of UI/feature flags based on role/tenant and optional app settings.
+Returns every UI/feature flag for the caller in one response: role-based
+defaults overlaid with the tenant's effective ``AppSetting`` flags, served
+from the cached resolver in :mod:`app.services.feature_flags`.  Responses
+carry an ETag so the frontend can poll with ``If-None-Match`` for free.
 """
 
 from __future__ import annotations
 
-from typing import Dict, List, Any
+import logging
+from typing import Any, Dict
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_user
-from app.models.user import User
-from app.models.app_setting import AppSetting
 from app.database import get_db
+from app.models.user import User
+from app.services.feature_flags import get_feature_flags
 
+logger = logging.getLogger("tenantra.features")
 
 router = APIRouter(prefix="/features", tags=["Public Settings"])
 
+_ADMIN_ROLES = {"admin", "administrator", "super_admin", "system_admin", "msp_admin"}
+
 
 def _deep_merge(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
     for k, v in (src or {}).items():
@@ -28,14 +35,9 @@ def _deep_merge(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
     return dst
 
 
-@router.get("")
-def get_features(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> Dict[str, bool]:
-    is_admin = current_user.role in {"admin", "administrator", "super_admin", "system_admin", "msp_admin"}
-    # Defaults; extend with AppSetting-driven toggles as needed.
-    flags: Dict[str, Any] = {
+def _defaults(is_admin: bool) -> Dict[str, Any]:
+    # Extend with AppSetting-driven toggles as needed.
+    return {
         "notificationHistory": True,
         "auditLogs": is_admin,
         "threatIntel": True,
@@ -49,52 +51,29 @@ def get_features(
         "scanSchedules": True,
         "reports": False,
     }
-    # Overlay with AppSetting flags (global first, then tenant overrides)
+
+
+@router.get("")
+def get_features(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    is_admin = current_user.role in _ADMIN_ROLES
+    flags = _defaults(is_admin)
+    version = "defaults"
     try:
-        # Global nested map (key == 'features')
-        q_global_map: List[AppSetting] = (
-            db.query(AppSetting)
-            .filter(AppSetting.tenant_id.is_(None))
-            .filter(AppSetting.key == "features")
-            .all()
-        )
-        for row in q_global_map:
-            if isinstance(row.value, dict):
-                _deep_merge(flags, row.value)
-        # Global individual flags (key starts with 'features.')
-        q_global: List[AppSetting] = (
-            db.query(AppSetting)
-            .filter(AppSetting.tenant_id.is_(None))
-            .filter(AppSetting.key.like("features.%"))
-            .all()
-        )
-        for row in q_global:
-            name = row.key.split(".", 1)[1]
-            if isinstance(row.value, (bool, int)):
-                flags[name] = bool(row.value)
-        if current_user.tenant_id is not None:
-            # Tenant nested map
-            q_tenant_map: List[AppSetting] = (
-                db.query(AppSetting)
-                .filter(AppSetting.tenant_id == current_user.tenant_id)
-                .filter(AppSetting.key == "features")
-                .all()
-            )
-            for row in q_tenant_map:
-                if isinstance(row.value, dict):
-                    _deep_merge(flags, row.value)
-            # Tenant individual flags
-            q_tenant: List[AppSetting] = (
-                db.query(AppSetting)
-                .filter(AppSetting.tenant_id == current_user.tenant_id)
-                .filter(AppSetting.key.like("features.%"))
-                .all()
-            )
-            for row in q_tenant:
-                name = row.key.split(".", 1)[1]
-                if isinstance(row.value, (bool, int)):
-                    flags[name] = bool(row.value)
+        effective = get_feature_flags(db, current_user.tenant_id)
+        _deep_merge(flags, effective.as_dict())
+        version = effective.version
     except Exception:
         # Non-fatal: keep defaults when settings are unavailable
-        pass
+        logger.debug("Unable to load feature flags; serving defaults", exc_info=True)
+
+    etag = f'W/"{version}-{"admin" if is_admin else "user"}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)  # type: ignore[return-value]
+    response.headers.update(headers)
     return flags
@@ -1,13 +1,10 @@
 from __future__ import annotations
 
-import asyncio
 import json
 import logging
 import os
-import time
-from collections import deque
 from contextlib import nullcontext
-from typing import Deque, Dict, Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
@@ -16,11 +13,12 @@ from urllib.parse import urlparse
 
 from app.core.auth import get_admin_user
 from app.database import get_db
-from app.models.app_setting import AppSetting
 from app.models.user import User
 from app.utils.audit import log_audit_event
 from app.services.grafana import get_base_url, get_credentials
 from app.services.grafana_warnings import record_grafana_warning
+from app.services.rate_limiter import get_rate_limiter
+from app.services.settings_view import get_settings
 
 
 router = APIRouter()
@@ -30,9 +28,7 @@ _DEFAULT_MAX_PROXY_BODY_BYTES = int(os.getenv("GRAFANA_PROXY_MAX_BODY", str(1 *
 _DEFAULT_RATE_MAX = int(os.getenv("GRAFANA_PROXY_MAX_REQUESTS_PER_MINUTE", "60"))
 _DEFAULT_RATE_WINDOW = int(os.getenv("GRAFANA_PROXY_WINDOW_SECONDS", "60"))
 PROXY_TIMEOUT = httpx.Timeout(connect=5.0, read=20.0, write=20.0, pool=5.0)
-
-_RATE_LOCK = asyncio.Lock()
-_RATE_BUCKETS: Dict[str, Deque[float]] = {}
+_RATE_NAMESPACE = "grafana-proxy"
 
 try:
     from opentelemetry import trace as otel_trace
@@ -48,34 +44,15 @@ def _span(name: str):
     return nullcontext()
 
 
+# Proxy limits are operator settings: only global rows apply.
 def _resolve_max_body_bytes(db: Session) -> int:
-    limit = _DEFAULT_MAX_PROXY_BODY_BYTES
-    row = (
-        db.query(AppSetting)
-        .filter(AppSetting.tenant_id.is_(None), AppSetting.key == "grafana.proxy.max_body_bytes")
-        .first()
-    )
-    if row and row.value not in (None, "", False):
-        try:
-            limit = int(row.value)
-        except (TypeError, ValueError):
-            logger.warning("Invalid grafana.proxy.max_body_bytes setting; using default", exc_info=False)
+    limit = get_settings(db).get_int("grafana.proxy.max_body_bytes", _DEFAULT_MAX_PROXY_BODY_BYTES)
     return max(limit, 1)
 
 
 def _resolve_rate_limit(db: Session) -> Tuple[int, int]:
-    limit = _DEFAULT_RATE_MAX
+    limit = get_settings(db).get_int("grafana.proxy.max_requests_per_minute", _DEFAULT_RATE_MAX)
     window = max(_DEFAULT_RATE_WINDOW, 1)
-    row = (
-        db.query(AppSetting)
-        .filter(AppSetting.tenant_id.is_(None), AppSetting.key == "grafana.proxy.max_requests_per_minute")
-        .first()
-    )
-    if row and row.value not in (None, "", False):
-        try:
-            limit = int(row.value)
-        except (TypeError, ValueError):
-            logger.warning("Invalid grafana.proxy.max_requests_per_minute; using default", exc_info=False)
     return max(limit, 0), window
 
 
@@ -89,30 +66,26 @@ async def _enforce_rate_limit(
     if limit <= 0:
         return
     key = f"{user.tenant_id or 'global'}:{user.id}"
-    now = time.monotonic()
-    async with _RATE_LOCK:
-        bucket = _RATE_BUCKETS.setdefault(key, deque())
-        while bucket and now - bucket[0] > window:
-            bucket.popleft()
-        if len(bucket) >= limit:
-            log_audit_event(
-                db,
-                user_id=user.id,
-                action="grafana.proxy",
-                result="denied",
-                ip=client_host,
-                details={
-                    "reason": "rate-limit",
-                    "path": path,
-                    "limit": limit,
-                    "window_seconds": window,
-                },
-            )
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Grafana proxy rate limit exceeded",
-            )
-        bucket.append(now)
+    decision = await get_rate_limiter().ahit(_RATE_NAMESPACE, key, limit=limit, window=window)
+    if not decision.allowed:
+        log_audit_event(
+            db,
+            user_id=user.id,
+            action="grafana.proxy",
+            result="denied",
+            ip=client_host,
+            details={
+                "reason": "rate-limit",
+                "path": path,
+                "limit": limit,
+                "window_seconds": window,
+            },
+        )
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Grafana proxy rate limit exceeded",
+            headers={"Retry-After": str(decision.retry_after_seconds)},
+        )
 
 
 def _basic_auth_headers(db: Session, tenant_id: Optional[int]) -> Dict[str, str]:
@@ -8,10 +8,12 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.auth import get_current_user
-from app.database import get_db
+from app.core.auth import get_current_user, get_current_user_async
+from app.database import get_async_db, get_db
+from app.db.read_replicas import get_read_db
 from app.models.agent import Agent
 from app.models.boot_config import BootConfig
 from app.models.integrity_event import IntegrityEvent
@@ -21,7 +23,6 @@ from app.models.service_baseline import ServiceBaseline
 from app.models.service_snapshot import ServiceSnapshot
 from app.models.user import User
 from app.models.notification import Notification
-from app.models.app_setting import AppSetting
 from app.models.registry_baseline import RegistryBaseline
 from app.models.task_baseline import TaskBaseline
 from app.schemas.integrity import (
@@ -39,6 +40,7 @@ from app.schemas.persistence import (
     TaskSnapshotCreate,
     TaskSnapshotRead,
 )
+from app.services.settings_view import SettingsView, get_settings_async
 
 router = APIRouter(prefix="/integrity", tags=["Integrity"])
 
@@ -62,22 +64,9 @@ def _validate_agent(db: Session, agent_id: int, tenant_id: int) -> Agent:
     return agent
 
 
-def _resolve_alert_recipients(db: Session, tenant_id: int) -> list[str]:
-    recipients: list[str] = []
-    try:
-        rows = (
-            db.query(AppSetting)
-            .filter(AppSetting.tenant_id == tenant_id, AppSetting.key == "integrity.alert.email.to")
-            .all()
-        )
-        for r in rows:
-            v = r.value
-            if isinstance(v, list):
-                recipients.extend([str(x) for x in v])
-            elif isinstance(v, str):
-                recipients.append(v)
-    except Exception:
-        pass
+def _resolve_alert_recipients(db: Session, tenant_id: int, settings: SettingsView) -> list[str]:
+    # Recipients are tenant-only: a global row would receive every tenant's alerts.
+    recipients: list[str] = list(settings.tenant_only().get_str_list("integrity.alert.email.to", sep=None))
     if not recipients:
         try:
             admins = (
@@ -128,33 +117,29 @@ def list_registry_snapshots(
 
 
 @router.post("/registry", response_model=List[RegistrySnapshotRead])
-def ingest_registry_snapshots(
+async def ingest_registry_snapshots(
     payload: List[RegistrySnapshotCreate],
     tenant_id: Optional[int] = Query(None, description="Tenant scope for super admins"),
     full_sync: bool = Query(False, description="Indicates the payload represents a full hive snapshot"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ) -> List[RegistrySnapshotRead]:
     """Persist registry snapshots and generate drift events."""
-
     resolved_tenant = _resolve_tenant_id(current_user, tenant_id)
+    settings = await get_settings_async(db, resolved_tenant)
+    return await db.run_sync(_ingest_registry_snapshots, payload, resolved_tenant, settings, full_sync)
+
+
+def _ingest_registry_snapshots(
+    db: Session,
+    payload: List[RegistrySnapshotCreate],
+    resolved_tenant: int,
+    settings: SettingsView,
+    full_sync: bool,
+) -> List[RegistrySnapshotRead]:
     stored: List[RegistrySnapshot] = []
     # tenant-backed ignore prefixes (merge with env)
-    tenant_ignore_prefixes: List[str] = []
-    try:
-        tsi = (
-            db.query(AppSetting)
-            .filter(AppSetting.tenant_id == resolved_tenant, AppSetting.key == "integrity.registry.ignore_prefixes")
-            .all()
-        )
-        for r in tsi:
-            v = r.value
-            if isinstance(v, list):
-                tenant_ignore_prefixes.extend([str(x).lower() for x in v])
-            elif isinstance(v, str):
-                tenant_ignore_prefixes.extend([p.strip().lower() for p in v.split(",") if p.strip()])
-    except Exception:
-        pass
+    tenant_ignore_prefixes = [p.lower() for p in settings.get_str_list("integrity.registry.ignore_prefixes")]
 
     # Optionally collect the universe of keys for full-sync detection.
     observed_identity = set()
@@ -253,7 +238,7 @@ def ingest_registry_snapshots(
             )
             if is_baseline_critical:
                 try:
-                    for addr in _resolve_alert_recipients(db, resolved_tenant):
+                    for addr in _resolve_alert_recipients(db, resolved_tenant, settings):
                         db.add(Notification(tenant_id=resolved_tenant, recipient_id=None, recipient_email=addr, title=f"Critical registry drift: {entry.key_path}", message="Baseline-critical registry change detected", status="queued", severity="critical"))
                 except Exception:
                     pass
@@ -279,7 +264,7 @@ def ingest_registry_snapshots(
             )
             if is_baseline_critical:
                 try:
-                    for addr in _resolve_alert_recipients(db, resolved_tenant):
+                    for addr in _resolve_alert_recipients(db, resolved_tenant, settings):
                         db.add(Notification(tenant_id=resolved_tenant, recipient_id=None, recipient_email=addr, title=f"Critical registry drift: {entry.key_path}", message="Baseline-critical registry change detected", status="queued", severity="critical"))
                 except Exception:
                     pass
@@ -362,13 +347,7 @@ def ingest_registry_snapshots(
                     pass
                 if sev == "critical":
                     try:
-                        recipients = []
-                        for r in db.query(AppSetting).filter(AppSetting.tenant_id == resolved_tenant, AppSetting.key == "integrity.alert.email.to").all():
-                            v = r.value
-                            if isinstance(v, list):
-                                recipients.extend([str(x) for x in v])
-                            elif isinstance(v, str):
-                                recipients.append(v)
+                        recipients = settings.tenant_only().get_str_list("integrity.alert.email.to", sep=None)
                         if not recipients:
                             recipients = ["admin@example.com"]
                         for addr in recipients:
@@ -498,11 +477,20 @@ def list_boot_configs(
 
 
 @router.post("/boot", response_model=BootConfigRead)
-def ingest_boot_config(
+async def ingest_boot_config(
     payload: BootConfigCreate,
     tenant_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> BootConfigRead:
+    return await db.run_sync(_ingest_boot_config, payload, current_user, tenant_id)
+
+
+def _ingest_boot_config(
+    db: Session,
+    payload: BootConfigCreate,
+    current_user: User,
+    tenant_id: Optional[int],
 ) -> BootConfigRead:
     resolved_tenant = _resolve_tenant_id(current_user, tenant_id)
     _validate_agent(db, payload.agent_id, resolved_tenant)
@@ -561,7 +549,7 @@ def list_integrity_events(
     event_type: Optional[str] = Query(None),
     severity: Optional[str] = Query(None),
     limit: int = Query(200, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ) -> List[IntegrityEventRead]:
     tenant_id = current_user.tenant_id
@@ -579,11 +567,20 @@ def list_integrity_events(
 
 
 @router.post("/events", response_model=IntegrityEventRead)
-def create_integrity_event(
+async def create_integrity_event(
     payload: IntegrityEventCreate,
     tenant_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> IntegrityEventRead:
+    return await db.run_sync(_create_integrity_event, payload, current_user, tenant_id)
+
+
+def _create_integrity_event(
+    db: Session,
+    payload: IntegrityEventCreate,
+    current_user: User,
+    tenant_id: Optional[int],
 ) -> IntegrityEventRead:
     resolved_tenant = _resolve_tenant_id(current_user, tenant_id)
     if payload.agent_id:
@@ -678,30 +675,26 @@ def list_services(
 
 
 @router.post("/services", response_model=List[ServiceSnapshotRead])
-def ingest_services(
+async def ingest_services(
     payload: List[ServiceSnapshotCreate],
     tenant_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ) -> List[ServiceSnapshotRead]:
     resolved_tenant = _resolve_tenant_id(current_user, tenant_id)
+    settings = await get_settings_async(db, resolved_tenant)
+    return await db.run_sync(_ingest_services, payload, resolved_tenant, settings)
+
+
+def _ingest_services(
+    db: Session,
+    payload: List[ServiceSnapshotCreate],
+    resolved_tenant: int,
+    settings: SettingsView,
+) -> List[ServiceSnapshotRead]:
     stored: List[ServiceSnapshot] = []
     # tenant-backed ignore names (merge with env)
-    tenant_ignore_names: List[str] = []
-    try:
-        tsi = (
-            db.query(AppSetting)
-            .filter(AppSetting.tenant_id == resolved_tenant, AppSetting.key == "integrity.service.ignore_names")
-            .all()
-        )
-        for r in tsi:
-            v = r.value
-            if isinstance(v, list):
-                tenant_ignore_names.extend([str(x).lower() for x in v])
-            elif isinstance(v, str):
-                tenant_ignore_names.extend([p.strip().lower() for p in v.split(",") if p.strip()])
-    except Exception:
-        pass
+    tenant_ignore_names = [name.lower() for name in settings.get_str_list("integrity.service.ignore_names")]
     for entry in payload:
         _validate_agent(db, entry.agent_id, resolved_tenant)
         snapshot = ServiceSnapshot(
@@ -730,17 +723,8 @@ def ingest_services(
         db.flush()
         stored.append(snapshot)
         # merge agent-specific ignores
-        agent_ignores: List[str] = []
-        try:
-            key = f"integrity.service.ignore_names.agent.{entry.agent_id}"
-            for r in db.query(AppSetting).filter(AppSetting.tenant_id == resolved_tenant, AppSetting.key == key).all():
-                v = r.value
-                if isinstance(v, list):
-                    agent_ignores.extend([str(x).lower() for x in v])
-                elif isinstance(v, str):
-                    agent_ignores.extend([p.strip().lower() for p in v.split(",") if p.strip()])
-        except Exception:
-            pass
+        key = f"integrity.service.ignore_names.agent.{entry.agent_id}"
+        agent_ignores = [name.lower() for name in settings.get_str_list(key)]
 
         if snapshot.name and (snapshot.name.lower() in tenant_ignore_names or snapshot.name.lower() in agent_ignores):
             continue
@@ -883,11 +867,20 @@ def list_tasks(
 
 
 @router.post("/tasks", response_model=List[TaskSnapshotRead])
-def ingest_tasks(
+async def ingest_tasks(
     payload: List[TaskSnapshotCreate],
     tenant_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> List[TaskSnapshotRead]:
+    return await db.run_sync(_ingest_tasks, payload, current_user, tenant_id)
+
+
+def _ingest_tasks(
+    db: Session,
+    payload: List[TaskSnapshotCreate],
+    current_user: User,
+    tenant_id: Optional[int],
 ) -> List[TaskSnapshotRead]:
     resolved_tenant = _resolve_tenant_id(current_user, tenant_id)
     stored: List[TaskSnapshot] = []
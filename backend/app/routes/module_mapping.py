@@ -8,6 +8,7 @@ from app.models.agent import Agent
 from app.models.user import User
 from app.core.auth import get_current_user
 from app.utils.rbac import role_required
+from app.services import agent_config
 
 router = APIRouter(prefix="/modules", tags=["Module Mapping"])
 
@@ -66,6 +67,8 @@ def update_mappings(
                 )
             )
     db.commit()
+    for agent_id in {entry.agent_id for entry in payload}:
+        agent_config.invalidate_agent(agent_id)
     return {"updated": len(payload)}
 
 
@@ -93,4 +96,5 @@ def delete_mapping(
     if mapping:
         db.delete(mapping)
         db.commit()
+        agent_config.invalidate_agent(agent_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
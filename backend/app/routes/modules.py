@@ -6,11 +6,13 @@ from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.cache.response import cached_response, invalidate_on_commit
 from app.core.auth import get_current_user
 from app.database import get_db
 from app.models.module import Module, ModuleStatus
 from app.models.tenant_module import TenantModule
 from app.models.user import User
+from app.services import agent_config
 from app.services.module_registry import (
     get_parameter_schema_for_module,
     get_runner_for_module,
@@ -19,6 +21,9 @@ from app.utils.rbac import role_required
 
 router = APIRouter(prefix="/modules", tags=["Modules"])
 
+invalidate_on_commit(Module, "modules")
+invalidate_on_commit(TenantModule, "modules")
+
 
 def _serialize_module(module: Module, enabled: bool) -> Dict[str, object]:
     last_update = module.last_update.isoformat() if module.last_update else None
@@ -74,6 +79,7 @@ def _resolve_status(value: Optional[str]) -> ModuleStatus:
 
 
 @router.get("/")
+@cached_response(tags=("modules",), ttl=300)
 def list_modules(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -129,6 +135,7 @@ def set_module_enabled(
         )
         db.add(tenant_module)
     db.commit()
+    agent_config.invalidate_tenant(current_user.tenant_id)
     return _serialize_module(module, enabled)
 
 
@@ -189,4 +196,5 @@ def create_module(
     db.add(module)
     db.commit()
     db.refresh(module)
-    return _serialize_module(module, module.is_effectively_enabled)
+    agent_config.invalidate_catalog()
+    return _serialize_module(module, module.is_effectively_enabled)
@@ -7,6 +7,7 @@ from app.database import get_db
 from app.models.module import Module
 from app.models.tenant_module import TenantModule
 from app.models.user import User
+from app.services import agent_config
 
 router = APIRouter(prefix="/admin/modules", tags=["Admin Modules"])
 
@@ -58,6 +59,8 @@ def bulk_set_modules(
             db.add(TenantModule(tenant_id=user.tenant_id, module_id=module_id, enabled=val))
             changed += 1
     db.commit()
+    if changed:
+        agent_config.invalidate_tenant(user.tenant_id)
     return {"changed": changed}
 
 
@@ -102,6 +105,7 @@ def seed_modules_from_csv(
             db.commit()
         # Ensure DB session sees updates from importer (it uses its own SessionLocal)
         db.expire_all()
+        agent_config.invalidate_catalog()
         return {"created": int(stats.get("created", 0)), "updated": int(stats.get("updated", 0)), "rows": int(stats.get("rows", 0))}
     except HTTPException:
         raise
@@ -133,4 +137,5 @@ def create_port_scan_module(
     )
     db.add(module)
     db.commit(); db.refresh(module)
+    agent_config.invalidate_catalog()
     return {"created": 1}
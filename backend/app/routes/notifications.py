@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
@@ -14,6 +14,7 @@ from app.models.user import User
 from app.schemas.notification_schema import NotificationCreate, NotificationOut
 from app.utils.audit import log_audit_event
 from app.utils.email import send_email
+from app.utils.pagination import PageParams, apply_page_headers, page_params, paginate
 from app.observability.metrics import record_notification_delivery
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
@@ -21,16 +22,15 @@ router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 @router.get("", response_model=List[NotificationOut])
 def list_notifications(
+    response: Response,
+    params: PageParams = Depends(page_params()),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_admin_user),
 ) -> List[Notification]:
-    rows = (
-        db.query(Notification)
-        .filter(Notification.tenant_id == current_user.tenant_id)
-        .order_by(Notification.id.desc())
-        .all()
-    )
-    return rows
+    query = db.query(Notification).filter(Notification.tenant_id == current_user.tenant_id)
+    page = paginate(query, None, Notification.id, params)
+    apply_page_headers(response, page)
+    return page.items
 
 
 @router.post("", response_model=NotificationOut, status_code=status.HTTP_201_CREATED)
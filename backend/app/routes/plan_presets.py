@@ -8,6 +8,7 @@ from app.database import get_db
 from app.models.module import Module
 from app.models.scan_job import ScanJob
 from app.models.user import User
+from app.services import agent_config
 from app.services.schedule_utils import compute_next_run
 
 
@@ -36,6 +37,7 @@ def create_networking_demo_plan(
         )
         db.add(module)
         db.commit(); db.refresh(module)
+        agent_config.invalidate_catalog()
 
     created = 0
     cron_list = ['*/30 * * * *', '0 * * * *']
@@ -8,12 +8,14 @@ from uuid import uuid4
 import json
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import OperationalError
 
-from app.core.auth import get_current_user
-from app.database import get_db
+from app.core.auth import get_current_user, get_current_user_async
+from app.database import get_async_db, get_db
 from app.models.agent import Agent
+from app.models.compliance_daily_rollup import ComplianceDailyRollup
 from app.models.compliance_result import ComplianceResult
 from app.models.integrity_event import IntegrityEvent
 from app.models.process_baseline import ProcessBaseline
@@ -32,6 +34,8 @@ from app.schemas.process import (
     ProcessReportResponse,
     ProcessSnapshotRead,
 )
+from app.services import compliance_rollups  # noqa: F401  (keeps rollups in step with result writes)
+from app.services.agent_heartbeats import record_heartbeat
 
 router = APIRouter(prefix="/processes", tags=["Processes"])
 
@@ -82,6 +86,7 @@ def _ensure_process_tables(db: Session) -> None:
         ProcessSnapshot.__table__.create(bind=bind, checkfirst=True)
         ProcessDriftEvent.__table__.create(bind=bind, checkfirst=True)
         ComplianceResult.__table__.create(bind=bind, checkfirst=True)
+        ComplianceDailyRollup.__table__.create(bind=bind, checkfirst=True)
         IntegrityEvent.__table__.create(bind=bind, checkfirst=True)
     except Exception:
         # Best-effort only
@@ -316,11 +321,20 @@ def get_baseline(
 
 
 @router.post("/report", response_model=ProcessReportResponse)
-def report_processes(
+async def report_processes(
     payload: ProcessReportRequest,
     tenant_id: Optional[int] = Query(None, description="Tenant scope for super admins"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+) -> ProcessReportResponse:
+    return await db.run_sync(_ingest_process_report, payload, current_user, tenant_id)
+
+
+def _ingest_process_report(
+    db: Session,
+    payload: ProcessReportRequest,
+    current_user: User,
+    tenant_id: Optional[int],
 ) -> ProcessReportResponse:
     resolved_tenant = _resolve_tenant_id(current_user, tenant_id)
     _ensure_process_tables(db)
@@ -349,7 +363,7 @@ def report_processes(
         db.add(snapshot)
         ingested += 1
 
-    agent.last_seen_at = now
+    record_heartbeat(agent.id, agent.tenant_id, now)
 
     baseline_entries = _baseline_entries(db, resolved_tenant, payload.agent_id)
     if not baseline_entries and _is_sqlite_memory(db):
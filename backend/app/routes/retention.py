@@ -5,13 +5,14 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_user
 from app.database import get_db
 from app.models.retention_policy import DataExportJob, TenantRetentionPolicy
 from app.models.user import User
+from app.utils.pagination import PageParams, apply_page_headers, page_params, paginate
 from app.schemas.retention import (
     DataExportJobCreate,
     DataExportJobRead,
@@ -80,18 +81,17 @@ def update_policy(
 
 @router.get("/exports", response_model=List[DataExportJobRead])
 def list_exports(
+    response: Response,
     tenant_id: Optional[int] = Query(None),
+    params: PageParams = Depends(page_params()),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> List[DataExportJobRead]:
     resolved_tenant = _resolve_tenant(current_user, tenant_id)
-    exports = (
-        db.query(DataExportJob)
-        .filter(DataExportJob.tenant_id == resolved_tenant)
-        .order_by(DataExportJob.requested_at.desc())
-        .all()
-    )
-    return [DataExportJobRead.from_orm(job) for job in exports]
+    query = db.query(DataExportJob).filter(DataExportJob.tenant_id == resolved_tenant)
+    page = paginate(query, DataExportJob.requested_at, DataExportJob.id, params)
+    apply_page_headers(response, page)
+    return [DataExportJobRead.from_orm(job) for job in page.items]
 
 
 @router.post("/exports", response_model=DataExportJobRead, status_code=201)
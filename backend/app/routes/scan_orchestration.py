@@ -5,12 +5,17 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Body, Response
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_user
 from app.database import get_db
 from app.dependencies.tenancy import tenant_scope_dependency
+from app.models.agent import Agent
+from app.models.asset import Asset
+from app.models.scan_job import ScanJob, ScanResult
+from app.models.user import User
+from app.utils.pagination import PageParams, apply_page_headers, page_params, paginate
 from app.schemas.scan import (
     ScanJobCreate,
     ScanJobRead,
@@ -24,15 +29,18 @@ router = APIRouter(prefix="/scan-orchestration", tags=["Scan Orchestration"])
 
 @router.get("/jobs", response_model=List[ScanJobRead])
 def list_jobs(
+    response: Response,
     status: Optional[str] = Query(None),
+    params: PageParams = Depends(page_params()),
     db: Session = Depends(get_db),
     resolved_tenant: int = Depends(tenant_scope_dependency(require_admin=True)),
 ) -> List[ScanJobRead]:
     query = db.query(ScanJob).filter(ScanJob.tenant_id == resolved_tenant)
     if status:
         query = query.filter(ScanJob.status == status)
-    jobs = query.order_by(ScanJob.created_at.desc()).all()
-    return [ScanJobRead.from_orm(job) for job in jobs]
+    page = paginate(query, ScanJob.created_at, ScanJob.id, params)
+    apply_page_headers(response, page)
+    return [ScanJobRead.from_orm(job) for job in page.items]
 
 
 @router.post("/jobs", response_model=ScanJobRead, status_code=201)
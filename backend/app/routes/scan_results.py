@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_admin_user
-from app.database import get_db
+from app.db.read_replicas import get_read_db
 from app.models.agent import Agent
 from app.models.file_scan_result import FileScanResult
 from app.models.network_scan_result import NetworkScanResult
@@ -28,7 +28,7 @@ def _resolve_tenant(user: User, tenant_id: Optional[int]) -> int:
 @router.get("/files", response_model=List[Dict[str, object]])
 def get_file_results(
     tenant_id: Optional[int] = Query(None, description="Tenant scope (required for global administrators)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_admin_user),
 ) -> List[Dict[str, object]]:
     resolved_tenant = _resolve_tenant(current_user, tenant_id)
@@ -55,7 +55,7 @@ def get_file_results(
 @router.get("/network", response_model=List[Dict[str, object]])
 def get_network_results(
     tenant_id: Optional[int] = Query(None, description="Tenant scope (required for global administrators)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_admin_user),
 ) -> List[Dict[str, object]]:
     resolved_tenant = _resolve_tenant(current_user, tenant_id)
@@ -83,7 +83,7 @@ def get_network_results(
 @router.get("/files/export.csv")
 def export_file_csv(
     tenant_id: Optional[int] = Query(None, description="Tenant scope (required for global administrators)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_admin_user),
 ):
     resolved_tenant = _resolve_tenant(current_user, tenant_id)
@@ -106,7 +106,7 @@ def export_file_csv(
 @router.get("/network/export.csv")
 def export_network_csv(
     tenant_id: Optional[int] = Query(None, description="Tenant scope (required for global administrators)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_admin_user),
 ):
     resolved_tenant = _resolve_tenant(current_user, tenant_id)
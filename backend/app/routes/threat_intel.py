@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_user
 from app.database import get_db
+from app.db.read_replicas import get_read_db
 from app.models.ioc_feed import IOCFeed
 from app.models.ioc_hit import IOCHit
 from app.models.user import User
@@ -95,7 +96,7 @@ def list_hits(
     feed_id: Optional[int] = Query(None),
     severity: Optional[str] = Query(None),
     limit: int = Query(200, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ) -> List[IOCHitRead]:
     resolved_tenant = _resolve_tenant(current_user, tenant_id)
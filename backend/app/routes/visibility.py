@@ -9,18 +9,19 @@ inserting visibility results are not exposed here; results are
 inserted by the agent subsystem when scans are executed.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.db.read_replicas import get_read_db
 from app.core.auth import get_current_user
 from app.models.user import User
 from app.models.agent import Agent
 from app.models.file_visibility_result import FileVisibilityResult
 from app.models.network_visibility_result import NetworkVisibilityResult
+from app.utils.pagination import PageParams, apply_page_headers, page_params, paginate
 
 
 router = APIRouter(prefix="/visibility", tags=["Visibility"])
@@ -42,9 +43,11 @@ def _validate_agent(agent_id: int, current_user: User, db: Session) -> Agent:
 
 @router.get("/files")
 def list_file_visibility(
+    response: Response,
     agent_id: Optional[int] = Query(None, description="Filter by agent ID"),
     days: Optional[int] = Query(None, ge=1, description="Number of days back to include"),
-    db: Session = Depends(get_db),
+    params: PageParams = Depends(page_params()),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ) -> List[Dict[str, object]]:
     """Return file visibility results.
@@ -52,7 +55,7 @@ def list_file_visibility(
     If ``agent_id`` is provided, restrict results to that agent.  If
     ``days`` is provided, only results recorded in the past ``days``
     days are returned.  Results are ordered by ``recorded_at``
-    descending.
+    descending and paged by cursor (``X-Next-Cursor``).
     """
     query = db.query(FileVisibilityResult)
     if agent_id is not None:
@@ -66,7 +69,8 @@ def list_file_visibility(
     if days is not None:
         since = datetime.utcnow() - timedelta(days=days)
         query = query.filter(FileVisibilityResult.recorded_at >= since)
-    results = query.order_by(FileVisibilityResult.recorded_at.desc()).all()
+    page = paginate(query, FileVisibilityResult.recorded_at, FileVisibilityResult.id, params)
+    apply_page_headers(response, page)
     return [
         {
             "id": r.id,
@@ -75,15 +79,17 @@ def list_file_visibility(
             "share_name": r.share_name,
             "recorded_at": r.recorded_at.isoformat(),
         }
-        for r in results
+        for r in page.items
     ]
 
 
 @router.get("/network")
 def list_network_visibility(
+    response: Response,
     agent_id: Optional[int] = Query(None, description="Filter by agent ID"),
     days: Optional[int] = Query(None, ge=1, description="Number of days back to include"),
-    db: Session = Depends(get_db),
+    params: PageParams = Depends(page_params()),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ) -> List[Dict[str, object]]:
     """Return network visibility results.
@@ -91,7 +97,7 @@ def list_network_visibility(
     If ``agent_id`` is provided, restrict results to that agent.  If
     ``days`` is provided, only results recorded in the past ``days``
     days are returned.  Results are ordered by ``recorded_at``
-    descending.
+    descending and paged by cursor (``X-Next-Cursor``).
     """
     query = db.query(NetworkVisibilityResult)
     if agent_id is not None:
@@ -103,7 +109,8 @@ def list_network_visibility(
     if days is not None:
         since = datetime.utcnow() - timedelta(days=days)
         query = query.filter(NetworkVisibilityResult.recorded_at >= since)
-    results = query.order_by(NetworkVisibilityResult.recorded_at.desc()).all()
+    page = paginate(query, NetworkVisibilityResult.recorded_at, NetworkVisibilityResult.id, params)
+    apply_page_headers(response, page)
     return [
         {
             "id": r.id,
@@ -113,5 +120,5 @@ def list_network_visibility(
             "status": r.status,
             "recorded_at": r.recorded_at.isoformat(),
         }
-        for r in results
+        for r in page.items
     ]
\ No newline at end of file
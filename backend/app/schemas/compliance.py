@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -20,7 +20,7 @@ class ComplianceFrameworkRead(ComplianceFrameworkBase):
     id: int
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class ComplianceRuleBase(BaseModel):
@@ -41,7 +41,7 @@ class ComplianceRuleRead(ComplianceRuleBase):
     id: int
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class ComplianceMatrixResponse(BaseModel):
@@ -49,6 +49,28 @@ class ComplianceMatrixResponse(BaseModel):
     rules: List[ComplianceRuleRead]
 
 
+class ComplianceMatrixRule(BaseModel):
+    id: int
+    control_id: str
+    title: str
+    description: Optional[str] = None
+    category: Optional[str] = None
+    service_area: Optional[str] = None
+
+
+class ComplianceMatrixSparseResponse(BaseModel):
+    """Rule x framework matrix as coordinates.
+
+    ``cells`` lists ``[rule_index, framework_index]`` pairs into ``rules`` and
+    ``frameworks``; ``version`` changes whenever the catalog does.
+    """
+
+    version: str
+    frameworks: List[ComplianceFrameworkRead]
+    rules: List[ComplianceMatrixRule]
+    cells: List[Tuple[int, int]]
+
+
 class ComplianceTrendPoint(BaseModel):
     date: str
     passed: int = Field(..., alias="pass")
@@ -0,0 +1,113 @@
+# backend/app/scripts/bulk_enroll_agents.py
+"""
+Bulk-enroll agents for a tenant and write an encrypted credentials bundle.
+
+Usage (inside container):
+    # one agent per line in hosts.txt
+    python -m app.scripts.bulk_enroll_agents enroll --tenant-id 1 --names-file hosts.txt --out creds.ndjson
+    # or N generated names (web-00001, web-00002, ...)
+    python -m app.scripts.bulk_enroll_agents enroll --tenant-id 1 --count 500 --prefix web --out creds.ndjson
+    # inspect a bundle (from this script or POST /agents/enroll/bulk)
+    python -m app.scripts.bulk_enroll_agents decrypt --bundle creds.ndjson
+
+The bundle passphrase is read from TENANTRA_BUNDLE_PASSPHRASE or prompted for.
+Exits with code 0 on success, >0 on error.
+"""
+import argparse
+import getpass
+import json
+import os
+import sys
+
+try:
+    from app.database import SessionLocal
+    from app.models.tenant import Tenant
+    from app.services import agent_enrollment
+except Exception as e:
+    print(f"[bulk_enroll_agents] Import error: {e}", file=sys.stderr)
+    sys.exit(2)
+
+
+def _passphrase(confirm: bool) -> str:
+    value = os.getenv("TENANTRA_BUNDLE_PASSPHRASE")
+    if value:
+        return value
+    value = getpass.getpass("Bundle passphrase: ")
+    if confirm and getpass.getpass("Repeat passphrase: ") != value:
+        print("[bulk_enroll_agents] Passphrases do not match", file=sys.stderr)
+        sys.exit(2)
+    return value
+
+
+def _enroll(args) -> int:
+    if bool(args.names_file) == bool(args.count):
+        print("Provide exactly one of --names-file or --count", file=sys.stderr)
+        return 2
+    if args.names_file:
+        with open(args.names_file, "r", encoding="utf-8") as fh:
+            names = [line.strip() for line in fh if line.strip()]
+    else:
+        names = [f"{args.prefix}-{index:05d}" for index in range(1, args.count + 1)]
+    if not names:
+        print("[bulk_enroll_agents] No agent names to enroll")
+        return 0
+    passphrase = _passphrase(confirm=True)
+    if len(passphrase) < 12:
+        print("[bulk_enroll_agents] Passphrase must be at least 12 characters", file=sys.stderr)
+        return 2
+
+    db = SessionLocal()
+    try:
+        if not db.query(Tenant).filter(Tenant.id == args.tenant_id).first():
+            print(f"[bulk_enroll_agents] Tenant {args.tenant_id} not found", file=sys.stderr)
+            return 1
+        credentials = agent_enrollment.bulk_create_agents(db, tenant_id=args.tenant_id, names=names)
+    except Exception as e:
+        print(f"[bulk_enroll_agents] Error: {e}", file=sys.stderr)
+        return 3
+    finally:
+        db.close()
+
+    fd = os.open(args.out, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as out:
+        for chunk in agent_enrollment.iter_credentials_bundle(credentials, passphrase, tenant_id=args.tenant_id):
+            out.write(chunk)
+    print(f"[bulk_enroll_agents] Enrolled {len(credentials)} agents; bundle written to {args.out}")
+    return 0
+
+
+def _decrypt(args) -> int:
+    passphrase = _passphrase(confirm=False)
+    try:
+        with open(args.bundle, "r", encoding="utf-8") as fh:
+            records = agent_enrollment.decrypt_credentials_bundle(fh, passphrase)
+    except (OSError, ValueError) as e:
+        print(f"[bulk_enroll_agents] Error: {e}", file=sys.stderr)
+        return 1
+    for record in records:
+        print(json.dumps(record))
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    enroll = sub.add_parser("enroll", help="create agents and write an encrypted credentials bundle")
+    enroll.add_argument("--tenant-id", type=int, required=True)
+    enroll.add_argument("--names-file", help="file with one agent name per line")
+    enroll.add_argument("--count", type=int, help="number of agents to generate names for")
+    enroll.add_argument("--prefix", default="agent", help="name prefix used with --count (default: agent)")
+    enroll.add_argument("--out", required=True, help="bundle output path (created with mode 0600)")
+
+    decrypt = sub.add_parser("decrypt", help="print the decrypted records of a bundle as NDJSON")
+    decrypt.add_argument("--bundle", required=True)
+
+    args = ap.parse_args()
+    if args.command == "enroll":
+        return _enroll(args)
+    return _decrypt(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Precompiled, versioned effective-module sets served to agents.
+
+Agents poll ``/agents/config/{agent_id}`` continuously.  Rather than loading
+the module catalog plus tenant and agent overrides on every poll, the
+effective module list for each (tenant, agent) pair is compiled once and kept
+until one of its inputs changes.  Writers bump a generation counter through
+``invalidate_catalog``/``invalidate_tenant``/``invalidate_agent``; readers only
+recompile when the generation they were built against is outdated or the
+safety TTL (which bounds staleness across workers) has elapsed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.module import Module
+from app.models.module_agent_mapping import ModuleAgentMapping
+from app.models.tenant_module import TenantModule
+
+CONFIG_TTL_SECONDS = float(os.getenv("TENANTRA_AGENT_CONFIG_TTL", "60"))
+MAX_WAIT_SECONDS = int(os.getenv("TENANTRA_AGENT_CONFIG_MAX_WAIT", "55"))
+WAIT_POLL_SECONDS = float(os.getenv("TENANTRA_AGENT_CONFIG_POLL_INTERVAL", "0.5"))
+
+# (catalog generation, tenant generation, agent generation)
+Version = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class CompiledAgentConfig:
+    agent_id: int
+    tenant_id: Optional[int]
+    modules: Tuple[str, ...]
+    version: Version
+    body: bytes
+    etag: str
+    compiled_at: float
+
+
+@dataclass(frozen=True)
+class _CatalogEntry:
+    module_id: int
+    name: str
+    enabled: bool
+
+
+@dataclass(frozen=True)
+class ModuleIndex:
+    """Cached module catalog lookups shared by agent config and result ingest."""
+
+    entries: Tuple[_CatalogEntry, ...]
+    ids: FrozenSet[int]
+    by_name: Mapping[str, int]
+
+
+_LOCK = threading.Lock()
+_catalog_generation = 0
+_tenant_generations: Dict[int, int] = {}
+_agent_generations: Dict[int, int] = {}
+_catalog: Optional[Tuple[int, float, ModuleIndex]] = None
+_compiled: Dict[Tuple[Optional[int], int], CompiledAgentConfig] = {}
+
+
+def invalidate_catalog() -> None:
+    """Mark every compiled config stale after a ``Module`` row changed."""
+    global _catalog_generation, _catalog
+    with _LOCK:
+        _catalog_generation += 1
+        _catalog = None
+
+
+def invalidate_tenant(tenant_id: Optional[int]) -> None:
+    """Mark configs for every agent of ``tenant_id`` stale after a ``TenantModule`` write."""
+    if tenant_id is None:
+        return
+    with _LOCK:
+        _tenant_generations[tenant_id] = _tenant_generations.get(tenant_id, 0) + 1
+
+
+def invalidate_agent(agent_id: int) -> None:
+    """Mark the config of a single agent stale after a ``ModuleAgentMapping`` write."""
+    with _LOCK:
+        _agent_generations[agent_id] = _agent_generations.get(agent_id, 0) + 1
+        for key in [k for k in _compiled if k[1] == agent_id]:
+            _compiled.pop(key, None)
+
+
+def reset_cache() -> None:
+    """Drop all compiled state (used by tests and admin tooling)."""
+    global _catalog
+    with _LOCK:
+        _catalog = None
+        _compiled.clear()
+
+
+def current_version(tenant_id: Optional[int], agent_id: int) -> Version:
+    with _LOCK:
+        return (
+            _catalog_generation,
+            _tenant_generations.get(tenant_id, 0) if tenant_id is not None else 0,
+            _agent_generations.get(agent_id, 0),
+        )
+
+
+def is_current(config: CompiledAgentConfig) -> bool:
+    if time.monotonic() - config.compiled_at >= CONFIG_TTL_SECONDS:
+        return False
+    return config.version == current_version(config.tenant_id, config.agent_id)
+
+
+def get_module_index(db: Session) -> ModuleIndex:
+    """Return the module catalog, loading it only after invalidation or TTL expiry."""
+    with _LOCK:
+        generation = _catalog_generation
+        cached = _catalog
+    if cached and cached[0] == generation and time.monotonic() - cached[1] < CONFIG_TTL_SECONDS:
+        return cached[2]
+    entries = tuple(
+        _CatalogEntry(module_id=m.id, name=m.name, enabled=m.is_effectively_enabled)
+        for m in db.query(Module).order_by(Module.id).all()
+    )
+    index = ModuleIndex(
+        entries=entries,
+        ids=frozenset(entry.module_id for entry in entries),
+        by_name={entry.name: entry.module_id for entry in entries},
+    )
+    _store_catalog(generation, index)
+    return index
+
+
+def _store_catalog(generation: int, index: ModuleIndex) -> None:
+    global _catalog
+    with _LOCK:
+        # Only publish if no writer invalidated the catalog while we were loading it.
+        if generation == _catalog_generation:
+            _catalog = (generation, time.monotonic(), index)
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _compile(db: Session, tenant_id: Optional[int], agent_id: int) -> CompiledAgentConfig:
+    version = current_version(tenant_id, agent_id)
+    catalog = get_module_index(db).entries
+
+    tenant_overrides: Dict[int, bool] = {}
+    if tenant_id:
+        tenant_overrides = {
+            module_id: bool(enabled)
+            for module_id, enabled in db.query(TenantModule.module_id, TenantModule.enabled)
+            .filter(TenantModule.tenant_id == tenant_id)
+            .all()
+        }
+    agent_overrides = {
+        module_id: bool(enabled)
+        for module_id, enabled in db.query(ModuleAgentMapping.module_id, ModuleAgentMapping.enabled)
+        .filter(ModuleAgentMapping.agent_id == agent_id)
+        .all()
+    }
+
+    enabled: List[str] = []
+    for entry in catalog:
+        if entry.module_id in agent_overrides:
+            effective = agent_overrides[entry.module_id]
+        elif entry.module_id in tenant_overrides:
+            effective = tenant_overrides[entry.module_id]
+        else:
+            effective = entry.enabled
+        if effective:
+            enabled.append(entry.name)
+
+    body = json.dumps({"agent_id": agent_id, "modules": enabled}, separators=(",", ":")).encode("utf-8")
+    return CompiledAgentConfig(
+        agent_id=agent_id,
+        tenant_id=tenant_id,
+        modules=tuple(enabled),
+        version=version,
+        body=body,
+        etag=compute_etag(body),
+        compiled_at=time.monotonic(),
+    )
+
+
+def get_compiled_config(db: Session, tenant_id: Optional[int], agent_id: int) -> CompiledAgentConfig:
+    """Return the effective config for an agent, compiling it only when stale."""
+    key = (tenant_id, agent_id)
+    with _LOCK:
+        cached = _compiled.get(key)
+    if cached is not None and is_current(cached):
+        return cached
+    compiled = _compile(db, tenant_id, agent_id)
+    with _LOCK:
+        existing = _compiled.get(key)
+        if existing is None or existing.version <= compiled.version:
+            _compiled[key] = compiled
+    return compiled
+
+
+async def wait_for_change(config: CompiledAgentConfig, timeout: float) -> bool:
+    """Sleep until ``config`` becomes stale or ``timeout`` elapses.
+
+    Only in-memory generation counters are consulted while waiting, so a parked
+    long-poll holds no database connection.  Returns True when a change (or TTL
+    expiry) was observed.
+    """
+    deadline = time.monotonic() + max(timeout, 0)
+    while True:
+        if not is_current(config):
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(WAIT_POLL_SECONDS, remaining))
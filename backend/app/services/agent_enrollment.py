@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import base64
 import hashlib
+import json
 import os
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Iterable, Iterator
 
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.models.agent import Agent
@@ -77,3 +83,119 @@ def create_agent_with_token(
     db.commit()
     db.refresh(agent)
     return agent, agent_token
+
+
+BULK_ENROLL_MAX = int(os.getenv("TENANTRA_AGENT_BULK_ENROLL_MAX", "5000"))
+BULK_ENROLL_BATCH = int(os.getenv("TENANTRA_AGENT_BULK_ENROLL_BATCH", "250"))
+BULK_HASH_WORKERS = int(os.getenv("TENANTRA_AGENT_BULK_HASH_WORKERS", str(min(8, os.cpu_count() or 1))))
+BUNDLE_FORMAT = "tenantra-agent-credentials/v1"
+_BUNDLE_SCRYPT = {"n": 2**14, "r": 8, "p": 1}
+
+
+def bulk_create_agents(
+    db: Session,
+    *,
+    tenant_id: int,
+    names: list[str],
+) -> list[tuple[int, str, str]]:
+    """Enroll many agents at once and return ``(agent_id, name, raw_token)`` tuples.
+
+    Tokens are minted and bcrypt-hashed batch by batch on a thread pool (bcrypt
+    releases the GIL), and all agents are inserted inside a single transaction,
+    so either every agent in the request is created or none is.
+    """
+    if len(names) > BULK_ENROLL_MAX:
+        raise ValueError(f"At most {BULK_ENROLL_MAX} agents can be enrolled per request.")
+    created: list[tuple[int, str, str]] = []
+    now = datetime.utcnow()
+    try:
+        with ThreadPoolExecutor(max_workers=max(BULK_HASH_WORKERS, 1)) as pool:
+            for start in range(0, len(names), max(BULK_ENROLL_BATCH, 1)):
+                batch = names[start : start + max(BULK_ENROLL_BATCH, 1)]
+                tokens = [secrets.token_hex(16) for _ in batch]
+                hashes = list(pool.map(get_password_hash, tokens))
+                rows = [
+                    {
+                        "tenant_id": tenant_id,
+                        "name": name,
+                        "token": hashed,
+                        "status": "active",
+                        "is_active": True,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for name, hashed in zip(batch, hashes)
+                ]
+                ids = db.scalars(
+                    insert(Agent).returning(Agent.id, sort_by_parameter_order=True),
+                    rows,
+                ).all()
+                created.extend(zip(ids, batch, tokens))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return created
+
+
+def _bundle_key(passphrase: str, salt: bytes) -> bytes:
+    return hashlib.scrypt(passphrase.encode("utf-8"), salt=salt, dklen=32, **_BUNDLE_SCRYPT)
+
+
+def iter_credentials_bundle(
+    credentials: list[tuple[int, str, str]],
+    passphrase: str,
+    *,
+    tenant_id: int,
+) -> Iterator[bytes]:
+    """Yield an NDJSON credentials bundle, one AES-GCM sealed record per line.
+
+    The first line is a plaintext header carrying the scrypt salt; every
+    following line is ``{"record": base64(nonce + ciphertext)}`` where the
+    plaintext is ``{"agent_id", "name", "token"}``.  Records are encrypted as
+    they are yielded so large bundles are never held in memory twice.
+    """
+    salt = os.urandom(16)
+    key = AESGCM(_bundle_key(passphrase, salt))
+    header = {
+        "format": BUNDLE_FORMAT,
+        "tenant_id": tenant_id,
+        "count": len(credentials),
+        "kdf": {"name": "scrypt", "salt": base64.b64encode(salt).decode("ascii"), **_BUNDLE_SCRYPT},
+        "cipher": "AES-256-GCM",
+    }
+    yield (json.dumps(header) + "\n").encode("utf-8")
+    aad = BUNDLE_FORMAT.encode("utf-8")
+    for agent_id, name, token in credentials:
+        nonce = os.urandom(12)
+        plaintext = json.dumps({"agent_id": agent_id, "name": name, "token": token}).encode("utf-8")
+        sealed = base64.b64encode(nonce + key.encrypt(nonce, plaintext, aad)).decode("ascii")
+        yield (json.dumps({"record": sealed}) + "\n").encode("utf-8")
+
+
+def decrypt_credentials_bundle(lines: Iterable[bytes | str], passphrase: str) -> list[dict]:
+    """Inverse of :func:`iter_credentials_bundle`; raises ``ValueError`` on a bad passphrase."""
+    iterator = iter(lines)
+    try:
+        header = json.loads(next(iterator))
+    except StopIteration:
+        raise ValueError("Empty credentials bundle.")
+    if header.get("format") != BUNDLE_FORMAT:
+        raise ValueError("Unsupported credentials bundle format.")
+    kdf = header["kdf"]
+    salt = base64.b64decode(kdf["salt"])
+    key = AESGCM(
+        hashlib.scrypt(passphrase.encode("utf-8"), salt=salt, dklen=32, n=kdf["n"], r=kdf["r"], p=kdf["p"])
+    )
+    aad = BUNDLE_FORMAT.encode("utf-8")
+    records: list[dict] = []
+    for line in iterator:
+        if not line or not str(line).strip():
+            continue
+        blob = base64.b64decode(json.loads(line)["record"])
+        try:
+            plaintext = key.decrypt(blob[:12], blob[12:], aad)
+        except Exception as exc:
+            raise ValueError("Unable to decrypt credentials bundle.") from exc
+        records.append(json.loads(plaintext))
+    return records
@@ -0,0 +1,198 @@
+"""Coalesced agent last-seen tracking.
+
+Every authenticated agent touchpoint records a heartbeat here instead of
+issuing its own ``UPDATE agents SET last_seen_at = ...``.  Heartbeats are held
+in memory and written back periodically as one executemany UPDATE that only
+moves ``last_seen_at`` forward, which keeps the hot ``agents`` rows free of
+per-request lock contention and dead tuples.
+
+The in-memory map also answers fleet-liveness questions without touching the
+database.  It only knows agents that contacted *this* worker since it started,
+so the liveness view is per-process; the persisted ``last_seen_at`` column
+remains the fleet-wide source of truth.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.agent import Agent
+
+logger = logging.getLogger("tenantra.agent_heartbeats")
+
+FLUSH_SECONDS = float(os.getenv("TENANTRA_AGENT_HEARTBEAT_FLUSH_SECONDS", "15"))
+ONLINE_SECONDS = int(os.getenv("TENANTRA_AGENT_ONLINE_SECONDS", "120"))
+STALE_SECONDS = int(os.getenv("TENANTRA_AGENT_STALE_SECONDS", "900"))
+
+
+@dataclass
+class _Heartbeat:
+    tenant_id: Optional[int]
+    last_seen_at: datetime
+    dirty: bool = True
+
+
+class HeartbeatAccumulator:
+    """Thread-safe last-seen map with periodic bulk write-back."""
+
+    def __init__(
+        self,
+        *,
+        flush_seconds: float = FLUSH_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.flush_seconds = max(flush_seconds, 0.05)
+        self._session_factory = session_factory
+        self._beats: Dict[int, _Heartbeat] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, agent_id: int, tenant_id: Optional[int], seen_at: Optional[datetime] = None) -> None:
+        seen_at = seen_at or datetime.utcnow()
+        with self._lock:
+            beat = self._beats.get(agent_id)
+            if beat is None:
+                self._beats[agent_id] = _Heartbeat(tenant_id=tenant_id, last_seen_at=seen_at)
+            elif seen_at > beat.last_seen_at:
+                beat.last_seen_at = seen_at
+                beat.tenant_id = tenant_id
+                beat.dirty = True
+        self._ensure_flusher()
+
+    def last_seen(self, agent_id: int) -> Optional[datetime]:
+        with self._lock:
+            beat = self._beats.get(agent_id)
+            return beat.last_seen_at if beat else None
+
+    def flush(self) -> int:
+        """Persist dirty heartbeats in one UPDATE statement; returns rows submitted."""
+        with self._flush_lock:
+            with self._lock:
+                pending = [
+                    {"b_id": agent_id, "b_seen": beat.last_seen_at}
+                    for agent_id, beat in self._beats.items()
+                    if beat.dirty
+                ]
+                for beat in self._beats.values():
+                    beat.dirty = False
+            if not pending:
+                return 0
+            table = Agent.__table__
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .where(or_(table.c.last_seen_at.is_(None), table.c.last_seen_at < bindparam("b_seen")))
+                .values(last_seen_at=bindparam("b_seen"))
+            )
+            db = self._session_factory()
+            try:
+                db.execute(stmt, pending)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    for item in pending:
+                        beat = self._beats.get(item["b_id"])
+                        if beat is not None:
+                            beat.dirty = True
+                logger.exception("Heartbeat flush failed (%s agents)", len(pending))
+                return 0
+            finally:
+                db.close()
+            return len(pending)
+
+    def liveness(self, tenant_id: Optional[int] = None, now: Optional[datetime] = None) -> Dict[str, object]:
+        """Summarise known agents as online/stale/offline from memory only."""
+        now = now or datetime.utcnow()
+        online_cutoff = now - timedelta(seconds=ONLINE_SECONDS)
+        stale_cutoff = now - timedelta(seconds=STALE_SECONDS)
+        counts = {"online": 0, "stale": 0, "offline": 0}
+        agents: List[Dict[str, object]] = []
+        with self._lock:
+            items = [(agent_id, beat.tenant_id, beat.last_seen_at) for agent_id, beat in self._beats.items()]
+        for agent_id, beat_tenant, seen_at in items:
+            if tenant_id is not None and beat_tenant != tenant_id:
+                continue
+            if seen_at >= online_cutoff:
+                state = "online"
+            elif seen_at >= stale_cutoff:
+                state = "stale"
+            else:
+                state = "offline"
+            counts[state] += 1
+            agents.append(
+                {
+                    "agent_id": agent_id,
+                    "tenant_id": beat_tenant,
+                    "last_seen_at": seen_at.isoformat(),
+                    "state": state,
+                }
+            )
+        agents.sort(key=lambda item: item["agent_id"])
+        return {
+            "generated_at": now.isoformat(),
+            "online_window_seconds": ONLINE_SECONDS,
+            "stale_window_seconds": STALE_SECONDS,
+            "total": len(agents),
+            "counts": counts,
+            "agents": agents,
+        }
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_seconds):
+            self.flush()
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="agent-heartbeat-flusher", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+
+
+_ACCUMULATOR: Optional[HeartbeatAccumulator] = None
+_ACCUMULATOR_LOCK = threading.Lock()
+
+
+def get_accumulator() -> HeartbeatAccumulator:
+    global _ACCUMULATOR
+    if _ACCUMULATOR is None:
+        with _ACCUMULATOR_LOCK:
+            if _ACCUMULATOR is None:
+                _ACCUMULATOR = HeartbeatAccumulator()
+    return _ACCUMULATOR
+
+
+def record_heartbeat(agent_id: int, tenant_id: Optional[int], seen_at: Optional[datetime] = None) -> None:
+    try:
+        get_accumulator().record(agent_id, tenant_id, seen_at)
+    except Exception:
+        # Liveness tracking must never fail the agent request that triggered it.
+        logger.debug("Unable to record heartbeat for agent %s", agent_id, exc_info=True)
+
+
+def shutdown() -> None:
+    if _ACCUMULATOR is not None:
+        _ACCUMULATOR.close()
@@ -0,0 +1,225 @@
+"""Buffered, bulk-inserting pipeline for agent log lines.
+
+Streaming uploads append parsed rows to a process-wide buffer.  The buffer is
+flushed with a single multi-row INSERT once it holds ``FLUSH_ROWS`` rows or
+``FLUSH_SECONDS`` have passed since the oldest pending row, whichever comes
+first.  When the buffer reaches ``BUFFER_MAX_ROWS`` callers are refused
+(backpressure) instead of growing memory without bound.
+
+A failed INSERT is retried in halves until the rows the database rejects are
+isolated; those are dropped (and counted) so one bad row cannot stall
+ingest.  Connection-level failures re-queue the unwritten rows instead.
+
+Rows are acknowledged once buffered, so a worker crash can drop at most one
+flush window of logs; agents that need stronger guarantees should keep using
+``POST /agents/{agent_id}/logs``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.agent_log import AgentLog
+
+logger = logging.getLogger("tenantra.agent_logs")
+
+FLUSH_ROWS = int(os.getenv("TENANTRA_AGENT_LOG_FLUSH_ROWS", "500"))
+FLUSH_SECONDS = float(os.getenv("TENANTRA_AGENT_LOG_FLUSH_SECONDS", "2"))
+BUFFER_MAX_ROWS = int(os.getenv("TENANTRA_AGENT_LOG_BUFFER_MAX", "20000"))
+MAX_STREAM_BYTES = int(os.getenv("TENANTRA_AGENT_LOG_STREAM_MAX_BYTES", str(16 * 1024 * 1024)))
+MAX_MESSAGE_CHARS = int(os.getenv("TENANTRA_AGENT_LOG_MAX_MESSAGE", "8192"))
+ALLOWED_SEVERITIES = {"debug", "info", "warning", "error", "critical"}
+
+
+class AgentLogBuffer:
+    """Thread-safe row buffer with size/time flush triggers and a hard cap."""
+
+    def __init__(
+        self,
+        *,
+        flush_rows: int = FLUSH_ROWS,
+        flush_seconds: float = FLUSH_SECONDS,
+        max_rows: int = BUFFER_MAX_ROWS,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.flush_rows = max(flush_rows, 1)
+        self.flush_seconds = max(flush_seconds, 0.05)
+        self.max_rows = max(max_rows, self.flush_rows)
+        self._session_factory = session_factory
+        self._rows: List[Dict[str, object]] = []
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.flushed_rows = 0
+        self.dropped_rows = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def offer(self, rows: Sequence[Dict[str, object]]) -> bool:
+        """Append ``rows`` unless that would exceed the buffer cap."""
+        if not rows:
+            return True
+        with self._lock:
+            if len(self._rows) + len(rows) > self.max_rows:
+                return False
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.extend(rows)
+            should_flush = len(self._rows) >= self.flush_rows
+        self._ensure_flusher()
+        if should_flush:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """Write every pending row, in one INSERT when possible; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._rows = self._rows, []
+                self._oldest = None
+            if not batch:
+                return 0
+            written = 0
+            chunks = [batch]
+            db = self._session_factory()
+            try:
+                while chunks:
+                    chunk = chunks.pop()
+                    try:
+                        db.execute(insert(AgentLog), chunk)
+                        db.commit()
+                    except Exception as exc:
+                        db.rollback()
+                        if _is_transient(exc):
+                            unwritten = chunk + [row for rest in reversed(chunks) for row in rest]
+                            self._requeue(unwritten)
+                            logger.exception("Agent log flush failed (%s rows re-queued)", len(unwritten))
+                            break
+                        if len(chunk) == 1:
+                            with self._lock:
+                                self.dropped_rows += 1
+                            logger.warning("Dropping agent log row rejected by the database: %s", exc)
+                            continue
+                        # Bisect so only the rows the database rejects are dropped.
+                        middle = len(chunk) // 2
+                        chunks.extend((chunk[middle:], chunk[:middle]))
+                        continue
+                    written += len(chunk)
+            finally:
+                db.close()
+            self.flushed_rows += written
+            return written
+
+    def _requeue(self, rows: List[Dict[str, object]]) -> None:
+        with self._lock:
+            # Re-queue ahead of newer rows if there is room, otherwise drop.
+            room = max(self.max_rows - len(self._rows), 0)
+            requeued = rows[:room]
+            self._rows[:0] = requeued
+            if self._rows:
+                self._oldest = time.monotonic()
+            self.dropped_rows += len(rows) - len(requeued)
+
+    def _due(self) -> bool:
+        with self._lock:
+            if not self._rows:
+                return False
+            if len(self._rows) >= self.flush_rows:
+                return True
+            return self._oldest is not None and time.monotonic() - self._oldest >= self.flush_seconds
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_seconds / 2)
+            self._wakeup.clear()
+            if self._due():
+                self.flush()
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="agent-log-flusher", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background flusher and write whatever is still buffered."""
+        self._stopped.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+
+
+def _is_transient(exc: BaseException) -> bool:
+    return isinstance(exc, OperationalError) or (isinstance(exc, DBAPIError) and exc.connection_invalidated)
+
+
+_BUFFER: Optional[AgentLogBuffer] = None
+_BUFFER_LOCK = threading.Lock()
+
+
+def get_buffer() -> AgentLogBuffer:
+    global _BUFFER
+    if _BUFFER is None:
+        with _BUFFER_LOCK:
+            if _BUFFER is None:
+                _BUFFER = AgentLogBuffer()
+    return _BUFFER
+
+
+def shutdown() -> None:
+    if _BUFFER is not None:
+        _BUFFER.close()
+
+
+def build_row(agent_id: int, entry: object, now: datetime) -> Dict[str, object]:
+    """Validate one NDJSON entry and convert it into an ``agent_logs`` row."""
+    if not isinstance(entry, dict):
+        raise ValueError("entry must be an object")
+    message = entry.get("message")
+    if isinstance(message, str):
+        # Postgres text columns reject NUL characters.
+        message = message.replace("\x00", "")
+    if not isinstance(message, str) or not message:
+        raise ValueError("message is required")
+    severity = str(entry.get("severity") or "info").strip().lower()
+    if severity not in ALLOWED_SEVERITIES:
+        raise ValueError(f"unsupported severity '{severity}'")
+    created_at = now
+    raw_ts = entry.get("created_at") or entry.get("timestamp")
+    if raw_ts:
+        try:
+            parsed = datetime.fromisoformat(str(raw_ts).replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError("created_at must be ISO 8601")
+        if parsed.tzinfo is not None:
+            parsed = datetime.utcfromtimestamp(parsed.timestamp())
+        created_at = parsed
+    return {
+        "agent_id": agent_id,
+        "severity": severity,
+        "message": message[:MAX_MESSAGE_CHARS],
+        "created_at": created_at,
+        "updated_at": now,
+    }
@@ -0,0 +1,167 @@
+"""Bulk ingestion of module results submitted by agents."""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel, Field, ValidationError, root_validator
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.agent import Agent
+from app.models.module import Module
+from app.models.scan_module_result import ScanModuleResult
+from app.services import agent_config
+
+MAX_BATCH_ITEMS = int(os.getenv("TENANTRA_AGENT_RESULTS_BATCH_MAX", "1000"))
+MAX_BATCH_BYTES = int(os.getenv("TENANTRA_AGENT_RESULTS_BATCH_MAX_BYTES", str(8 * 1024 * 1024)))
+
+
+class AgentResultItem(BaseModel):
+    module_id: Optional[int] = None
+    module_name: Optional[str] = None
+    status: str = Field(..., min_length=1, max_length=50)
+    details: Optional[Dict[str, object]] = None
+    recorded_at: Optional[datetime] = None
+
+    @root_validator(skip_on_failure=True)
+    def _ensure_module_reference(cls, values):
+        if not values.get("module_id") and not values.get("module_name"):
+            raise ValueError("module_id or module_name is required")
+        return values
+
+
+def _first_error(exc: ValidationError) -> str:
+    errors = exc.errors()
+    if not errors:
+        return "Invalid result"
+    err = errors[0]
+    loc = ".".join(str(part) for part in err.get("loc", ()) if part != "__root__")
+    return f"{loc}: {err.get('msg')}" if loc else str(err.get("msg"))
+
+
+def _as_naive_utc(value: Optional[datetime], default: datetime) -> datetime:
+    if value is None:
+        return default
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _resolve_missing(
+    db: Session, ids: Sequence[int], names: Sequence[str]
+) -> tuple[set[int], Dict[str, int]]:
+    """Look up module references absent from the cached index in one query."""
+    clauses = []
+    if ids:
+        clauses.append(Module.id.in_(ids))
+    if names:
+        clauses.append(Module.name.in_(names))
+    if not clauses:
+        return set(), {}
+    rows = db.query(Module.id, Module.name).filter(or_(*clauses)).all()
+    if rows:
+        # The cached catalog is behind (module created by another worker or importer).
+        agent_config.invalidate_catalog()
+    return {row.id for row in rows}, {row.name: row.id for row in rows}
+
+
+def ingest_results(db: Session, agent: Agent, items: Sequence[Any]) -> List[Dict[str, object]]:
+    """Validate, resolve and bulk-insert ``items`` for ``agent``.
+
+    Every input position gets an outcome: ``{"index", "status": "created", "id"}``
+    for stored rows or ``{"index", "status": "error", "error"}`` for rejected
+    ones.  Accepted rows are written in a single INSERT and one commit.  If
+    that INSERT hits a module deleted since the catalog was cached, the
+    module ids are re-checked, the orphaned items are rejected and the rest
+    are inserted once more.
+    """
+    outcomes: List[Optional[Dict[str, object]]] = [None] * len(items)
+    parsed: List[tuple[int, AgentResultItem]] = []
+    for index, raw in enumerate(items):
+        if not isinstance(raw, dict):
+            outcomes[index] = {"index": index, "status": "error", "error": "Result must be an object"}
+            continue
+        try:
+            parsed.append((index, AgentResultItem.parse_obj(raw)))
+        except ValidationError as exc:
+            outcomes[index] = {"index": index, "status": "error", "error": _first_error(exc)}
+
+    module_index = agent_config.get_module_index(db)
+    known_ids = set(module_index.ids)
+    by_name = dict(module_index.by_name)
+    missing_ids = {item.module_id for _, item in parsed if item.module_id and item.module_id not in known_ids}
+    missing_names = {
+        item.module_name
+        for _, item in parsed
+        if item.module_name and item.module_id not in known_ids and item.module_name not in by_name
+    }
+    if missing_ids or missing_names:
+        extra_ids, extra_names = _resolve_missing(db, sorted(missing_ids), sorted(missing_names))
+        known_ids |= extra_ids
+        by_name.update(extra_names)
+
+    now = datetime.utcnow()
+    rows: List[Dict[str, object]] = []
+    row_indexes: List[int] = []
+    for index, item in parsed:
+        module_id: Optional[int] = None
+        if item.module_id and item.module_id in known_ids:
+            module_id = item.module_id
+        elif item.module_name and item.module_name in by_name:
+            module_id = by_name[item.module_name]
+        if module_id is None:
+            outcomes[index] = {"index": index, "status": "error", "error": "Module not found"}
+            continue
+        rows.append(
+            {
+                "module_id": module_id,
+                "agent_id": agent.id,
+                "tenant_id": agent.tenant_id,
+                "status": item.status,
+                "details": json.dumps(item.details or {}),
+                "recorded_at": _as_naive_utc(item.recorded_at, now),
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        row_indexes.append(index)
+
+    if rows:
+        try:
+            ids = _insert_rows(db, rows)
+        except IntegrityError:
+            db.rollback()
+            agent_config.invalidate_catalog()
+            existing, _ = _resolve_missing(db, sorted({row["module_id"] for row in rows}), [])
+            kept_rows: List[Dict[str, object]] = []
+            kept_indexes: List[int] = []
+            for index, row in zip(row_indexes, rows):
+                if row["module_id"] in existing:
+                    kept_rows.append(row)
+                    kept_indexes.append(index)
+                else:
+                    outcomes[index] = {"index": index, "status": "error", "error": "Module not found"}
+            rows, row_indexes = kept_rows, kept_indexes
+            ids = _insert_rows(db, rows) if rows else []
+        for index, record_id in zip(row_indexes, ids):
+            outcomes[index] = {"index": index, "status": "created", "id": record_id}
+
+    return [outcome for outcome in outcomes if outcome is not None]
+
+
+def _insert_rows(db: Session, rows: List[Dict[str, object]]) -> List[int]:
+    try:
+        ids = db.scalars(
+            insert(ScanModuleResult).returning(ScanModuleResult.id, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return list(ids)
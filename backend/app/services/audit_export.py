@@ -0,0 +1,243 @@
+"""Streaming audit-log export.
+
+Rows are read with ``yield_per`` (a server-side cursor on Postgres) in
+batches of ``TENANTRA_AUDIT_EXPORT_BATCH_SIZE``.  Each batch is decrypted and
+encoded into one output chunk before the next batch is fetched, so memory is
+bounded by the batch size whatever the date range::
+
+    with read_session() as db:
+        for chunk in export_chunks(iter_audit_batches(db, criteria), "ndjson", compress=True):
+            ...
+
+Formats: ``csv`` (the historical layout), ``ndjson`` and ``parquet`` (one
+row group per batch; needs ``pyarrow``).  ``compress`` gzips the stream.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.crypto import aes_decryptor
+from app.core.secrets import get_enc_key
+from app.models.audit_log import AuditLog
+
+try:  # optional dependency
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+BATCH_SIZE = int(os.getenv("TENANTRA_AUDIT_EXPORT_BATCH_SIZE", "1000"))
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    media_type: str
+    extension: str
+
+
+FORMATS: Dict[str, ExportFormat] = {
+    "csv": ExportFormat("text/csv", "csv"),
+    "ndjson": ExportFormat("application/x-ndjson", "ndjson"),
+    "parquet": ExportFormat("application/vnd.apache.parquet", "parquet"),
+}
+
+Batch = List[Dict[str, Any]]
+
+
+def format_available(name: str) -> bool:
+    return name in FORMATS and (name != "parquet" or pq is not None)
+
+
+def iter_audit_batches(db: Session, criteria: Sequence[Any], batch_size: int = BATCH_SIZE) -> Iterator[Batch]:
+    """Decoded audit rows matching ``criteria``, newest first, ``batch_size`` at a time."""
+    decrypt = aes_decryptor(get_enc_key())
+    stmt = (
+        select(
+            AuditLog.id,
+            AuditLog.created_at,
+            AuditLog.user_id,
+            AuditLog.action,
+            AuditLog.result,
+            AuditLog.ip,
+            AuditLog.details_enc,
+        )
+        .where(*criteria)
+        .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in db.execute(stmt).partitions():
+        yield [
+            {
+                "id": row.id,
+                "timestamp": row.created_at,
+                "user_id": row.user_id,
+                "action": row.action,
+                "result": row.result,
+                "ip": row.ip,
+                "details": AuditLog.decode_details(row.details_enc, decrypt, log_id=row.id),
+            }
+            for row in partition
+        ]
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class _CsvEncoder:
+    header = ["timestamp", "user_id", "action", "result", "ip", "details"]
+
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, quoting=csv.QUOTE_ALL, lineterminator="\n")
+
+    @staticmethod
+    def _cell(value: Any) -> str:
+        text = "" if value is None else str(_iso(value))
+        return text.replace("\r", " ").replace("\n", " ")
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def start(self) -> bytes:
+        return (",".join(self.header) + "\n").encode("utf-8")
+
+    def encode(self, batch: Batch) -> bytes:
+        self._writer.writerows([self._cell(row[name]) for name in self.header] for row in batch)
+        return self._drain()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _NdjsonEncoder:
+    def start(self) -> bytes:
+        return b""
+
+    def encode(self, batch: Batch) -> bytes:
+        lines = [
+            json.dumps({**row, "timestamp": _iso(row["timestamp"])}, separators=(",", ":"), default=str)
+            for row in batch
+        ]
+        return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # The Parquet footer records absolute offsets.
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _ParquetEncoder:
+    def __init__(self) -> None:
+        if pq is None:
+            raise RuntimeError("pyarrow is not installed")
+        self._schema = pa.schema(
+            [
+                ("id", pa.int64()),
+                ("timestamp", pa.timestamp("us")),
+                ("user_id", pa.int64()),
+                ("action", pa.string()),
+                ("result", pa.string()),
+                ("ip", pa.string()),
+                ("details", pa.string()),
+            ]
+        )
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema)
+
+    def start(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, batch: Batch) -> bytes:
+        rows = [
+            {**row, "details": None if row["details"] is None else json.dumps(row["details"], default=str)}
+            for row in batch
+        ]
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self._schema))
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+_ENCODERS = {"csv": _CsvEncoder, "ndjson": _NdjsonEncoder, "parquet": _ParquetEncoder}
+
+
+@dataclass
+class ExportStats:
+    rows: int = 0
+    completed: bool = False
+
+
+def export_chunks(
+    batches: Iterable[Batch],
+    fmt: str,
+    *,
+    compress: bool = False,
+    stats: ExportStats | None = None,
+) -> Iterator[bytes]:
+    """Encode ``batches`` as ``fmt``, one output chunk per batch, optionally gzipped."""
+    encoder = _ENCODERS[fmt]()
+    gzipper = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    stats = stats if stats is not None else ExportStats()
+
+    def _out(data: bytes) -> bytes:
+        return gzipper.compress(data) if gzipper is not None and data else data
+
+    head = _out(encoder.start())
+    if head:
+        yield head
+    for batch in batches:
+        stats.rows += len(batch)
+        chunk = _out(encoder.encode(batch))
+        if chunk:
+            yield chunk
+    tail = _out(encoder.finish())
+    if gzipper is not None:
+        tail += gzipper.flush()
+    if tail:
+        yield tail
+    stats.completed = True
+
+
+__all__ = ["BATCH_SIZE", "ExportStats", "FORMATS", "export_chunks", "format_available", "iter_audit_batches"]
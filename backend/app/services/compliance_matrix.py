@@ -0,0 +1,171 @@
+"""Cached rule x framework compliance matrix.
+
+The control catalog is global and changes rarely, so the matrix is built with
+three flat queries (frameworks, rules, rule/framework links) instead of one
+relationship load per rule, and kept per process under a matrix version.
+Commits to frameworks, rules or links bump the version in every process
+through the cache bus; the next read rebuilds::
+
+    matrix = get_matrix(db)
+    matrix.dense()            # ComplianceMatrixResponse
+    matrix.sparse()           # ComplianceMatrixSparseResponse
+    matrix.rules_for(fw_id)   # rules mapped to one framework
+
+``ComplianceMatrix.version`` is a content hash, equal in every worker.
+Snapshots are shared between requests and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.cache import bus as cache_bus
+from app.cache.invalidation import on_commit
+from app.cache.ttl import get_cache
+from app.models.compliance_framework import ComplianceFramework
+from app.models.compliance_rule import ComplianceRule, ComplianceRuleFramework
+from app.schemas.compliance import (
+    ComplianceFrameworkRead,
+    ComplianceMatrixResponse,
+    ComplianceMatrixRule,
+    ComplianceMatrixSparseResponse,
+    ComplianceRuleRead,
+)
+
+MATRIX_CACHE_TTL = float(os.getenv("TENANTRA_COMPLIANCE_MATRIX_CACHE_TTL", "3600"))
+
+# Keyed by the local matrix version; superseded snapshots age out of the LRU.
+_MATRIX_CACHE = get_cache("compliance_matrix", ttl_seconds=MATRIX_CACHE_TTL, maxsize=4)
+_MATRIX_VERSION = 0
+_VERSION_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ComplianceMatrix:
+    version: str
+    frameworks: Tuple[ComplianceFrameworkRead, ...]
+    rules: Tuple[ComplianceRuleRead, ...]
+
+    @classmethod
+    def build(cls, frameworks, rules, links) -> "ComplianceMatrix":
+        framework_ids: Dict[int, List[int]] = {}
+        for rule_id, framework_id in links:
+            framework_ids.setdefault(rule_id, []).append(framework_id)
+        framework_models = tuple(
+            ComplianceFrameworkRead(
+                id=row.id, name=row.name, code=row.code, description=row.description, category=row.category
+            )
+            for row in frameworks
+        )
+        rule_models = tuple(
+            ComplianceRuleRead(
+                id=row.id,
+                control_id=row.control_id,
+                title=row.title,
+                description=row.description,
+                category=row.category,
+                service_area=row.service_area,
+                framework_ids=framework_ids.get(row.id, []),
+            )
+            for row in rules
+        )
+        encoded = json.dumps(
+            [[fw.dict() for fw in framework_models], [rule.dict() for rule in rule_models]],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        version = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+        return cls(version=version, frameworks=framework_models, rules=rule_models)
+
+    def dense(self) -> ComplianceMatrixResponse:
+        return ComplianceMatrixResponse(frameworks=list(self.frameworks), rules=list(self.rules))
+
+    def sparse(self) -> ComplianceMatrixSparseResponse:
+        column = {framework.id: index for index, framework in enumerate(self.frameworks)}
+        cells = [
+            (row, column[framework_id])
+            for row, rule in enumerate(self.rules)
+            for framework_id in rule.framework_ids
+            if framework_id in column
+        ]
+        return ComplianceMatrixSparseResponse(
+            version=self.version,
+            frameworks=list(self.frameworks),
+            rules=[
+                ComplianceMatrixRule(
+                    id=rule.id,
+                    control_id=rule.control_id,
+                    title=rule.title,
+                    description=rule.description,
+                    category=rule.category,
+                    service_area=rule.service_area,
+                )
+                for rule in self.rules
+            ],
+            cells=cells,
+        )
+
+    def rules_for(self, framework_id: int) -> List[ComplianceRuleRead]:
+        return [rule for rule in self.rules if framework_id in rule.framework_ids]
+
+
+def get_matrix(db: Session) -> ComplianceMatrix:
+    """Cached :class:`ComplianceMatrix` for the current catalog."""
+    version = _MATRIX_VERSION
+    return _MATRIX_CACHE.get(version, lambda: _load_matrix(db))
+
+
+def _load_matrix(db: Session) -> ComplianceMatrix:
+    frameworks = (
+        db.query(
+            ComplianceFramework.id,
+            ComplianceFramework.name,
+            ComplianceFramework.code,
+            ComplianceFramework.description,
+            ComplianceFramework.category,
+        )
+        .order_by(ComplianceFramework.name.asc())
+        .all()
+    )
+    rules = (
+        db.query(
+            ComplianceRule.id,
+            ComplianceRule.control_id,
+            ComplianceRule.title,
+            ComplianceRule.description,
+            ComplianceRule.category,
+            ComplianceRule.service_area,
+        )
+        .order_by(ComplianceRule.control_id.asc())
+        .all()
+    )
+    links = (
+        db.query(ComplianceRuleFramework.rule_id, ComplianceRuleFramework.framework_id)
+        .order_by(ComplianceRuleFramework.id.asc())
+        .all()
+    )
+    return ComplianceMatrix.build(frameworks, rules, links)
+
+
+def _on_catalog_commit(_changed) -> None:
+    global _MATRIX_VERSION
+    with _VERSION_LOCK:
+        _MATRIX_VERSION += 1
+    _MATRIX_CACHE.clear()
+
+
+cache_bus.subscribe("compliance_matrix", _on_catalog_commit)
+for _model in (ComplianceFramework, ComplianceRule, ComplianceRuleFramework):
+    on_commit(_model, functools.partial(cache_bus.publish, "compliance_matrix"))
+
+
+__all__ = ["ComplianceMatrix", "get_matrix"]
@@ -0,0 +1,242 @@
+"""Incrementally maintained daily compliance rollups.
+
+``compliance_daily_rollups`` keeps pass/fail counters per tenant, module and
+UTC day, so trend queries cost O(days) however many results were recorded.
+The counters move inside the transaction that writes ``ComplianceResult``:
+
+* ORM inserts, updates and deletes adjust the affected counters from mapper
+  events (inserts upsert the counter row);
+* bulk ``query(ComplianceResult).update()``/``delete()`` statements are
+  diffed by aggregating the matched rows before and after the statement.
+
+Importing this module installs the hooks; every process that writes results
+must import it.  Raw SQL writes bypass them, so :func:`rebuild_rollups`
+recomputes counters from the results table.  The
+``tenantra.compliance.repair_rollups`` task runs it over recent days.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, case, cast, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.compliance_daily_rollup import ComplianceDailyRollup
+from app.models.compliance_result import ComplianceResult
+
+logger = logging.getLogger("tenantra.compliance")
+
+RollupKey = Tuple[int, str, date]
+# [pass delta, fail delta] per rollup row
+Deltas = Dict[RollupKey, List[int]]
+
+_RESULTS = ComplianceResult.__table__
+_ROLLUPS = ComplianceDailyRollup.__table__
+_CONFLICT_COLUMNS = ["tenant_id", "module", "day"]
+
+
+def is_pass(status: Optional[str]) -> bool:
+    return (status or "").strip().lower() == "pass"
+
+
+def day_bucket(dialect_name: str, column=_RESULTS.c.recorded_at):
+    """SQL expression truncating ``column`` to its UTC day."""
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc("day", column), Date)
+    # SQLite/MySQL: DATE() yields the ISO day (a string on SQLite).
+    return func.date(column)
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _add(deltas: Deltas, tenant_id, module, day, status, count: int) -> None:
+    day = _as_date(day)
+    if tenant_id is None or module is None or day is None or not count:
+        return
+    counts = deltas.setdefault((tenant_id, module, day), [0, 0])
+    counts[0 if is_pass(status) else 1] += count
+
+
+def apply_deltas(connection, deltas: Deltas) -> None:
+    """Add ``deltas`` to the rollup rows on ``connection`` (inside the caller's transaction)."""
+    for (tenant_id, module, day), (passed, failed) in deltas.items():
+        if not passed and not failed:
+            continue
+        if passed < 0 or failed < 0:
+            # Decrements only ever apply to rows an earlier insert created;
+            # never recreate rows a tenant delete cascaded away.
+            connection.execute(
+                _ROLLUPS.update()
+                .where(_ROLLUPS.c.tenant_id == tenant_id, _ROLLUPS.c.module == module, _ROLLUPS.c.day == day)
+                .values(pass_count=_ROLLUPS.c.pass_count + passed, fail_count=_ROLLUPS.c.fail_count + failed)
+            )
+        else:
+            _upsert(connection, tenant_id, module, day, passed, failed)
+
+
+def _upsert(connection, tenant_id: int, module: str, day: date, passed: int, failed: int) -> None:
+    values = {"tenant_id": tenant_id, "module": module, "day": day, "pass_count": passed, "fail_count": failed}
+    dialect = connection.dialect.name
+    if dialect in {"postgresql", "sqlite"}:
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(_ROLLUPS).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=_CONFLICT_COLUMNS,
+            set_={
+                "pass_count": _ROLLUPS.c.pass_count + stmt.excluded.pass_count,
+                "fail_count": _ROLLUPS.c.fail_count + stmt.excluded.fail_count,
+            },
+        )
+        connection.execute(stmt)
+        return
+    updated = connection.execute(
+        _ROLLUPS.update()
+        .where(_ROLLUPS.c.tenant_id == tenant_id, _ROLLUPS.c.module == module, _ROLLUPS.c.day == day)
+        .values(pass_count=_ROLLUPS.c.pass_count + passed, fail_count=_ROLLUPS.c.fail_count + failed)
+    )
+    if not updated.rowcount:
+        connection.execute(_ROLLUPS.insert().values(**values))
+
+
+# ---------------------------------------------------------------------------
+# ORM unit-of-work hooks
+# ---------------------------------------------------------------------------
+
+_TRACKED = ("tenant_id", "module", "recorded_at", "status")
+
+
+def _stored_row(connection, target):
+    # Read the pre-image straight from the table: the instance may be expired
+    # and must not be refreshed mid-flush.
+    identity = inspect(target).identity
+    if not identity:
+        return None
+    columns = [_RESULTS.c[name] for name in _TRACKED]
+    return connection.execute(select(*columns).where(_RESULTS.c.id == identity[0])).first()
+
+
+def _after_insert(_mapper, connection, target) -> None:
+    deltas: Deltas = {}
+    _add(deltas, target.tenant_id, target.module, target.recorded_at, target.status, 1)
+    apply_deltas(connection, deltas)
+
+
+def _before_update(_mapper, connection, target) -> None:
+    state = inspect(target)
+    history = {name: state.attrs[name].history for name in _TRACKED}
+    if not any(item.has_changes() for item in history.values()):
+        return
+    old = _stored_row(connection, target)
+    if old is None:
+        return
+    new = {name: (item.added[0] if item.added else getattr(old, name)) for name, item in history.items()}
+    deltas: Deltas = {}
+    _add(deltas, old.tenant_id, old.module, old.recorded_at, old.status, -1)
+    _add(deltas, new["tenant_id"], new["module"], new["recorded_at"], new["status"], 1)
+    apply_deltas(connection, deltas)
+
+
+def _before_delete(_mapper, connection, target) -> None:
+    old = _stored_row(connection, target)
+    if old is None:
+        return
+    deltas: Deltas = {}
+    _add(deltas, old.tenant_id, old.module, old.recorded_at, old.status, -1)
+    apply_deltas(connection, deltas)
+
+
+def _aggregate(session: Session, where, sign: int, deltas: Deltas) -> None:
+    day = day_bucket(session.get_bind().dialect.name).label("day")
+    query = select(_RESULTS.c.tenant_id, _RESULTS.c.module, day, _RESULTS.c.status, func.count().label("total"))
+    if where is not None:
+        query = query.where(where)
+    query = query.group_by(_RESULTS.c.tenant_id, _RESULTS.c.module, day, _RESULTS.c.status)
+    for row in session.execute(query):
+        _add(deltas, row.tenant_id, row.module, row.day, row.status, sign * row.total)
+
+
+def _on_bulk_statement(state):
+    if not (state.is_update or state.is_delete):
+        return None
+    mapper = state.bind_mapper
+    if mapper is None or mapper.class_ is not ComplianceResult:
+        return None
+    session = state.session
+    where = state.statement.whereclause
+    deltas: Deltas = {}
+    if state.is_delete:
+        _aggregate(session, where, -1, deltas)
+        result = state.invoke_statement()
+    else:
+        ids_query = select(_RESULTS.c.id)
+        if where is not None:
+            ids_query = ids_query.where(where)
+        ids = list(session.execute(ids_query).scalars())
+        if not ids:
+            return None
+        _aggregate(session, _RESULTS.c.id.in_(ids), -1, deltas)
+        result = state.invoke_statement()
+        _aggregate(session, _RESULTS.c.id.in_(ids), 1, deltas)
+    apply_deltas(session.connection(), deltas)
+    return result
+
+
+event.listen(ComplianceResult, "after_insert", _after_insert)
+event.listen(ComplianceResult, "before_update", _before_update)
+event.listen(ComplianceResult, "before_delete", _before_delete)
+event.listen(Session, "do_orm_execute", _on_bulk_statement)
+
+
+# ---------------------------------------------------------------------------
+# Backfill / repair
+# ---------------------------------------------------------------------------
+
+
+def rebuild_rollups(db: Session, *, tenant_id: Optional[int] = None, since: Optional[date] = None) -> int:
+    """Recompute rollups from ``compliance_results``; the caller commits.
+
+    Scope it with ``tenant_id`` and/or ``since`` (first day to rebuild);
+    returns the number of rollup rows written.
+    """
+    day = day_bucket(db.get_bind().dialect.name)
+    passing = func.lower(func.trim(_RESULTS.c.status)) == "pass"
+    source = select(
+        _RESULTS.c.tenant_id,
+        _RESULTS.c.module,
+        day,
+        func.sum(case((passing, 1), else_=0)),
+        func.sum(case((passing, 0), else_=1)),
+    ).group_by(_RESULTS.c.tenant_id, _RESULTS.c.module, day)
+    clear = _ROLLUPS.delete()
+    if tenant_id is not None:
+        source = source.where(_RESULTS.c.tenant_id == tenant_id)
+        clear = clear.where(_ROLLUPS.c.tenant_id == tenant_id)
+    if since is not None:
+        source = source.where(_RESULTS.c.recorded_at >= datetime.combine(since, time.min))
+        clear = clear.where(_ROLLUPS.c.day >= since)
+
+    connection = db.connection()
+    connection.execute(clear)
+    written = connection.execute(
+        _ROLLUPS.insert().from_select(["tenant_id", "module", "day", "pass_count", "fail_count"], source)
+    ).rowcount
+    logger.info("Rebuilt %s compliance rollup rows (tenant=%s since=%s)", written, tenant_id, since)
+    return written
+
+
+__all__ = ["apply_deltas", "day_bucket", "is_pass", "rebuild_rollups"]
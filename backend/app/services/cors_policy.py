@@ -0,0 +1,229 @@
+"""Cached CORS origin policy.
+
+Environment settings are parsed once.  Enabled ``TenantCORSOrigin`` rows are
+held as a frozenset inside an immutable :class:`CORSPolicy` snapshot together
+with the pre-encoded response header block for every allowed origin, so the
+middleware does one dict lookup per request and never touches the database.
+
+The DB origins are reloaded off the request path: a stale snapshot (older
+than ``CORS_DB_CACHE_TTL``) is served while a background thread refreshes it,
+and ``cors_admin`` writes call :func:`invalidate`, which reloads immediately
+in this process and, through the cache bus, in every other one.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from app.cache import bus as cache_bus
+
+logger = logging.getLogger("tenantra.cors_policy")
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+CACHE_TTL = int(os.getenv("CORS_DB_CACHE_TTL", "30"))
+BUS_NAMESPACE = "cors"
+
+_DEV_DEFAULT_ORIGINS = "http://localhost:5173,http://127.0.0.1:5173,http://localhost,http://127.0.0.1"
+
+
+def _split(raw: str) -> List[str]:
+    return [item.strip() for item in raw.split(",") if item.strip()]
+
+
+@dataclass(frozen=True)
+class CORSSettings:
+    env_origins: FrozenSet[str]
+    allow_credentials: bool
+    allowed_headers: Tuple[str, ...]
+    allowed_methods: Tuple[str, ...]
+    max_age: str
+
+    @classmethod
+    def from_env(cls) -> "CORSSettings":
+        env_origins = frozenset(_split(os.getenv("CORS_ALLOWED_ORIGINS", "")))
+        if not env_origins:
+            env_origins = frozenset(_split(os.getenv("TENANTRA_DEV_CORS_DEFAULT", _DEV_DEFAULT_ORIGINS)))
+        return cls(
+            env_origins=env_origins,
+            allow_credentials=os.getenv("CORS_ALLOW_CREDENTIALS", "false").lower() in ("1", "true", "yes"),
+            allowed_headers=tuple(_split(os.getenv("CORS_ALLOWED_HEADERS", "Authorization,Content-Type"))),
+            allowed_methods=tuple(_split(os.getenv("CORS_ALLOWED_METHODS", "GET,POST,PUT,DELETE,OPTIONS"))),
+            max_age=os.getenv("CORS_MAX_AGE", "600"),
+        )
+
+    def static_headers(self) -> RawHeaders:
+        headers: RawHeaders = []
+        if self.allow_credentials:
+            headers.append((b"access-control-allow-credentials", b"true"))
+        headers.extend(
+            [
+                (b"vary", b"Origin"),
+                (b"access-control-allow-methods", ", ".join(self.allowed_methods).encode("latin-1")),
+                (b"access-control-allow-headers", ", ".join(self.allowed_headers).encode("latin-1")),
+                (b"access-control-max-age", self.max_age.encode("latin-1")),
+            ]
+        )
+        return headers
+
+
+@dataclass(frozen=True)
+class CORSPolicy:
+    settings: CORSSettings
+    db_origins: FrozenSet[str]
+    version: int
+    loaded_at: float
+    # origin -> complete header block for responses to that origin
+    _blocks: Dict[str, RawHeaders] = field(repr=False)
+    # header block used when the request carries no Origin header
+    default_block: Optional[RawHeaders] = field(repr=False)
+    header_names: FrozenSet[bytes] = field(repr=False)
+
+    @classmethod
+    def build(cls, settings: CORSSettings, db_origins: FrozenSet[str], version: int) -> "CORSPolicy":
+        static = settings.static_headers()
+        blocks: Dict[str, RawHeaders] = {}
+        for origin in settings.env_origins | db_origins:
+            try:
+                encoded = origin.encode("latin-1")
+            except UnicodeEncodeError:
+                continue
+            blocks[origin] = [(b"access-control-allow-origin", encoded)] + static
+        defaults = sorted(settings.env_origins)
+        return cls(
+            settings=settings,
+            db_origins=db_origins,
+            version=version,
+            loaded_at=time.monotonic(),
+            _blocks=blocks,
+            default_block=blocks.get(defaults[0]) if defaults else None,
+            header_names=frozenset(name for name, _ in static) | {b"access-control-allow-origin"},
+        )
+
+    def is_allowed(self, origin: Optional[str]) -> bool:
+        return bool(origin) and origin in self._blocks
+
+    def headers_for(self, origin: Optional[str]) -> Optional[RawHeaders]:
+        """Header block for ``origin``; ``None`` if it is not allowed."""
+        if not origin:
+            return self.default_block
+        return self._blocks.get(origin)
+
+
+def _load_db_origins() -> FrozenSet[str]:
+    from app.database import SessionLocal
+    from app.models.tenant_cors_origin import TenantCORSOrigin
+
+    db = SessionLocal()
+    try:
+        rows = db.query(TenantCORSOrigin.origin).filter(TenantCORSOrigin.enabled == True).all()  # noqa: E712
+        return frozenset(str(origin).strip() for (origin,) in rows if origin and str(origin).strip())
+    finally:
+        db.close()
+
+
+class CORSPolicyService:
+    def __init__(self, *, ttl: float = CACHE_TTL, settings: Optional[CORSSettings] = None) -> None:
+        self.ttl = ttl
+        self._settings = settings or CORSSettings.from_env()
+        self._policy = CORSPolicy.build(self._settings, frozenset(), version=0)
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._next_ticket = 0
+        self._installed_ticket = 0
+
+    def policy(self) -> CORSPolicy:
+        """Current snapshot; schedules a background reload when it is stale."""
+        policy = self._policy
+        if not self._loaded or time.monotonic() - policy.loaded_at > self.ttl:
+            self._refresh_in_background()
+        return policy
+
+    def refresh(self) -> CORSPolicy:
+        """Reload DB origins now and swap in a new snapshot.
+
+        Each load takes a ticket before reading; a load that finishes after a
+        later-started one has been installed is discarded, so a slow
+        background refresh cannot put origins back that a write removed.
+        """
+        with self._lock:
+            self._next_ticket += 1
+            ticket = self._next_ticket
+        try:
+            origins: Optional[FrozenSet[str]] = _load_db_origins()
+        except Exception:
+            logger.debug("Unable to load CORS origins; keeping previous set", exc_info=True)
+            origins = None
+        with self._lock:
+            current = self._policy
+            if ticket < self._installed_ticket:
+                return current
+            if origins is None:
+                # Keep the previous set; only push the next TTL reload out.
+                origins = current.db_origins
+                ticket = self._installed_ticket
+            version = current.version + (1 if origins != current.db_origins else 0)
+            self._policy = CORSPolicy.build(self._settings, origins, version)
+            self._installed_ticket = ticket
+            self._loaded = True
+        return self._policy
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run() -> None:
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="cors-policy-refresh", daemon=True).start()
+
+
+_SERVICE: Optional[CORSPolicyService] = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_policy_service() -> CORSPolicyService:
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = CORSPolicyService()
+    return _SERVICE
+
+
+def get_policy() -> CORSPolicy:
+    return get_policy_service().policy()
+
+
+def invalidate() -> None:
+    """Reload DB origins in every process after a ``TenantCORSOrigin`` write."""
+    cache_bus.publish(BUS_NAMESPACE)
+
+
+def _on_invalidate(_changed) -> None:
+    try:
+        get_policy_service().refresh()
+    except Exception:
+        logger.debug("CORS policy invalidation failed", exc_info=True)
+
+
+cache_bus.subscribe(BUS_NAMESPACE, _on_invalidate)
+
+
+def reset() -> None:
+    """Drop the cached service so the next call re-reads the environment."""
+    global _SERVICE
+    with _SERVICE_LOCK:
+        _SERVICE = None
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
-
+import copy
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from app.cache.bus import broadcast_on_commit
+from app.cache.invalidation import tenant_evictor, tenant_namespace
+from app.cache.ttl import get_cache
 from app.models.app_setting import AppSetting
 from app.models.user import User
 
 _ADMIN_ROLES = {"admin", "administrator", "super_admin", "system_admin", "msp_admin"}
 _READONLY_ROLES = {"auditor", "audit", "read_only_admin"}
 
+FLAG_CACHE_TTL = float(os.getenv("TENANTRA_FEATURE_FLAG_CACHE_TTL", "30"))
+
+# Merged flag maps per tenant scope.  AppSetting commits invalidate them in
+# every process (see tenant_evictor); the TTL only bounds drift when the
+# cache bus is not configured.
+_FLAG_CACHE = get_cache("feature_flags", ttl_seconds=FLAG_CACHE_TTL, maxsize=4096)
+
 
 def _deep_merge(dst: Dict[str, Any], src: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     if not isinstance(src, dict):
@@ -22,53 +39,67 @@ def _deep_merge(dst: Dict[str, Any], src: Optional[Dict[str, Any]]) -> Dict[str,
     return dst
 
 
-def _fetch_feature_map(db: Session, tenant_id: Optional[int]) -> Dict[str, Any]:
-    """Load merged feature flags for the provided tenant (global overlaid with tenant overrides)."""
-    flags: Dict[str, Any] = {}
+@dataclass(frozen=True)
+class FeatureFlags:
+    """Merged flags for one tenant scope: global rows overlaid with tenant rows.
 
-    def _merge_scope(query):
-        scoped: Dict[str, Any] = {}
-        for row in query:
-            if row.key == "features" and isinstance(row.value, dict):
-                _deep_merge(scoped, row.value)
-            elif row.key.startswith("features.") and isinstance(row.value, (bool, int)):
-                scoped[row.key.split(".", 1)[1]] = bool(row.value)
-        return scoped
-
-    global_rows = (
-        db.query(AppSetting)
-        .filter(AppSetting.tenant_id.is_(None))
-        .filter(AppSetting.key.in_(["features"]))
-        .all()
-    )
-    _deep_merge(flags, _merge_scope(global_rows))
+    Instances are shared between requests through the cache; use
+    :meth:`as_dict` for a copy that may be modified.
+    """
 
-    global_individual = (
-        db.query(AppSetting)
-        .filter(AppSetting.tenant_id.is_(None))
-        .filter(AppSetting.key.like("features.%"))
-        .all()
+    tenant_id: Optional[int]
+    flags: Mapping[str, Any]
+    # Content hash; equal maps have equal versions in every process.
+    version: str
+
+    @classmethod
+    def build(cls, tenant_id: Optional[int], flags: Dict[str, Any]) -> "FeatureFlags":
+        encoded = json.dumps(flags, sort_keys=True, separators=(",", ":"), default=str)
+        version = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+        return cls(tenant_id=tenant_id, flags=MappingProxyType(flags), version=version)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.flags.get(name, default)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return copy.deepcopy(dict(self.flags))
+
+
+def get_feature_flags(db: Session, tenant_id: Optional[int]) -> FeatureFlags:
+    """Cached :class:`FeatureFlags` for ``tenant_id`` (``None`` for global only)."""
+    return _FLAG_CACHE.get(
+        tenant_id,
+        lambda: _load_feature_flags(db, tenant_id),
+        namespace=tenant_namespace(tenant_id),
     )
-    _deep_merge(flags, _merge_scope(global_individual))
 
-    if tenant_id is not None:
-        tenant_rows = (
-            db.query(AppSetting)
-            .filter(AppSetting.tenant_id == tenant_id)
-            .filter(AppSetting.key.in_(["features"]))
-            .all()
-        )
-        _deep_merge(flags, _merge_scope(tenant_rows))
 
-        tenant_individual = (
-            db.query(AppSetting)
-            .filter(AppSetting.tenant_id == tenant_id)
-            .filter(AppSetting.key.like("features.%"))
-            .all()
-        )
-        _deep_merge(flags, _merge_scope(tenant_individual))
+# Global rows feed every tenant's merged map.
+broadcast_on_commit(AppSetting, "feature_flags", tenant_evictor(_FLAG_CACHE))
 
-    return flags
+
+def _load_feature_flags(db: Session, tenant_id: Optional[int]) -> FeatureFlags:
+    scope = AppSetting.tenant_id.is_(None)
+    if tenant_id is not None:
+        scope = or_(scope, AppSetting.tenant_id == tenant_id)
+    rows = (
+        db.query(AppSetting.id, AppSetting.tenant_id, AppSetting.key, AppSetting.value)
+        .filter(scope)
+        .filter(or_(AppSetting.key == "features", AppSetting.key.like("features.%")))
+        .all()
+    )
+    # Global before tenant; within a scope the "features" map before the
+    # individual "features.<name>" rows that override it.
+    rows.sort(key=lambda row: (row.tenant_id is not None, row.key != "features", row.id))
+
+    flags: Dict[str, Any] = {}
+    for row in rows:
+        if row.key == "features":
+            if isinstance(row.value, dict):
+                _deep_merge(flags, copy.deepcopy(row.value))
+        elif isinstance(row.value, (bool, int)):
+            flags[row.key.split(".", 1)[1]] = bool(row.value)
+    return FeatureFlags.build(tenant_id, flags)
 
 
 class SettingsAccess:
@@ -90,7 +121,7 @@ def resolve_settings_access(db: Session, user: User) -> str:
     else:
         mode = SettingsAccess.DENIED
 
-    flags = _fetch_feature_map(db, user.tenant_id)
+    flags = get_feature_flags(db, user.tenant_id)
 
     settings_flag = flags.get("settings")
     if settings_flag is False:
@@ -123,6 +154,8 @@ def ensure_settings_write_access(db: Session, user: User) -> None:
 
 
 __all__ = [
+    "FeatureFlags",
+    "get_feature_flags",
     "resolve_settings_access",
     "SettingsAccess",
     "ensure_settings_read_access",
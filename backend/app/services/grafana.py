@@ -6,26 +6,13 @@ from urllib.parse import urlparse, urlunparse
 
 from sqlalchemy.orm import Session
 
-from app.models.app_setting import AppSetting
+from app.services.settings_view import get_settings
 from app.core.crypto import decrypt_data
 from app.core.secrets import get_enc_key
 
 
 def _fetch_setting(db: Session, key: str, tenant_id: Optional[int] = None) -> Optional[Any]:
-    if tenant_id is not None:
-        row = (
-            db.query(AppSetting)
-            .filter(AppSetting.tenant_id == tenant_id, AppSetting.key == key)
-            .first()
-        )
-        if row:
-            return row.value
-    row = (
-        db.query(AppSetting)
-        .filter(AppSetting.tenant_id.is_(None), AppSetting.key == key)
-        .first()
-    )
-    return row.value if row else None
+    return get_settings(db, tenant_id).get(key)
 
 
 def _internalize_host(value: str) -> str:
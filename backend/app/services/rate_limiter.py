@@ -0,0 +1,261 @@
+"""Shared token-bucket rate-limit service.
+
+Every limiter in the app (HTTP middleware, export endpoints, Grafana proxy)
+goes through :func:`get_rate_limiter`.  A limit of ``limit`` requests per
+``window`` seconds admits a burst of ``limit`` and then refills one request
+every ``window / limit`` seconds.  State per key is the number of tokens in
+use and when that was last updated, so memory and work per check are O(1)
+regardless of traffic.  Because the state is a token count rather than a
+timestamp list, limits read from settings can change between calls and the
+new value applies immediately.
+
+Two backends are available:
+
+* ``MemoryRateLimitBackend`` (default) keeps bucket state in sharded dicts,
+  each with its own lock, and drops keys whose bucket has fully refilled.
+* ``RedisRateLimitBackend`` runs the same algorithm as a Lua script against
+  Redis so limits are shared by every worker and replica.  It is enabled by
+  setting ``TENANTRA_RATE_LIMIT_REDIS_URL``; when Redis is unreachable the
+  service falls back to the in-memory backend instead of failing requests.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("tenantra.rate_limiter")
+
+try:  # optional dependency
+    import redis as _redis
+    import redis.asyncio as _redis_async
+except Exception:  # pragma: no cover - optional dependency
+    _redis = None
+    _redis_async = None
+
+SHARDS = max(int(os.getenv("TENANTRA_RATE_LIMIT_SHARDS", "32")), 1)
+SWEEP_SECONDS = float(os.getenv("TENANTRA_RATE_LIMIT_SWEEP_SECONDS", "60"))
+REDIS_URL = os.getenv("TENANTRA_RATE_LIMIT_REDIS_URL", "").strip()
+REDIS_PREFIX = os.getenv("TENANTRA_RATE_LIMIT_REDIS_PREFIX", "tenantra:rl:")
+REDIS_RETRY_SECONDS = float(os.getenv("TENANTRA_RATE_LIMIT_REDIS_RETRY_SECONDS", "30"))
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+
+    @property
+    def retry_after_seconds(self) -> int:
+        """``retry_after`` rounded up for the Retry-After header."""
+        return max(1, math.ceil(self.retry_after))
+
+
+def _take(state: Optional[Tuple[float, float]], now: float, limit: int, window: float, cost: int):
+    """Apply one request to a bucket; returns ``(allowed, new_level, remaining, retry_after)``.
+
+    ``state`` is ``(level, updated_at)`` where ``level`` is the number of
+    tokens in use; it drains at ``limit / window`` tokens per second.
+    """
+    rate = limit / window
+    level = 0.0
+    if state is not None:
+        level = max(0.0, state[0] - (now - state[1]) * rate)
+    if level + cost > limit:
+        return False, level, max(0, int(limit - level)), (level + cost - limit) / rate
+    level += cost
+    return True, level, max(0, int(limit - level)), 0.0
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "next_sweep")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # key -> (level, updated_at, empty_at)
+        self.buckets: Dict[str, Tuple[float, float, float]] = {}
+        self.next_sweep = 0.0
+
+
+class MemoryRateLimitBackend:
+    """Per-process bucket state split across independently locked shards."""
+
+    def __init__(self, *, shards: int = SHARDS, sweep_seconds: float = SWEEP_SECONDS) -> None:
+        self._shards: List[_Shard] = [_Shard() for _ in range(max(shards, 1))]
+        self.sweep_seconds = max(sweep_seconds, 0.0)
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[zlib.crc32(key.encode("utf-8")) % len(self._shards)]
+
+    def hit(self, key: str, limit: int, window: float, cost: int = 1) -> RateLimitDecision:
+        now = time.monotonic()
+        shard = self._shard(key)
+        with shard.lock:
+            if now >= shard.next_sweep:
+                # A drained bucket is indistinguishable from having no entry.
+                for stale in [k for k, bucket in shard.buckets.items() if bucket[2] <= now]:
+                    del shard.buckets[stale]
+                shard.next_sweep = now + self.sweep_seconds
+            bucket = shard.buckets.get(key)
+            allowed, level, remaining, retry_after = _take(bucket[:2] if bucket else None, now, limit, window, cost)
+            if allowed:
+                shard.buckets[key] = (level, now, now + level * window / limit)
+        return RateLimitDecision(allowed, limit, remaining, retry_after)
+
+    def reset(self, prefix: str = "") -> None:
+        for shard in self._shards:
+            with shard.lock:
+                if not prefix:
+                    shard.buckets.clear()
+                else:
+                    for key in [k for k in shard.buckets if k.startswith(prefix)]:
+                        del shard.buckets[key]
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+
+# KEYS[1] = bucket key; ARGV = limit, window seconds, cost.
+# The value is "<level> <updated_at>".  Uses the Redis clock so every caller
+# agrees on "now"; the key expires once the bucket has drained, which doubles
+# as idle-key eviction.
+_TOKEN_BUCKET_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = limit / window
+local level = 0
+local raw = redis.call('GET', KEYS[1])
+if raw then
+  local stored, updated = string.match(raw, '^(%S+) (%S+)$')
+  if stored then
+    level = math.max(0, tonumber(stored) - (now - tonumber(updated)) * rate)
+  end
+end
+if level + cost > limit then
+  return {0, math.floor(limit - level), tostring((level + cost - limit) / rate)}
+end
+level = level + cost
+redis.call('SET', KEYS[1], tostring(level) .. ' ' .. tostring(now), 'PX', math.max(1, math.ceil(level / rate * 1000)))
+return {1, math.floor(limit - level), '0'}
+"""
+
+
+class RedisRateLimitBackend:
+    """Cluster-wide bucket state evaluated atomically by a Lua script."""
+
+    def __init__(self, url: str, *, prefix: str = REDIS_PREFIX) -> None:
+        if _redis is None:
+            raise RuntimeError("redis package is not installed")
+        self.prefix = prefix
+        self._client = _redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._script = self._client.register_script(_TOKEN_BUCKET_LUA)
+        self._async_client = _redis_async.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._async_script = self._async_client.register_script(_TOKEN_BUCKET_LUA)
+
+    @staticmethod
+    def _decision(limit: int, raw) -> RateLimitDecision:
+        allowed, remaining, retry_after = raw
+        return RateLimitDecision(bool(int(allowed)), limit, max(0, int(remaining)), float(retry_after))
+
+    def hit(self, key: str, limit: int, window: float, cost: int = 1) -> RateLimitDecision:
+        raw = self._script(keys=[self.prefix + key], args=[limit, window, cost])
+        return self._decision(limit, raw)
+
+    async def ahit(self, key: str, limit: int, window: float, cost: int = 1) -> RateLimitDecision:
+        raw = await self._async_script(keys=[self.prefix + key], args=[limit, window, cost])
+        return self._decision(limit, raw)
+
+    def reset(self, prefix: str = "") -> None:
+        keys = list(self._client.scan_iter(match=f"{self.prefix}{prefix}*", count=500))
+        if keys:
+            self._client.delete(*keys)
+
+
+class RateLimitService:
+    """Front door for all limiters; keys are namespaced per call site."""
+
+    def __init__(self, redis_url: str = REDIS_URL) -> None:
+        self.memory = MemoryRateLimitBackend()
+        self.redis: Optional[RedisRateLimitBackend] = None
+        self._redis_down_until = 0.0
+        if redis_url:
+            try:
+                self.redis = RedisRateLimitBackend(redis_url)
+            except Exception:
+                logger.warning("Redis rate-limit backend unavailable; using in-memory limits", exc_info=True)
+
+    @staticmethod
+    def _key(namespace: str, key: str) -> str:
+        return f"{namespace}:{key}"
+
+    def _use_redis(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self) -> None:
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning(
+            "Redis rate-limit check failed; using in-memory limits for %ss", REDIS_RETRY_SECONDS, exc_info=True
+        )
+
+    def hit(self, namespace: str, key: str, *, limit: int, window: float, cost: int = 1) -> RateLimitDecision:
+        """Consume ``cost`` from the ``namespace``/``key`` bucket.
+
+        ``limit <= 0`` disables limiting and always allows the request.
+        """
+        if limit <= 0:
+            return RateLimitDecision(True, limit, 0)
+        window = max(float(window), 0.001)
+        full_key = self._key(namespace, key)
+        if self._use_redis():
+            try:
+                return self.redis.hit(full_key, limit, window, cost)
+            except Exception:
+                self._redis_failed()
+        return self.memory.hit(full_key, limit, window, cost)
+
+    async def ahit(self, namespace: str, key: str, *, limit: int, window: float, cost: int = 1) -> RateLimitDecision:
+        """Async variant of :meth:`hit` that never blocks the event loop on Redis."""
+        if limit <= 0:
+            return RateLimitDecision(True, limit, 0)
+        window = max(float(window), 0.001)
+        full_key = self._key(namespace, key)
+        if self._use_redis():
+            try:
+                return await self.redis.ahit(full_key, limit, window, cost)
+            except Exception:
+                self._redis_failed()
+        return self.memory.hit(full_key, limit, window, cost)
+
+    def reset(self, namespace: Optional[str] = None) -> None:
+        """Forget bucket state for ``namespace`` (or everything); mainly for tests."""
+        prefix = f"{namespace}:" if namespace else ""
+        self.memory.reset(prefix)
+        if self.redis is not None:
+            try:
+                self.redis.reset(prefix)
+            except Exception:
+                logger.debug("Unable to reset Redis rate-limit keys", exc_info=True)
+
+
+_SERVICE: Optional[RateLimitService] = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimitService:
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = RateLimitService()
+    return _SERVICE
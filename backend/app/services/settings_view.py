@@ -0,0 +1,145 @@
+"""Typed, cached read access to ``AppSetting`` values.
+
+``get_settings(db, tenant_id)`` returns a :class:`SettingsView` holding every
+global setting overlaid with the tenant's own rows, loaded in one query and
+memoized per tenant.  Request paths that read several keys (Grafana proxy,
+integrity ingest) therefore issue at most one settings query per tenant per
+cache lifetime instead of one or two per key::
+
+    settings = get_settings(db, user.tenant_id)
+    limit = settings.get_int("grafana.proxy.max_body_bytes", default=1 << 20)
+
+Async handlers resolve the view with ``await get_settings_async(db, tenant_id)``
+before handing work to ``AsyncSession.run_sync``; it shares the cache but
+queries through the async session on a miss.
+
+Keys that must never inherit a global value, such as alert recipients, are
+read from ``settings.tenant_only()``.
+
+AppSetting commits evict the affected tenant (or everything, for global
+rows) in every process through the cache bus.  Values are shared between
+requests and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.cache.bus import broadcast_on_commit
+from app.cache.invalidation import tenant_evictor, tenant_namespace
+from app.cache.ttl import get_cache
+from app.models.app_setting import AppSetting
+
+logger = logging.getLogger("tenantra.settings")
+
+SETTINGS_VIEW_TTL = float(os.getenv("TENANTRA_SETTINGS_VIEW_TTL", "300"))
+
+_VIEW_CACHE = get_cache("settings_view", ttl_seconds=SETTINGS_VIEW_TTL, maxsize=4096)
+
+
+class SettingsView:
+    """Effective settings for one tenant: tenant rows take precedence over global rows."""
+
+    __slots__ = ("tenant_id", "_values", "_tenant_only")
+
+    def __init__(
+        self,
+        tenant_id: Optional[int],
+        values: Dict[str, Any],
+        tenant_values: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.tenant_id = tenant_id
+        self._values: Mapping[str, Any] = MappingProxyType(values)
+        self._tenant_only: Optional[SettingsView] = (
+            SettingsView(tenant_id, tenant_values) if tenant_values is not None else None
+        )
+
+    def tenant_only(self) -> "SettingsView":
+        """The tenant's own rows, without global fallbacks (empty for the global view)."""
+        if self._tenant_only is None:
+            return SettingsView(self.tenant_id, {})
+        return self._tenant_only
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._values.get(key, default)
+
+    def get_str(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        value = self._values.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+        return default
+
+    def get_int(self, key: str, default: int) -> int:
+        value = self._values.get(key)
+        if value in (None, "", False):
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            logger.warning("Invalid %s setting; using default", key)
+            return default
+
+    def get_str_list(self, key: str, *, sep: Optional[str] = ",") -> List[str]:
+        """List values as strings; a string value is split on ``sep`` (kept whole when ``None``)."""
+        value = self._values.get(key)
+        if isinstance(value, list):
+            return [str(item) for item in value]
+        if isinstance(value, str):
+            if sep is None:
+                return [value]
+            return [part.strip() for part in value.split(sep) if part.strip()]
+        return []
+
+
+def get_settings(db: Session, tenant_id: Optional[int] = None) -> SettingsView:
+    """Cached :class:`SettingsView` for ``tenant_id`` (global settings only for ``None``)."""
+    return _VIEW_CACHE.get(tenant_id, lambda: _load_view(db, tenant_id), namespace=tenant_namespace(tenant_id))
+
+
+async def get_settings_async(db: AsyncSession, tenant_id: Optional[int] = None) -> SettingsView:
+    """:func:`get_settings` for an ``AsyncSession``, loading misses without blocking the event loop."""
+    view = _VIEW_CACHE.peek(tenant_id)
+    if view is None:
+        generation = _VIEW_CACHE.generation
+        rows = (await db.execute(_view_query(tenant_id))).all()
+        view = _build_view(tenant_id, rows)
+        _VIEW_CACHE.set(tenant_id, view, namespace=tenant_namespace(tenant_id), generation=generation)
+    return view
+
+
+def _load_view(db: Session, tenant_id: Optional[int]) -> SettingsView:
+    return _build_view(tenant_id, db.execute(_view_query(tenant_id)).all())
+
+
+def _view_query(tenant_id: Optional[int]):
+    scope = AppSetting.tenant_id.is_(None)
+    if tenant_id is not None:
+        scope = or_(scope, AppSetting.tenant_id == tenant_id)
+    return select(AppSetting.tenant_id, AppSetting.key, AppSetting.value).where(scope)
+
+
+def _build_view(tenant_id: Optional[int], rows) -> SettingsView:
+    values: Dict[str, Any] = {}
+    tenant_values: Dict[str, Any] = {}
+    # Global rows first so tenant rows overwrite them.
+    for row in sorted(rows, key=lambda row: row.tenant_id is not None):
+        values[row.key] = row.value
+        if row.tenant_id is not None:
+            tenant_values[row.key] = row.value
+    return SettingsView(tenant_id, values, tenant_values if tenant_id is not None else None)
+
+
+broadcast_on_commit(AppSetting, "settings_view", tenant_evictor(_VIEW_CACHE))
+
+
+__all__ = ["SettingsView", "get_settings", "get_settings_async"]
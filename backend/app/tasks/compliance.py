@@ -0,0 +1,26 @@
+"""Celery task repairing daily compliance rollups."""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timedelta
+
+from app.celery_app import celery_app
+from app.db.session import get_db_session
+from app.services.compliance_rollups import rebuild_rollups
+
+logger = logging.getLogger("tenantra.tasks.compliance")
+
+REPAIR_DAYS = int(os.getenv("TENANTRA_COMPLIANCE_ROLLUP_REPAIR_DAYS", "2"))
+
+
+@celery_app.task(name="tenantra.compliance.repair_rollups")
+def repair_rollups_task(days: int = REPAIR_DAYS, tenant_id: int | None = None) -> dict[str, int]:
+    """Rebuild rollups for the last ``days`` days (``days <= 0`` rebuilds everything)."""
+    since = datetime.utcnow().date() - timedelta(days=days - 1) if days > 0 else None
+    with get_db_session() as session:
+        written = rebuild_rollups(session, tenant_id=tenant_id, since=since)
+        session.commit()
+    logger.debug("Rebuilt %s compliance rollup rows", written)
+    return {"rows": written}
@@ -0,0 +1,89 @@
+"""Decoding helpers for bulk payloads uploaded by agents.
+
+Agents may gzip their request bodies and, when ``msgpack`` is installed, send
+``application/msgpack`` instead of JSON.  Decompression is bounded so a small
+compressed upload cannot expand into an arbitrarily large buffer.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any, AsyncIterator
+
+from fastapi import HTTPException, Request, status
+
+try:  # pragma: no cover - optional dependency
+    import msgpack  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    msgpack = None
+
+MSGPACK_CONTENT_TYPES = {"application/msgpack", "application/x-msgpack", "application/vnd.msgpack"}
+
+
+def _content_encoding(request: Request) -> str:
+    return (request.headers.get("content-encoding") or "identity").strip().lower()
+
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Payload exceeds {limit} bytes",
+    )
+
+
+async def iter_request_body(request: Request, max_bytes: int) -> AsyncIterator[bytes]:
+    """Yield the (decompressed) request body chunk by chunk, enforcing ``max_bytes``."""
+    encoding = _content_encoding(request)
+    if encoding not in {"identity", "gzip", "x-gzip"}:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported Content-Encoding: {encoding}",
+        )
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding != "identity" else None
+    total = 0
+    async for chunk in request.stream():
+        if not chunk:
+            continue
+        if decompressor is not None:
+            try:
+                chunk = decompressor.decompress(chunk, max_bytes - total + 1)
+            except zlib.error:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid gzip payload")
+            if decompressor.unconsumed_tail:
+                raise _too_large(max_bytes)
+        total += len(chunk)
+        if total > max_bytes:
+            raise _too_large(max_bytes)
+        if chunk:
+            yield chunk
+    if decompressor is not None:
+        tail = decompressor.flush()
+        total += len(tail)
+        if total > max_bytes:
+            raise _too_large(max_bytes)
+        if tail:
+            yield tail
+
+
+async def read_request_body(request: Request, max_bytes: int) -> bytes:
+    return b"".join([chunk async for chunk in iter_request_body(request, max_bytes)])
+
+
+def decode_payload(raw: bytes, content_type: str | None) -> Any:
+    """Decode a JSON or msgpack document according to ``content_type``."""
+    media_type = (content_type or "application/json").split(";", 1)[0].strip().lower()
+    if media_type in MSGPACK_CONTENT_TYPES:
+        if msgpack is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="msgpack payloads are not supported on this server",
+            )
+        try:
+            return msgpack.unpackb(raw, raw=False, timestamp=3)
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid msgpack payload")
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON payload")
@@ -0,0 +1,28 @@
+"""Backfill or repair compliance_daily_rollups from compliance_results."""
+
+from __future__ import annotations
+
+import argparse
+from datetime import date
+
+from app.database import SessionLocal
+from app.services.compliance_rollups import rebuild_rollups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild daily compliance rollups from raw results")
+    parser.add_argument("--tenant-id", type=int, default=None, help="Only rebuild this tenant")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="First day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        written = rebuild_rollups(session, tenant_id=args.tenant_id, since=args.since)
+        session.commit()
+        print("Rebuilt", written, "compliance rollup rows")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from app.models.compliance_result import ComplianceResult
 from app.models.network_visibility_result import NetworkVisibilityResult
 from app.models.service_snapshot import ServiceSnapshot
 from app.models.task_snapshot import TaskSnapshot
+from app.services import compliance_rollups  # noqa: F401  (keeps rollups in step with result writes)
 
 
 def _ensure_agent(session, name: str, tenant_id: int) -> Agent:
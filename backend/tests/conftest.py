@@ -111,3 +111,12 @@ def _ensure_api_server_and_env():
             proc.kill()
     except Exception:
         pass
+
+
+@pytest.fixture(autouse=True)
+def _reset_http_rate_limits():
+    """TestClient requests all share one middleware bucket; start each test with a fresh window."""
+    from app.services.rate_limiter import get_rate_limiter
+
+    get_rate_limiter().reset("http")
+    yield
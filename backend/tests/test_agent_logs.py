@@ -0,0 +1,105 @@
+import gzip
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import agent_log_ingest
+
+from .helpers import ADMIN_PASSWORD, ADMIN_USERNAME
+
+client = TestClient(app)
+
+
+def _admin_headers() -> dict[str, str]:
+    resp = client.post("/auth/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_ndjson_log_stream_and_keyset_listing():
+    headers = _admin_headers()
+    enroll = client.post("/agents/enroll", json={"name": "log-stream-agent"}, headers=headers)
+    assert enroll.status_code == 200, enroll.text
+    agent_id = enroll.json()["agent_id"]
+
+    lines = [json.dumps({"severity": "info", "message": f"line {i}"}) for i in range(5)]
+    lines.insert(2, "{not json")
+    lines.append(json.dumps({"severity": "loud", "message": "bad severity"}))
+    resp = client.post(
+        f"/agents/{agent_id}/logs/stream",
+        content=gzip.compress("\n".join(lines).encode("utf-8")),
+        headers={
+            "X-Agent-Token": enroll.json()["token"],
+            "Content-Type": "application/x-ndjson",
+            "Content-Encoding": "gzip",
+        },
+    )
+    assert resp.status_code == 202, resp.text
+    body = resp.json()
+    assert body["accepted"] == 5
+    assert body["rejected"] == 2
+    assert [err["line"] for err in body["errors"]] == [3, 7]
+
+    agent_log_ingest.get_buffer().flush()
+
+    first = client.get(f"/agents/{agent_id}/logs?limit=3", headers=headers)
+    assert first.status_code == 200
+    assert len(first.json()) == 3
+    cursor = first.headers["x-next-cursor"]
+
+    second = client.get(f"/agents/{agent_id}/logs?limit=3&cursor={cursor}", headers=headers)
+    assert second.status_code == 200
+    assert len(second.json()) == 2
+    assert "x-next-cursor" not in second.headers
+    seen = {row["id"] for row in first.json()} | {row["id"] for row in second.json()}
+    assert len(seen) == 5
+
+
+def test_log_buffer_applies_backpressure():
+    from datetime import datetime
+
+    now = datetime.utcnow()
+    rows = [agent_log_ingest.build_row(1, {"message": f"bp {i}"}, now) for i in range(6)]
+    buffer = agent_log_ingest.AgentLogBuffer(flush_rows=5, flush_seconds=60, max_rows=5)
+    try:
+        assert buffer.offer(rows[:4])
+        assert not buffer.offer(rows[4:])
+        assert len(buffer) == 4
+    finally:
+        buffer.close()
+    assert len(buffer) == 0
+    assert buffer.flushed_rows == 4
+
+
+def test_log_buffer_drops_only_rows_the_database_rejects():
+    from datetime import datetime
+
+    from app.database import SessionLocal
+    from app.models.agent_log import AgentLog
+
+    now = datetime.utcnow()
+    rows = [agent_log_ingest.build_row(1, {"message": f"poison-mix {i}"}, now) for i in range(7)]
+    # NOT NULL violation stands in for a row Postgres would reject (FK, encoding).
+    rows.insert(3, dict(rows[0], message=None))
+    buffer = agent_log_ingest.AgentLogBuffer(flush_rows=100, flush_seconds=60, max_rows=100)
+    try:
+        assert buffer.offer(rows)
+        assert buffer.flush() == 7
+        assert buffer.dropped_rows == 1
+        assert len(buffer) == 0
+    finally:
+        buffer.close()
+    db = SessionLocal()
+    try:
+        stored = db.query(AgentLog).filter(AgentLog.message.like("poison-mix %")).count()
+    finally:
+        db.close()
+    assert stored == 7
+
+
+def test_build_row_strips_nul_characters():
+    from datetime import datetime
+
+    row = agent_log_ingest.build_row(1, {"message": "bad\u0000byte"}, datetime.utcnow())
+    assert row["message"] == "badbyte"
@@ -56,3 +56,100 @@ def test_agent_can_submit_results():
         assert record.status == "success"
     finally:
         session.close()
+
+
+def test_agent_can_submit_results_in_gzip_batch():
+    import gzip
+    import json
+
+    admin_token = _login_admin()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    module = client.get("/modules/", headers=headers).json()[0]
+    enroll_resp = client.post("/agents/enroll", json={"name": "agent-batch-test"}, headers=headers)
+    assert enroll_resp.status_code == 200
+    agent_id = enroll_resp.json()["agent_id"]
+
+    body = {
+        "agent_id": agent_id,
+        "results": [
+            {"module_id": module["id"], "status": "success", "details": {"n": 1}},
+            {"module_name": module["name"], "status": "failed", "recorded_at": "2024-01-02T03:04:05Z"},
+            {"module_name": "no-such-module", "status": "success"},
+            {"status": "success"},
+        ],
+    }
+    resp = client.post(
+        "/agents/results/batch",
+        content=gzip.compress(json.dumps(body).encode("utf-8")),
+        headers={
+            "X-Agent-Token": enroll_resp.json()["token"],
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+        },
+    )
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["accepted"] == 2 and data["rejected"] == 2
+    statuses = [item["status"] for item in data["items"]]
+    assert statuses == ["created", "created", "error", "error"]
+    assert data["items"][2]["error"] == "Module not found"
+
+    session = SessionLocal()
+    try:
+        ids = [data["items"][0]["id"], data["items"][1]["id"]]
+        rows = session.query(ScanModuleResult).filter(ScanModuleResult.id.in_(ids)).order_by(ScanModuleResult.id).all()
+        assert [row.status for row in rows] == ["success", "failed"]
+        assert all(row.agent_id == agent_id and row.module_id == module["id"] for row in rows)
+    finally:
+        session.close()
+
+
+def test_batch_survives_a_module_deleted_after_the_catalog_was_cached():
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import engine
+    from app.models.agent import Agent
+    from app.models.module import Module
+    from app.services import agent_config, agent_results
+
+    setup = SessionLocal()
+    try:
+        kept = setup.query(Module).first()
+        doomed = Module(name="deleted-mid-batch", category="test")
+        agent = Agent(tenant_id=1, name="fk-batch-agent", token="fk-batch-token")
+        setup.add_all([doomed, agent])
+        setup.commit()
+        agent_config.invalidate_catalog()
+        assert doomed.id in agent_config.get_module_index(setup).ids
+        # Delete behind the cached catalog's back.
+        setup.query(Module).filter(Module.id == doomed.id).delete()
+        setup.commit()
+        kept_id, doomed_id, agent_id = kept.id, doomed.id, agent.id
+    finally:
+        setup.close()
+
+    strict = create_engine(engine.url)
+    event.listen(strict, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    db = sessionmaker(bind=strict)()
+    try:
+        agent = db.get(Agent, agent_id)
+        assert doomed_id in agent_config.get_module_index(db).ids
+        outcomes = agent_results.ingest_results(
+            db,
+            agent,
+            [
+                {"module_id": kept_id, "status": "success"},
+                {"module_id": doomed_id, "status": "success"},
+            ],
+        )
+    finally:
+        db.close()
+        strict.dispose()
+    assert [item["status"] for item in outcomes] == ["created", "error"]
+    assert outcomes[1]["error"] == "Module not found"
+    check = SessionLocal()
+    try:
+        assert doomed_id not in agent_config.get_module_index(check).ids
+    finally:
+        check.close()
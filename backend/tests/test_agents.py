@@ -58,3 +58,151 @@ def test_agent_self_enrollment_flow():
         headers={"X-Agent-Token": data["token"]},
     )
     assert cfg_resp.status_code == 200, cfg_resp.text
+
+
+def test_agent_config_etag_and_invalidation():
+    headers = _login_admin()
+    enroll = client.post("/agents/enroll", headers=headers, json={"name": "etag-agent"})
+    assert enroll.status_code == 200, enroll.text
+    agent_id = enroll.json()["agent_id"]
+    agent_headers = {"X-Agent-Token": enroll.json()["token"]}
+
+    first = client.get(f"/agents/config/{agent_id}", headers=agent_headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert not etag.startswith("W/")
+
+    unchanged = client.get(
+        f"/agents/config/{agent_id}",
+        headers={**agent_headers, "If-None-Match": etag},
+    )
+    assert unchanged.status_code == 304
+
+    held = client.get(
+        f"/agents/config/{agent_id}?wait=1",
+        headers={**agent_headers, "If-None-Match": etag},
+    )
+    assert held.status_code == 304
+
+    modules = client.get("/modules/", headers=headers).json()
+    target = modules[0]
+    currently_enabled = target["name"] in first.json()["modules"]
+    toggled = client.put(
+        f"/modules/{target['id']}",
+        headers=headers,
+        json={"enabled": not currently_enabled},
+    )
+    assert toggled.status_code == 200, toggled.text
+
+    changed = client.get(
+        f"/agents/config/{agent_id}",
+        headers={**agent_headers, "If-None-Match": etag},
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert (target["name"] in changed.json()["modules"]) is (not currently_enabled)
+
+    restored = client.put(f"/modules/{target['id']}", headers=headers, json={"enabled": currently_enabled})
+    assert restored.status_code == 200
+
+
+def test_agent_heartbeats_are_coalesced_and_exposed_as_liveness():
+    from app.services import agent_heartbeats
+
+    headers = _login_admin()
+    enroll = client.post("/agents/enroll", headers=headers, json={"name": "heartbeat-agent"})
+    assert enroll.status_code == 200, enroll.text
+    agent_id = enroll.json()["agent_id"]
+    agent_headers = {"X-Agent-Token": enroll.json()["token"]}
+
+    assert client.get(f"/agents/config/{agent_id}", headers=agent_headers).status_code == 200
+
+    liveness = client.get("/admin/agents/liveness", headers=headers, params={"tenant_id": 1})
+    assert liveness.status_code == 200, liveness.text
+    entry = next(item for item in liveness.json()["agents"] if item["agent_id"] == agent_id)
+    assert entry["state"] == "online"
+
+    agent_heartbeats.get_accumulator().flush()
+
+    db = SessionLocal()
+    try:
+        assert db.query(Agent).filter(Agent.id == agent_id).one().last_seen_at is not None
+    finally:
+        db.close()
+
+
+def test_config_polls_reuse_a_verified_token_until_rotation(monkeypatch):
+    from app.core.security import get_password_hash
+    from app.dependencies import agents as agent_deps
+
+    headers = _login_admin()
+    enroll = client.post("/agents/enroll", headers=headers, json={"name": "poll-agent"})
+    assert enroll.status_code == 200, enroll.text
+    agent_id, old_token = enroll.json()["agent_id"], enroll.json()["token"]
+
+    checks = []
+    real_verify = agent_deps.verify_password
+    monkeypatch.setattr(agent_deps, "verify_password", lambda *args: checks.append(1) or real_verify(*args))
+
+    first = client.get(f"/agents/config/{agent_id}", headers={"X-Agent-Token": old_token})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    for _ in range(3):
+        again = client.get(f"/agents/config/{agent_id}", headers={"X-Agent-Token": old_token, "If-None-Match": etag})
+        assert again.status_code == 304
+    assert len(checks) == 1
+
+    db = SessionLocal()
+    try:
+        agent = db.query(Agent).filter(Agent.id == agent_id).one()
+        agent.token = get_password_hash("rotated-agent-token")
+        db.commit()
+    finally:
+        db.close()
+    assert client.get(f"/agents/config/{agent_id}", headers={"X-Agent-Token": old_token}).status_code == 401
+    rotated = client.get(f"/agents/config/{agent_id}", headers={"X-Agent-Token": "rotated-agent-token"})
+    assert rotated.status_code == 200
+
+
+def test_liveness_is_scoped_to_the_admins_tenant():
+    from app.services import agent_heartbeats
+
+    headers = _login_admin()
+    foreign_agent = 987654321
+    agent_heartbeats.get_accumulator().record(foreign_agent, tenant_id=999)
+
+    assert client.get("/admin/agents/liveness", headers=headers, params={"tenant_id": 999}).status_code == 403
+    own = client.get("/admin/agents/liveness", headers=headers)
+    assert own.status_code == 200, own.text
+    assert all(item["tenant_id"] == 1 for item in own.json()["agents"])
+    assert foreign_agent not in {item["agent_id"] for item in own.json()["agents"]}
+
+
+def test_bulk_enrollment_streams_encrypted_bundle():
+    from app.services import agent_enrollment
+
+    headers = _login_admin()
+    passphrase = "bulk-enroll-passphrase"
+    resp = client.post(
+        "/agents/enroll/bulk",
+        headers=headers,
+        json={"count": 3, "name_prefix": "bulk", "passphrase": passphrase},
+    )
+    assert resp.status_code == 201, resp.text
+    assert resp.headers["x-agents-created"] == "3"
+    lines = resp.text.splitlines()
+    assert len(lines) == 4
+    assert "token" not in resp.text
+
+    records = agent_enrollment.decrypt_credentials_bundle(lines, passphrase)
+    assert [record["name"] for record in records] == ["bulk-00001", "bulk-00002", "bulk-00003"]
+
+    record = records[0]
+    cfg = client.get(f"/agents/config/{record['agent_id']}", headers={"X-Agent-Token": record["token"]})
+    assert cfg.status_code == 200, cfg.text
+
+    try:
+        agent_enrollment.decrypt_credentials_bundle(lines, "wrong-passphrase!")
+        assert False, "Expected decryption failure"
+    except ValueError:
+        pass
@@ -295,3 +295,35 @@ def test_tenant_settings_update_validation():
                 db.commit()
     finally:
         db.close()
+
+
+def test_settings_reads_are_served_from_the_cached_snapshot():
+    headers = _login_admin()
+    first = client.get("/admin/settings/tenant", headers=headers)
+    second = client.get("/admin/settings/tenant", headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    etag = first.headers["ETag"]
+    assert second.headers["ETag"] == etag
+
+    not_modified = client.get("/admin/settings/tenant", headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    global_etag = client.get("/admin/settings", headers=headers).headers["ETag"]
+    assert global_etag != etag
+
+    updated = client.put("/admin/settings/tenant", headers=headers, json={"networking.dhcp.scopes": []})
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != etag
+    refreshed = client.get("/admin/settings/tenant", headers={**headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] == updated.headers["ETag"]
+
+    db = SessionLocal()
+    try:
+        db.query(AppSetting).filter(AppSetting.key == "networking.dhcp.scopes").delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,28 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.database import async_database_url, dispose_async_engine, get_async_sessionmaker
+from app.models.user import User
+from .helpers import ADMIN_USERNAME
+
+
+def test_async_database_url_maps_drivers():
+    assert async_database_url("sqlite:///./test_api.db") == "sqlite+aiosqlite:///./test_api.db"
+    assert async_database_url("postgresql://u:p@db:5432/t") == "postgresql+psycopg://u:p@db:5432/t"
+    assert async_database_url("postgresql+psycopg://u@db/t") == "postgresql+psycopg://u@db/t"
+
+
+def test_async_session_reads_and_runs_sync_helpers():
+    async def _run():
+        try:
+            async with get_async_sessionmaker()() as db:
+                result = await db.execute(select(User).where(User.username == ADMIN_USERNAME))
+                user = result.scalars().first()
+                assert user is not None
+                count = await db.run_sync(lambda session: session.query(User).count())
+                assert count >= 1
+        finally:
+            await dispose_async_engine()
+
+    asyncio.run(_run())
@@ -0,0 +1,96 @@
+import csv
+import gzip
+import io
+import json
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models.audit_log import AuditLog
+from app.services.audit_export import ExportStats, export_chunks, iter_audit_batches
+from .helpers import ADMIN_PASSWORD, ADMIN_USERNAME
+
+client = TestClient(app)
+
+
+def _auth_headers() -> dict:
+    resp = client.post("/auth/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _seed(count: int) -> str:
+    result = f"export-{uuid4().hex[:8]}"
+    db = SessionLocal()
+    try:
+        for index in range(count):
+            entry = AuditLog(user_id=1, action="export.test", result=result, ip="10.0.0.1")
+            entry.details = json.dumps({"index": index, "note": "seeded"})
+            db.add(entry)
+        db.commit()
+    finally:
+        db.close()
+    return result
+
+
+def test_csv_export_keeps_the_historical_layout():
+    result = _seed(3)
+    resp = client.get(f"/audit-logs/export?result={result}", headers=_auth_headers())
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    assert "audit_logs.csv" in resp.headers["content-disposition"]
+
+    lines = resp.text.splitlines()
+    assert lines[0] == "timestamp,user_id,action,result,ip,details"
+    rows = list(csv.reader(lines[1:]))
+    assert len(rows) == 3
+    assert all(row[1:5] == ["1", "export.test", result, "10.0.0.1"] for row in rows)
+    assert "'index': 2" in rows[0][5]
+
+
+def test_ndjson_export_with_gzip():
+    result = _seed(2)
+    resp = client.get(f"/audit-logs/export?result={result}&format=ndjson&gzip=true", headers=_auth_headers())
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/gzip")
+    assert "audit_logs.ndjson.gz" in resp.headers["content-disposition"]
+
+    body = resp.content
+    if body[:2] == b"\x1f\x8b":  # not transparently decoded by the client
+        body = gzip.decompress(body)
+    records = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+    assert [record["details"]["index"] for record in records] == [1, 0]
+    assert {record["result"] for record in records} == {result}
+
+
+def test_parquet_export():
+    pq = pytest.importorskip("pyarrow.parquet")
+    result = _seed(2)
+    resp = client.get(f"/audit-logs/export?result={result}&format=parquet", headers=_auth_headers())
+    assert resp.status_code == 200
+    table = pq.read_table(io.BytesIO(resp.content))
+    assert table.num_rows == 2
+    assert set(table.column("result").to_pylist()) == {result}
+
+
+def test_export_rejects_unknown_format():
+    resp = client.get("/audit-logs/export?format=xml", headers=_auth_headers())
+    assert resp.status_code == 422
+
+
+def test_batches_stream_one_chunk_each():
+    result = _seed(5)
+    db = SessionLocal()
+    try:
+        batches = list(iter_audit_batches(db, [AuditLog.result == result], batch_size=2))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+        stats = ExportStats()
+        chunks = list(export_chunks(iter(batches), "ndjson", stats=stats))
+    finally:
+        db.close()
+    assert len(chunks) == 3
+    assert stats.rows == 5 and stats.completed
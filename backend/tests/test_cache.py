@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.cache.invalidation import ALL_TENANTS, tenant_evictor, tenant_namespace
+from app.cache.ttl import TTLCache, ttl_cache
+from app.database import SessionLocal, dispose_async_engine, get_async_sessionmaker
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = TTLCache(name="test-lru", ttl_seconds=60, maxsize=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: pytest.fail("a should be cached"))
+    cache.get("c", lambda: 3)
+    assert cache.peek("a") == 1
+    assert cache.peek("b") is None
+    assert len(cache) == 2
+
+
+def test_expired_entries_are_purged_on_write():
+    clock = _Clock()
+    cache = TTLCache(name="test-expiry", ttl_seconds=10, clock=clock)
+    cache.set("old", 1)
+    clock.now += 11
+    cache.set("new", 2)
+    assert len(cache) == 1
+    assert cache.get("old", lambda: "reloaded") == "reloaded"
+
+
+def test_concurrent_misses_share_one_load_and_do_not_block_other_keys():
+    cache = TTLCache(name="test-single-flight")
+    release = threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        release.wait(5)
+        return "slow"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("slow", slow_loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    # Another key loads while "slow" is still in flight.
+    assert cache.get("fast", lambda: "fast") == "fast"
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["slow"] * 8
+    assert len(calls) == 1
+
+
+def _run_with_deadline(main, timeout=10):
+    # A blocked event loop cannot time itself out, so watch it from outside.
+    results = []
+    runner = threading.Thread(target=lambda: results.append(asyncio.run(main())), daemon=True)
+    runner.start()
+    runner.join(timeout)
+    assert not runner.is_alive(), "event loop blocked on a cache flight"
+    return results[0]
+
+
+def test_event_loop_callers_never_wait_on_another_load():
+    cache = TTLCache(name="test-loop-flight")
+    loading, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        loading.set()
+        release.wait(5)
+        return "thread"
+
+    worker = threading.Thread(target=lambda: cache.get("k", slow_loader))
+    worker.start()
+    assert loading.wait(5)
+
+    async def _lookup():
+        return cache.get("k", lambda: "loop")
+
+    try:
+        assert _run_with_deadline(_lookup) == "loop"
+    finally:
+        release.set()
+        worker.join(5)
+    # Only the flight leader stores its value.
+    assert cache.peek("k") == "thread"
+
+
+def test_concurrent_run_sync_loads_on_a_cold_cache_do_not_deadlock():
+    from app.services.settings_view import _VIEW_CACHE, get_settings
+
+    _VIEW_CACHE.clear()
+
+    async def _main():
+        sessionmaker = get_async_sessionmaker()
+
+        async def _load():
+            async with sessionmaker() as db:
+                return await db.run_sync(lambda session: get_settings(session, 7))
+
+        try:
+            return await asyncio.gather(_load(), _load())
+        finally:
+            await dispose_async_engine()
+
+    views = _run_with_deadline(_main)
+    assert [view.tenant_id for view in views] == [7, 7]
+
+
+def test_stale_value_is_served_while_refreshing():
+    clock = _Clock()
+    cache = TTLCache(name="test-swr", ttl_seconds=10, stale_seconds=30, clock=clock)
+    cache.set("k", "v1")
+    clock.now += 15
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.set()
+        return "v2"
+
+    assert cache.get("k", loader) == "v1"
+    assert refreshed.wait(5)
+    deadline = time.time() + 5
+    while cache.peek("k") != "v2" and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get("k", lambda: pytest.fail("should be fresh")) == "v2"
+
+
+def test_namespace_invalidation_and_inflight_results_are_not_stored():
+    cache = TTLCache(name="test-namespace")
+    cache.set(("t1", "a"), 1, namespace="tenant:1")
+    cache.set(("t1", "b"), 2, namespace="tenant:1")
+    cache.set(("t2", "a"), 3, namespace="tenant:2")
+    cache.invalidate_namespace("tenant:1")
+    assert cache.peek(("t1", "a")) is None and cache.peek(("t1", "b")) is None
+    assert cache.peek(("t2", "a")) == 3
+
+    def loader():
+        cache.invalidate_namespace("tenant:2")
+        return "computed-before-invalidation"
+
+    assert cache.get(("t2", "b"), loader, namespace="tenant:2") == "computed-before-invalidation"
+    assert cache.peek(("t2", "b")) is None
+
+
+def test_ttl_cache_key_ignores_sessions():
+    calls = []
+
+    @ttl_cache(ttl_seconds=60, name="test-decorator")
+    def lookup(db, tenant_id):
+        calls.append(tenant_id)
+        return tenant_id * 2
+
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        assert lookup(first, 3) == 6
+        assert lookup(second, 3) == 6
+    finally:
+        first.close()
+        second.close()
+    assert calls == [3]
+
+
+def test_tenant_evictor_scopes_evictions():
+    merged = TTLCache(name="test-evict-merged", ttl_seconds=60)
+    per_scope = TTLCache(name="test-evict-scope", ttl_seconds=60)
+    for cache in (merged, per_scope):
+        for tenant_id in (None, 1, 2):
+            cache.set(tenant_id, tenant_id, namespace=tenant_namespace(tenant_id))
+
+    tenant_evictor(merged)(frozenset({1}))
+    assert [merged.peek(key) for key in (None, 1, 2)] == [None, None, 2]
+    tenant_evictor(merged)(frozenset({None}))
+    assert merged.peek(2) is None
+
+    tenant_evictor(per_scope, global_fans_out=False)(frozenset({None}))
+    assert [per_scope.peek(key) for key in (None, 1, 2)] == [None, 1, 2]
+    tenant_evictor(per_scope, global_fans_out=False)(ALL_TENANTS)
+    assert per_scope.peek(1) is None
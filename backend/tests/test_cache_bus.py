@@ -0,0 +1,157 @@
+import threading
+
+import pytest
+
+from app.cache import bus as cache_bus
+from app.cache.bus import InvalidationBus, Message, _libpq_url
+from app.cache.invalidation import ALL_TENANTS
+from app.database import SessionLocal
+from app.models.app_setting import AppSetting
+from app.routes import app_settings
+
+
+class _Hub:
+    """In-memory stand-in for a pub/sub channel shared by several processes."""
+
+    def __init__(self):
+        self.sent = []
+        self._listeners = []
+
+    def transport(self):
+        hub = self
+
+        class _Transport:
+            def send(self, payload):
+                hub.sent.append(payload)
+                for listener in list(hub._listeners):
+                    listener(payload)
+
+            def listen(self, on_payload, on_ready, stop):
+                # Flush before registering so tests never race the listener thread.
+                on_ready()
+                hub._listeners.append(on_payload)
+                try:
+                    stop.wait()
+                finally:
+                    hub._listeners.remove(on_payload)
+
+            def close(self):
+                pass
+
+        return _Transport()
+
+    def wait_for_listeners(self, count):
+        for _ in range(200):
+            if len(self._listeners) >= count:
+                return
+            threading.Event().wait(0.01)
+        raise AssertionError("listeners did not start")
+
+
+def test_publish_reaches_other_processes_once():
+    hub = _Hub()
+    writer, reader = InvalidationBus(hub.transport()), InvalidationBus(hub.transport())
+    seen_by_writer, seen_by_reader = [], []
+    writer.subscribe("app_settings", seen_by_writer.append)
+    reader.subscribe("app_settings", seen_by_reader.append)
+    writer.start()
+    reader.start()
+    try:
+        hub.wait_for_listeners(2)
+        # Connecting flushes everything: messages sent before it were missed.
+        assert seen_by_writer == [ALL_TENANTS] and seen_by_reader == [ALL_TENANTS]
+        writer.publish("app_settings", frozenset({3, None}))
+        assert writer.flush()
+        assert seen_by_writer[-1] == frozenset({3, None})
+        assert seen_by_reader[-1] == frozenset({3, None})
+        assert len(seen_by_writer) == 2
+    finally:
+        writer.stop()
+        reader.stop()
+
+
+def test_duplicates_are_ignored_but_late_messages_apply():
+    bus = InvalidationBus()
+    seen = []
+    bus.subscribe("cors", seen.append)
+    message = Message(changes={"cors": frozenset({2})}, version=6, origin="other").encode()
+    bus._receive(message)
+    bus._receive(message)
+    # Sent earlier but delivered later: evictions are idempotent, so it still applies.
+    bus._receive(Message(changes={"cors": frozenset({1})}, version=5, origin="other").encode())
+    bus._receive("not json")
+    assert seen == [frozenset({2}), frozenset({1})]
+
+
+def test_publishes_are_coalesced_off_the_calling_thread():
+    hub = _Hub()
+    sending, release = threading.Event(), threading.Event()
+    transport = hub.transport()
+    send = transport.send
+
+    def _slow_send(payload):
+        sending.set()
+        release.wait(5)
+        send(payload)
+
+    transport.send = _slow_send
+    bus = InvalidationBus(transport)
+    bus.publish("cors")
+    assert sending.wait(5)
+    # The first send is stuck; these merge into a single follow-up message.
+    with bus.hold():
+        bus.publish("app_settings", frozenset({1}))
+        bus.publish("feature_flags", frozenset({1}))
+    bus.publish("app_settings", frozenset({2}))
+    assert hub.sent == []
+    release.set()
+    assert bus.flush()
+    assert [Message.decode(payload).changes for payload in hub.sent] == [
+        {"cors": ALL_TENANTS},
+        {"app_settings": frozenset({1, 2}), "feature_flags": frozenset({1})},
+    ]
+
+
+def test_message_round_trip():
+    message = Message(changes={"feature_flags": frozenset({2, None}), "cors": ALL_TENANTS}, version=7, origin="abc")
+    assert Message.decode(message.encode().encode("utf-8")) == message
+    legacy = '{"ns":"cors","tenants":[1],"v":3,"origin":"abc"}'
+    assert Message.decode(legacy).changes == {"cors": frozenset({1})}
+
+
+def test_libpq_url_strips_driver():
+    assert _libpq_url("postgresql+psycopg://u:p@db/app") == "postgresql://u:p@db/app"
+    assert _libpq_url("postgres://db/app") == "postgresql://db/app"
+
+
+@pytest.fixture
+def hub():
+    hub = _Hub()
+    cache_bus.configure(hub.transport())
+    cache_bus.start()
+    hub.wait_for_listeners(1)
+    yield hub
+    cache_bus.configure(None)
+
+
+def test_setting_commit_is_broadcast_and_remote_writes_evict(hub):
+    db = SessionLocal()
+    try:
+        row = AppSetting(tenant_id=1, key="bus.test", value=True)
+        db.add(row)
+        db.commit()
+        assert cache_bus.get_bus().flush()
+        # One message per commit, covering every namespace fed by AppSetting.
+        assert len(hub.sent) == 1
+        assert {"app_settings", "feature_flags"} <= set(Message.decode(hub.sent[0]).changes)
+
+        app_settings._SETTINGS_CACHE.set("tenant:1", ([], "etag"), namespace="tenant:1")
+        remote = InvalidationBus(hub.transport())
+        remote.publish("app_settings", frozenset({1}))
+        assert remote.flush()
+        assert app_settings._SETTINGS_CACHE.peek("tenant:1") is None
+
+        db.delete(row)
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,101 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.main import app
+from app.services import compliance_matrix
+from .helpers import ADMIN_PASSWORD, ADMIN_USERNAME
+
+client = TestClient(app)
+
+
+def _auth_headers() -> dict:
+    resp = client.post("/auth/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _create_framework(headers, suffix):
+    resp = client.post(
+        "/compliance-matrix/frameworks",
+        json={"name": f"Framework {suffix}", "code": f"FW{suffix}"},
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.json()["id"]
+
+
+def _create_rule(headers, control_id, framework_ids):
+    return client.post(
+        "/compliance-matrix/rules",
+        json={"control_id": control_id, "title": control_id, "framework_ids": framework_ids},
+        headers=headers,
+    )
+
+
+def test_matrix_dense_and_sparse_layouts():
+    headers = _auth_headers()
+    suffix = uuid4().hex[:8].upper()
+    first, second = _create_framework(headers, f"{suffix}A"), _create_framework(headers, f"{suffix}B")
+    assert _create_rule(headers, f"CTL-{suffix}-1", [first, second]).status_code == 201
+    assert _create_rule(headers, f"CTL-{suffix}-2", [second]).status_code == 201
+
+    dense = client.get("/compliance-matrix/matrix", headers=headers).json()
+    by_control = {rule["control_id"]: rule["framework_ids"] for rule in dense["rules"]}
+    assert by_control[f"CTL-{suffix}-1"] == [first, second]
+    assert by_control[f"CTL-{suffix}-2"] == [second]
+
+    sparse = client.get("/compliance-matrix/matrix?format=sparse", headers=headers).json()
+    assert sparse["version"]
+    assert "framework_ids" not in sparse["rules"][0]
+    cells = {
+        (sparse["rules"][row]["control_id"], sparse["frameworks"][column]["id"]) for row, column in sparse["cells"]
+    }
+    assert {(f"CTL-{suffix}-1", first), (f"CTL-{suffix}-1", second), (f"CTL-{suffix}-2", second)} <= cells
+
+    filtered = client.get(f"/compliance-matrix/rules?framework_id={first}", headers=headers).json()
+    assert [rule["control_id"] for rule in filtered] == [f"CTL-{suffix}-1"]
+
+    assert client.get("/compliance-matrix/matrix?format=grid", headers=headers).status_code == 422
+
+
+def test_rule_writes_bump_the_matrix_version():
+    headers = _auth_headers()
+    suffix = uuid4().hex[:8].upper()
+    framework = _create_framework(headers, suffix)
+    before = client.get("/compliance-matrix/matrix?format=sparse", headers=headers).json()["version"]
+
+    assert _create_rule(headers, f"CTL-{suffix}", [framework]).status_code == 201
+    after = client.get("/compliance-matrix/matrix?format=sparse", headers=headers).json()
+    assert after["version"] != before
+    assert any(rule["control_id"] == f"CTL-{suffix}" for rule in after["rules"])
+
+
+def test_create_rule_rejects_unknown_framework():
+    headers = _auth_headers()
+    suffix = uuid4().hex[:8].upper()
+    framework = _create_framework(headers, suffix)
+    resp = _create_rule(headers, f"CTL-{suffix}", [framework, 987654])
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Framework 987654 not found"
+    rules = client.get("/compliance-matrix/rules", headers=headers).json()
+    assert all(rule["control_id"] != f"CTL-{suffix}" for rule in rules)
+
+
+def test_matrix_load_query_count_is_constant():
+    statements = []
+
+    def _count(*_args, **_kwargs):
+        statements.append(1)
+
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        compliance_matrix._load_matrix(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+        db.close()
+    # Frameworks, rules and links: independent of catalog size.
+    assert len(statements) == 3
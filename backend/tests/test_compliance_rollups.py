@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, update
+
+from app.database import SessionLocal
+from app.models.compliance_daily_rollup import ComplianceDailyRollup
+from app.models.compliance_result import ComplianceResult
+from app.services.compliance_rollups import rebuild_rollups
+
+MODULE = "rollup_test"
+
+
+def _counts(db):
+    rows = (
+        db.query(ComplianceDailyRollup)
+        .filter(ComplianceDailyRollup.tenant_id == 1, ComplianceDailyRollup.module == MODULE)
+        .all()
+    )
+    return {row.day: (row.pass_count, row.fail_count) for row in rows if row.pass_count or row.fail_count}
+
+
+def _result(status, recorded_at):
+    return ComplianceResult(tenant_id=1, module=MODULE, status=status, recorded_at=recorded_at)
+
+
+def test_orm_writes_keep_rollups_in_step():
+    now = datetime.utcnow()
+    today, yesterday = now.date(), (now - timedelta(days=1)).date()
+    db = SessionLocal()
+    try:
+        db.query(ComplianceResult).filter(ComplianceResult.module == MODULE).delete()
+        first, second = _result("pass", now), _result("fail", now)
+        db.add_all([first, second, _result(" Pass ", now - timedelta(days=1))])
+        db.commit()
+        assert _counts(db) == {today: (1, 1), yesterday: (1, 0)}
+
+        second.status = "pass"
+        db.commit()
+        assert _counts(db) == {today: (2, 0), yesterday: (1, 0)}
+
+        first.recorded_at = now - timedelta(days=1)
+        db.commit()
+        assert _counts(db) == {today: (1, 0), yesterday: (2, 0)}
+
+        # Expired after commit: the pre-image is read from the table.
+        db.delete(second)
+        db.commit()
+        assert _counts(db) == {yesterday: (2, 0)}
+    finally:
+        db.query(ComplianceResult).filter(ComplianceResult.module == MODULE).delete()
+        db.commit()
+        db.close()
+
+
+def test_bulk_statements_keep_rollups_in_step():
+    now = datetime.utcnow()
+    today = now.date()
+    db = SessionLocal()
+    try:
+        db.add_all([_result("pass", now), _result("fail", now), _result("fail", now)])
+        db.commit()
+
+        db.execute(
+            update(ComplianceResult)
+            .where(ComplianceResult.module == MODULE, ComplianceResult.status == "fail")
+            .values(status="pass")
+        )
+        db.commit()
+        assert _counts(db) == {today: (3, 0)}
+
+        db.query(ComplianceResult).filter(ComplianceResult.module == MODULE).delete()
+        db.commit()
+        assert _counts(db) == {}
+
+        db.add(_result("fail", now))
+        db.commit()
+        db.execute(delete(ComplianceResult).where(ComplianceResult.module == MODULE))
+        db.rollback()
+        assert _counts(db) == {today: (0, 1)}
+    finally:
+        db.query(ComplianceResult).filter(ComplianceResult.module == MODULE).delete()
+        db.commit()
+        db.close()
+
+
+def test_rebuild_repairs_drifted_rollups():
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        db.add_all([_result("pass", now), _result("fail", now - timedelta(days=3))])
+        db.commit()
+        expected = _counts(db)
+
+        db.query(ComplianceDailyRollup).filter(ComplianceDailyRollup.module == MODULE).update(
+            {"pass_count": 40, "fail_count": 7}
+        )
+        db.commit()
+        rebuild_rollups(db, tenant_id=1)
+        db.commit()
+        assert _counts(db) == expected
+
+        db.query(ComplianceDailyRollup).filter(ComplianceDailyRollup.module == MODULE).delete()
+        db.commit()
+        rebuild_rollups(db, since=now.date())
+        db.commit()
+        assert _counts(db) == {now.date(): (1, 0)}
+    finally:
+        db.query(ComplianceResult).filter(ComplianceResult.module == MODULE).delete()
+        db.commit()
+        db.close()
@@ -74,3 +74,34 @@ def test_trend_insights_returns_summary_and_trend():
     assert 0 <= summary["coverage"] <= 100
     assert summary["open_failures"] >= 0
     assert isinstance(summary["net_change"], (int, float))
+
+
+def test_trends_count_results_per_day():
+    token = _login_admin()
+    _seed_results()
+    session = SessionLocal()
+    try:
+        session.add(
+            ComplianceResult(
+                tenant_id=1,
+                module="cis_benchmark",
+                status=" PASS ",
+                recorded_at=datetime.utcnow() - timedelta(days=1),
+            )
+        )
+        session.commit()
+    finally:
+        session.close()
+
+    resp = client.get("/compliance/trends?days=7", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    by_day = {point["date"]: (point["pass"], point["fail"]) for point in resp.json()}
+    today = datetime.utcnow().date()
+    assert by_day[(today - timedelta(days=1)).isoformat()] == (2, 0)
+    assert by_day[(today - timedelta(days=2)).isoformat()] == (0, 1)
+    assert by_day[(today - timedelta(days=3)).isoformat()] == (1, 0)
+
+    filtered = client.get(
+        "/compliance/trends?days=7&module=pci_dss_check", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert sum(point["pass"] + point["fail"] for point in filtered.json()) == 1
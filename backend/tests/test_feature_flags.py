@@ -2,17 +2,21 @@ from __future__ import annotations
 
 import pytest
 
-from sqlalchemy import or_
+from fastapi.testclient import TestClient
+from sqlalchemy import event, or_
 
 from app.database import SessionLocal
+from app.main import app
 from app.models.app_setting import AppSetting
 from app.models.user import User
 from app.services.feature_flags import (
     SettingsAccess,
     ensure_settings_read_access,
     ensure_settings_write_access,
+    get_feature_flags,
     resolve_settings_access,
 )
+from .helpers import ADMIN_PASSWORD, ADMIN_USERNAME
 
 
 def _make_user(*, role: str, tenant_id: int | None = 1) -> User:
@@ -42,7 +46,7 @@ def _clean_app_settings():
         db.close()
 
 
-def _set_flag(key: str, value: bool, *, tenant_id: int | None = None) -> None:
+def _set_flag(key: str, value, *, tenant_id: int | None = None) -> None:
     db = SessionLocal()
     try:
         db.add(AppSetting(tenant_id=tenant_id, key=key, value=value))
@@ -132,3 +136,56 @@ def test_non_privileged_role_denied_without_flags():
             ensure_settings_read_access(db, standard_user)
     finally:
         db.close()
+
+
+def test_flags_load_in_one_query_and_are_memoized():
+    _set_flag("features", {"reports": True}, tenant_id=None)
+    _set_flag("features.reports", False, tenant_id=7)
+    db = SessionLocal()
+    statements = []
+
+    def _count(*_args, **_kwargs):
+        statements.append(1)
+
+    event.listen(db.get_bind(), "before_cursor_execute", _count)
+    try:
+        first = get_feature_flags(db, 7)
+        second = get_feature_flags(db, 7)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", _count)
+        db.close()
+    assert first is second
+    assert len(statements) == 1
+    assert first.get("reports") is False
+    assert first.as_dict() == {"reports": False}
+
+
+def test_flag_version_changes_when_settings_commit():
+    db = SessionLocal()
+    try:
+        before = get_feature_flags(db, 1)
+        _set_flag("features.reports", True, tenant_id=1)
+        after = get_feature_flags(db, 1)
+    finally:
+        db.close()
+    assert after.get("reports") is True
+    assert after.version != before.version
+
+
+def test_features_endpoint_supports_conditional_requests():
+    client = TestClient(app)
+    login = client.post("/auth/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    response = client.get("/features", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["settings"] is True
+    etag = response.headers["ETag"]
+
+    cached = client.get("/features", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+    _set_flag("features.reports", True)
+    changed = client.get("/features", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["reports"] is True
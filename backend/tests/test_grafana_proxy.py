@@ -12,6 +12,7 @@ from app.models.app_setting import AppSetting
 from app.models.audit_log import AuditLog
 from app.routes import grafana_proxy as grafana_proxy_module
 from app.services import grafana as grafana_service
+from app.services.rate_limiter import get_rate_limiter
 from app.core.crypto import encrypt_data
 from app.core.secrets import get_enc_key
 from .helpers import ADMIN_USERNAME, ADMIN_PASSWORD
@@ -114,7 +115,7 @@ def test_grafana_proxy_rate_limit_enforced(mock_request: AsyncMock):
     headers = _login_admin()
     previous_url = _ensure_setting("grafana.url", "http://grafana:3000")
     previous_rate = _ensure_setting("grafana.proxy.max_requests_per_minute", 1)
-    grafana_proxy_module._RATE_BUCKETS.clear()
+    get_rate_limiter().reset(grafana_proxy_module._RATE_NAMESPACE)
 
     response = httpx.Response(
         status_code=200,
@@ -1,10 +1,17 @@
+import asyncio
+import threading
 from datetime import datetime, timedelta
+
+import httpx
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.database import SessionLocal
+from app.database import SessionLocal, dispose_async_engine
 from app.models.agent import Agent
+from app.models.app_setting import AppSetting
+from app.models.integrity_event import IntegrityEvent
 from app.models.user import User
+from app.services.settings_view import _VIEW_CACHE
 from .helpers import ADMIN_USERNAME, ADMIN_PASSWORD
 
 
@@ -68,3 +75,76 @@ def test_service_ingest_and_event():
     assert r.status_code == 200
     events = r.json()
     assert any(evt.get("event_type") == "service_change" for evt in events)
+
+
+def test_concurrent_async_ingests_on_a_cold_settings_cache():
+    token = _login_admin()
+    db = SessionLocal()
+    try:
+        tid = db.query(User).filter(User.username == ADMIN_USERNAME).first().tenant_id or 1
+    finally:
+        db.close()
+    agent_id = _ensure_agent(tid)
+    headers = {"Authorization": f"Bearer {token}"}
+    _VIEW_CACHE.clear()
+
+    def _payload(name):
+        return [{"agent_id": agent_id, "name": name, "status": "running", "collected_at": datetime.utcnow().isoformat()}]
+
+    async def _main():
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as aclient:
+                return await asyncio.gather(
+                    aclient.post("/integrity/services", json=_payload("svcCold1"), headers=headers),
+                    aclient.post("/integrity/services", json=_payload("svcCold2"), headers=headers),
+                )
+        finally:
+            await dispose_async_engine()
+
+    results = []
+    runner = threading.Thread(target=lambda: results.append(asyncio.run(_main())), daemon=True)
+    runner.start()
+    runner.join(15)
+    assert not runner.is_alive(), "concurrent ingests deadlocked the event loop"
+    assert [resp.status_code for resp in results[0]] == [200, 200]
+
+
+def test_agent_specific_service_ignores_suppress_events():
+    token = _login_admin()
+    db = SessionLocal()
+    try:
+        tid = db.query(User).filter(User.username == ADMIN_USERNAME).first().tenant_id or 1
+    finally:
+        db.close()
+    agent_id = _ensure_agent(tid)
+    key = f"integrity.service.ignore_names.agent.{agent_id}"
+    db = SessionLocal()
+    try:
+        db.add(AppSetting(tenant_id=tid, key=key, value="NoisySvc"))
+        db.commit()
+    finally:
+        db.close()
+    try:
+        payload = [
+            {"agent_id": agent_id, "name": name, "status": "running", "collected_at": datetime.utcnow().isoformat()}
+            for name in ("noisysvc", "quietSvc")
+        ]
+        r = client.post("/integrity/services", json=payload, headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 200
+        db = SessionLocal()
+        try:
+            titles = {
+                evt.title
+                for evt in db.query(IntegrityEvent).filter(IntegrityEvent.agent_id == agent_id, IntegrityEvent.event_type == "service_new")
+            }
+        finally:
+            db.close()
+        assert titles == {"New service quietSvc"}
+    finally:
+        db = SessionLocal()
+        try:
+            db.query(AppSetting).filter(AppSetting.key == key).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
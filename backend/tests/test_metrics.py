@@ -0,0 +1,126 @@
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models.user import User
+from app.observability import metrics
+from app.observability.metrics import LabelValueCap, REGISTRY
+from .helpers import ADMIN_PASSWORD, ADMIN_USERNAME
+
+client = TestClient(app)
+
+
+def test_label_value_cap_routes_overflow_to_other():
+    cap = LabelValueCap(2)
+    assert [cap(v) for v in ("t1", "t2", "t3", "t1", "t4")] == ["t1", "t2", "__other__", "t1", "__other__"]
+
+
+def test_tenant_request_counter_uses_the_authenticated_tenant(monkeypatch):
+    monkeypatch.setattr(metrics, "TENANT_LABELS", True)
+    monkeypatch.setattr(metrics, "_TENANT_CAP", LabelValueCap(1))
+
+    def _value(tenant: str) -> float:
+        return REGISTRY.get_sample_value(
+            "http_tenant_requests_total", {"tenant": tenant, "status_class": "2xx"}
+        ) or 0.0
+
+    # Client-sent tenant headers never become label values or use up the cap.
+    for tenant in ("junk-a", "junk-b"):
+        assert client.get("/health", headers={"X-Tenant-Id": tenant}).status_code == 200
+    assert _value("junk-a") == 0 and _value("__other__") == 0
+
+    login = client.post("/auth/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}", "X-Tenant-Id": "junk-c"}
+    db = SessionLocal()
+    try:
+        tenant = str(db.query(User.tenant_id).filter(User.username == ADMIN_USERNAME).scalar())
+    finally:
+        db.close()
+    before = _value(tenant)
+    assert client.get("/compliance/trends?days=1", headers=headers).status_code == 200
+    assert _value(tenant) == before + 1
+    assert _value("junk-c") == 0
+
+
+def test_exponential_histogram_buckets(monkeypatch):
+    monkeypatch.setenv("TENANTRA_METRIC_HISTOGRAM", "exponential")
+    monkeypatch.setenv("TENANTRA_METRIC_HISTOGRAM_RESOLUTION", "1")
+    buckets = metrics._latency_buckets()
+    assert buckets[0] == 0.001 and buckets[-1] >= 60
+    ratios = {round(b / a, 3) for a, b in zip(buckets, buckets[1:])}
+    assert ratios <= {1.414, 1.415}
+
+    # Higher resolutions are clamped to keep the per-route series budget bounded.
+    monkeypatch.setenv("TENANTRA_METRIC_HISTOGRAM_RESOLUTION", "3")
+    assert len(metrics._latency_buckets()) == 65
+
+
+def test_multiprocess_scrape_aggregates_worker_processes(tmp_path):
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path), PYTHONPATH=str(Path(__file__).resolve().parents[1]))
+    worker = "from app.observability.metrics import record_scheduler_run; record_scheduler_run('ok')"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+    scrape = "from app.observability.metrics import render_latest; print(render_latest().decode())"
+    output = subprocess.run([sys.executable, "-c", scrape], env=env, check=True, capture_output=True, text=True).stdout
+    assert 'scheduler_runs_total{status="ok"} 2.0' in output
+
+
+def test_celery_signal_handlers_record_task_metrics():
+    import time
+    from types import SimpleNamespace
+
+    from app.observability import celery_metrics
+
+    task = SimpleNamespace(
+        name="tenantra.test.task",
+        request=SimpleNamespace(**{celery_metrics.PUBLISHED_AT_HEADER: time.time() - 2}),
+    )
+    headers = {}
+    celery_metrics._on_publish(headers=headers)
+    assert celery_metrics.PUBLISHED_AT_HEADER in headers
+
+    celery_metrics._on_prerun(task_id="t-1", task=task)
+    celery_metrics._on_retry(sender=task)
+    celery_metrics._on_postrun(task_id="t-1", task=task, state="SUCCESS")
+
+    labels = {"task": "tenantra.test.task"}
+    assert REGISTRY.get_sample_value("celery_tasks_total", {**labels, "state": "SUCCESS"}) >= 1
+    assert REGISTRY.get_sample_value("celery_task_retries_total", labels) >= 1
+    assert REGISTRY.get_sample_value("celery_task_duration_seconds_count", labels) >= 1
+    assert REGISTRY.get_sample_value("celery_task_queue_latency_seconds_sum", labels) >= 2
+
+
+def test_db_pool_instrumentation_records_checkouts_and_timeouts(tmp_path):
+    import pytest
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+    from app.observability.db_pool import TimedQueuePool, instrument_engine
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    instrument_engine(engine, "pooltest")
+    labels = {"role": "pooltest"}
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("select 1"))
+            assert REGISTRY.get_sample_value("db_pool_checked_out", labels) == 1
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+        assert REGISTRY.get_sample_value("db_pool_checked_out", labels) == 0
+        assert REGISTRY.get_sample_value("db_pool_checkouts_total", labels) == 1
+        assert REGISTRY.get_sample_value("db_pool_checkout_timeouts_total", labels) == 1
+        assert REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", labels) == 2
+        assert REGISTRY.get_sample_value("db_pool_size", labels) == 1
+    finally:
+        engine.dispose()
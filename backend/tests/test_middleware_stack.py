@@ -0,0 +1,77 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_middleware_stack_injects_headers_and_shares_request_id():
+    resp = client.get(
+        "/health",
+        headers={"X-Request-ID": "req-from-client", "Origin": "http://localhost:5173"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["x-request-id"] == "req-from-client"
+    assert resp.headers["x-content-type-options"] == "nosniff"
+    assert resp.headers["x-frame-options"] == "DENY"
+    assert resp.headers["access-control-allow-origin"] == "http://localhost:5173"
+
+
+def test_cors_preflight_short_circuits():
+    resp = client.options(
+        "/modules/",
+        headers={"Origin": "http://localhost:5173", "Access-Control-Request-Method": "GET"},
+    )
+    assert resp.status_code == 204
+    assert resp.headers["access-control-allow-origin"] == "http://localhost:5173"
+
+
+def test_cors_origin_writes_refresh_cached_policy():
+    from app.database import SessionLocal
+    from app.models.tenant_cors_origin import TenantCORSOrigin
+    from app.services import cors_policy
+
+    origin = "https://cors-cache-test.example"
+    assert "access-control-allow-origin" not in client.get("/health", headers={"Origin": origin}).headers
+
+    db = SessionLocal()
+    try:
+        row = TenantCORSOrigin(tenant_id=1, origin=origin, enabled=True, is_global=False)
+        db.add(row)
+        db.commit()
+        cors_policy.invalidate()
+        resp = client.get("/health", headers={"Origin": origin})
+        assert resp.headers["access-control-allow-origin"] == origin
+        assert resp.headers["vary"] == "Origin"
+    finally:
+        db.delete(row)
+        db.commit()
+        db.close()
+    cors_policy.invalidate()
+    assert "access-control-allow-origin" not in client.get("/health", headers={"Origin": origin}).headers
+
+
+def test_slow_refresh_does_not_overwrite_a_newer_load(monkeypatch):
+    import threading
+
+    from app.services import cors_policy
+
+    started, release = threading.Event(), threading.Event()
+    loads = iter([frozenset({"https://stale.example"}), frozenset({"https://fresh.example"})])
+
+    def _load():
+        origins = next(loads)
+        if "https://stale.example" in origins:
+            started.set()
+            release.wait(5)
+        return origins
+
+    monkeypatch.setattr(cors_policy, "_load_db_origins", _load)
+    service = cors_policy.CORSPolicyService(ttl=60)
+    slow = threading.Thread(target=service.refresh)
+    slow.start()
+    assert started.wait(5)
+    assert service.refresh().db_origins == {"https://fresh.example"}
+    release.set()
+    slow.join(5)
+    assert service.policy().db_origins == {"https://fresh.example"}
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models.audit_log import AuditLog
+from app.utils.pagination import decode_cursor, encode_cursor, estimate_count
+from .helpers import ADMIN_PASSWORD, ADMIN_USERNAME
+
+client = TestClient(app)
+
+
+def _login_admin() -> dict:
+    resp = client.post("/auth/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_cursor_round_trips_datetime_and_id():
+    stamp = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(stamp, 42)) == (stamp, 42)
+    assert decode_cursor(encode_cursor(7, 7)) == (7, 7)
+
+
+def test_invalid_cursor_is_rejected():
+    resp = client.get("/audit-logs?cursor=not-a-cursor", headers=_login_admin())
+    assert resp.status_code == 400
+
+
+def test_audit_logs_cursor_walks_every_row_once():
+    headers = _login_admin()
+    marker = "keyset-walk"
+    base = datetime.utcnow() - timedelta(hours=1)
+    db = SessionLocal()
+    try:
+        db.query(AuditLog).filter(AuditLog.result == marker).delete()
+        # Two rows share a timestamp so the id tie-breaker is exercised.
+        stamps = [base, base, base + timedelta(seconds=1), base + timedelta(seconds=2), base + timedelta(seconds=3)]
+        for index, stamp in enumerate(stamps):
+            db.add(AuditLog(action=f"walk.{index}", result=marker, created_at=stamp))
+        db.commit()
+
+        first = client.get(f"/audit-logs?result={marker}&page_size=2", headers=headers)
+        assert first.status_code == 200
+        body = first.json()
+        assert body["total"] == 5
+        seen = [item["action"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        while cursor:
+            page = client.get(f"/audit-logs?result={marker}&page_size=2&cursor={cursor}", headers=headers).json()
+            assert "total" not in page
+            seen.extend(item["action"] for item in page["items"])
+            cursor = page["next_cursor"]
+        assert seen == ["walk.4", "walk.3", "walk.2", "walk.1", "walk.0"]
+
+        estimated = client.get(f"/audit-logs?result={marker}&page_size=2&include_estimate=true", headers=headers).json()
+        assert estimated["total"] == 5 and estimated["total_estimate"] == 5
+        # An offset page hands over a cursor for the pages after it.
+        second = client.get(f"/audit-logs?result={marker}&page_size=2&page=2", headers=headers).json()
+        assert [item["action"] for item in second["items"]] == ["walk.2", "walk.1"]
+        last = client.get(f"/audit-logs?result={marker}&page_size=2&cursor={second['next_cursor']}", headers=headers).json()
+        assert [item["action"] for item in last["items"]] == ["walk.0"]
+    finally:
+        db.query(AuditLog).filter(AuditLog.result == marker).delete()
+        db.commit()
+        db.close()
+
+
+def test_estimate_count_renders_expanding_in_parameters(monkeypatch):
+    from sqlalchemy.dialects.postgresql import psycopg
+
+    executed = []
+
+    class _Connection:
+        def exec_driver_sql(self, sql, params):
+            executed.append((sql, params))
+            return self
+
+        def scalar(self):
+            return [{"Plan": {"Plan Rows": 12}}]
+
+    db = SessionLocal()
+    try:
+        monkeypatch.setattr(db, "get_bind", lambda *a, **k: type("Bind", (), {"dialect": psycopg.dialect()})())
+        monkeypatch.setattr(db, "connection", lambda *a, **k: _Connection())
+        query = db.query(AuditLog).filter(AuditLog.result.in_(["success", "failure"]))
+        assert estimate_count(query) == 12
+    finally:
+        db.close()
+    sql, params = executed[0]
+    assert "POSTCOMPILE" not in sql
+    assert sorted(value for value in params.values() if isinstance(value, str)) == ["failure", "success"]
+
+
+def test_scan_jobs_are_paged_with_cursor_headers():
+    from app.utils.pagination import NEXT_CURSOR_HEADER
+
+    headers = _login_admin()
+    for index in range(3):
+        resp = client.post(
+            "/api/scan-orchestration/jobs", json={"name": f"paged-{index}", "scan_type": "network"}, headers=headers
+        )
+        assert resp.status_code == 201
+
+    first = client.get("/api/scan-orchestration/jobs?limit=2", headers=headers)
+    assert first.status_code == 200
+    assert len(first.json()) == 2
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    rest = client.get(f"/api/scan-orchestration/jobs?limit=2&cursor={cursor}", headers=headers)
+    assert rest.status_code == 200
+    seen = {job["id"] for job in first.json()} | {job["id"] for job in rest.json()}
+    assert len(seen) == len(first.json()) + len(rest.json())
@@ -1,20 +1,30 @@
+import os
+import tempfile
 from types import SimpleNamespace
 
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.main import app
 from app.db.base_class import Base
-from app.database import get_db
-from app.core.auth import get_current_user
+from app.database import get_async_db, get_db
+from app.core.auth import get_current_user, get_current_user_async
 from app.models.tenant import Tenant
 from app.models.agent import Agent
 
 
 def setup_module(module):
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    # A file DB so the sync (baseline) and async (report) routes see the same data.
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    TestingAsyncSessionLocal = async_sessionmaker(
+        create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool), expire_on_commit=False
+    )
     Base.metadata.create_all(bind=engine)
 
     def override_get_db():
@@ -24,14 +34,21 @@ def setup_module(module):
         finally:
             db.close()
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     def override_current_user():
         return SimpleNamespace(id=1, tenant_id=1, role="admin")
 
     module.engine = engine
+    module.db_path = path
     module.TestingSessionLocal = TestingSessionLocal
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     app.dependency_overrides[get_current_user] = override_current_user
+    app.dependency_overrides[get_current_user_async] = override_current_user
 
     db = TestingSessionLocal()
     tenant = Tenant(id=1, name="Test", slug="test", is_active=True, storage_quota_gb=10)
@@ -43,9 +60,11 @@ def setup_module(module):
 
 
 def teardown_module(module):
-    app.dependency_overrides.pop(get_db, None)
-    app.dependency_overrides.pop(get_current_user, None)
+    for dependency in (get_db, get_async_db, get_current_user, get_current_user_async):
+        app.dependency_overrides.pop(dependency, None)
     Base.metadata.drop_all(bind=module.engine)
+    module.engine.dispose()
+    os.remove(module.db_path)
 
 
 def test_process_report_drift_detection():
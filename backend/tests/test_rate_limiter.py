@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+
+from app.services.rate_limiter import MemoryRateLimitBackend, RateLimitService
+
+
+def test_token_bucket_allows_burst_then_refills():
+    backend = MemoryRateLimitBackend(shards=4)
+    decisions = [backend.hit("user:1", limit=3, window=0.3) for _ in range(4)]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+    assert 0 < decisions[-1].retry_after <= 0.1 + 1e-6
+
+    time.sleep(0.11)
+    assert backend.hit("user:1", limit=3, window=0.3).allowed
+    assert not backend.hit("user:1", limit=3, window=0.3).allowed
+    # Other keys are unaffected.
+    assert backend.hit("user:2", limit=3, window=0.3).allowed
+
+
+def test_idle_keys_are_evicted():
+    backend = MemoryRateLimitBackend(shards=1, sweep_seconds=0)
+    for index in range(50):
+        backend.hit(f"k{index}", limit=10, window=0.05)
+    assert len(backend) == 50
+    time.sleep(0.02)
+    backend.hit("fresh", limit=10, window=0.05)
+    assert len(backend) == 1
+
+
+def test_service_namespaces_and_redis_fallback():
+    # An unreachable Redis must not fail requests; the service falls back to memory.
+    service = RateLimitService(redis_url="redis://127.0.0.1:1/0")
+    assert service.hit("export", "7", limit=1, window=60).allowed
+    assert not service.hit("export", "7", limit=1, window=60).allowed
+    assert service.hit("audit-export", "7", limit=1, window=60).allowed
+    assert service.hit("export", "7", limit=0, window=60).allowed
+
+    service.reset("export")
+    assert service.hit("export", "7", limit=1, window=60).allowed
+    assert not service.hit("audit-export", "7", limit=1, window=60).allowed
+
+
+def test_raising_the_limit_applies_immediately():
+    backend = MemoryRateLimitBackend()
+    assert backend.hit("grafana", limit=1, window=60).allowed
+    assert not backend.hit("grafana", limit=1, window=60).allowed
+    assert backend.hit("grafana", limit=60, window=60).allowed
@@ -0,0 +1,84 @@
+import os
+import tempfile
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import read_replicas
+from app.db.base_class import Base
+from app.main import app
+from app.models.compliance_result import ComplianceResult
+from .helpers import ADMIN_PASSWORD, ADMIN_USERNAME
+
+client = TestClient(app)
+
+REPLICA_MODULE = "replica_only_check"
+
+
+def _login_admin() -> str:
+    resp = client.post("/auth/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    assert resp.status_code == 200
+    return resp.json()["access_token"]
+
+
+def _make_replica() -> str:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(
+        ComplianceResult(
+            tenant_id=1,
+            module=REPLICA_MODULE,
+            status="pass",
+            recorded_at=datetime.utcnow(),
+            details="row that only exists on the replica",
+        )
+    )
+    session.commit()
+    session.close()
+    engine.dispose()
+    return path
+
+
+def test_listing_reads_follow_replica_lag_bound():
+    headers = {"Authorization": f"Bearer {_login_admin()}"}
+    path = _make_replica()
+    lag = {"seconds": 0.0}
+    router = read_replicas.configure(
+        [f"sqlite:///{path}"], max_lag=5, check_interval=0, lag_probe=lambda engine: lag["seconds"]
+    )
+    try:
+        resp = client.get(f"/compliance/results?module={REPLICA_MODULE}", headers=headers)
+        assert resp.status_code == 200
+        assert [row["module"] for row in resp.json()] == [REPLICA_MODULE]
+
+        # Response-cached trends stay on the primary, which lacks the replica-only row.
+        trend = client.get(f"/compliance/trends?days=1&module={REPLICA_MODULE}", headers=headers)
+        assert trend.status_code == 200
+        assert trend.json()[-1]["pass"] == 0
+
+        # Replica too far behind: the same reads fall back to the primary.
+        lag["seconds"] = 60
+        resp = client.get(f"/compliance/results?module={REPLICA_MODULE}", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json() == []
+        assert router.replicas[0].lag == 60
+    finally:
+        read_replicas.reset()
+        os.remove(path)
+
+
+def test_unreachable_replica_falls_back_to_primary():
+    def _broken(engine):
+        raise RuntimeError("replica down")
+
+    router = read_replicas.configure(["sqlite:///./unused-replica.db"], check_interval=60, lag_probe=_broken)
+    try:
+        assert router.pick() is None
+        assert router.replicas[0].lag is None
+    finally:
+        read_replicas.reset()
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache import response as response_cache
+from app.cache.invalidation import ALL_TENANTS
+from app.cache.response import CACHE_STATUS_HEADER, MemoryResponseStore, _tag_keys
+from app.database import SessionLocal
+from app.main import app
+from app.models.compliance_result import ComplianceResult
+from .helpers import ADMIN_PASSWORD, ADMIN_USERNAME
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def fresh_store():
+    store = MemoryResponseStore()
+    response_cache.configure(store)
+    yield store
+    response_cache.configure(MemoryResponseStore())
+
+
+def _auth_headers() -> dict:
+    resp = client.post("/auth/login", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_second_request_is_served_from_cache_with_etag():
+    headers = _auth_headers()
+    first = client.get("/compliance/trends?days=7", headers=headers)
+    assert first.status_code == 200
+    assert first.headers[CACHE_STATUS_HEADER] == "MISS"
+
+    second = client.get("/compliance/trends?days=7", headers=headers)
+    assert second.headers[CACHE_STATUS_HEADER] == "HIT"
+    assert second.json() == first.json()
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+    # Query strings are part of the key.
+    other = client.get("/compliance/trends?days=8", headers=headers)
+    assert other.headers[CACHE_STATUS_HEADER] == "MISS"
+
+    not_modified = client.get(
+        "/compliance/trends?days=7", headers={**headers, "If-None-Match": first.headers["ETag"]}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+def test_commit_invalidates_cached_response():
+    headers = _auth_headers()
+    before = client.get("/compliance/trends?days=3", headers=headers)
+    assert client.get("/compliance/trends?days=3", headers=headers).headers[CACHE_STATUS_HEADER] == "HIT"
+
+    db = SessionLocal()
+    try:
+        row = ComplianceResult(tenant_id=1, module="cache_test", status="fail", recorded_at=datetime.utcnow())
+        db.add(row)
+        db.commit()
+        after = client.get("/compliance/trends?days=3", headers=headers)
+        assert after.headers[CACHE_STATUS_HEADER] == "MISS"
+        assert after.json()[-1]["fail"] == before.json()[-1]["fail"] + 1
+
+        db.delete(row)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_disabled_store_bypasses_cache():
+    response_cache.configure(None)
+    resp = client.get("/compliance/trends?days=2", headers=_auth_headers())
+    assert resp.status_code == 200
+    assert CACHE_STATUS_HEADER not in resp.headers
+
+
+def test_tag_keys_scope_tenant_and_global_writes():
+    assert _tag_keys("modules", ALL_TENANTS) == ["modules"]
+    assert _tag_keys("modules", frozenset({None, 2})) == ["modules"]
+    assert _tag_keys("modules", frozenset({2})) == ["modules:2", "modules:all"]
+
+
+def test_memory_store_honours_entry_ttl(monkeypatch, fresh_store):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    entry = response_cache.CachedResponse.from_body(b"[]")
+    fresh_store.set("key", entry, ttl=5)
+    assert fresh_store.get("key") == entry
+    now[0] += 6
+    assert fresh_store.get("key") is None
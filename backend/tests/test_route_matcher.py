@@ -0,0 +1,64 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.route_matcher import RouteMatcher, build_app_matcher
+from app.observability.metrics import REGISTRY
+
+client = TestClient(app)
+
+
+def test_matcher_templates_methods_and_prefixes():
+    matcher = RouteMatcher()
+    matcher.add("/agents/{agent_id}/logs", "logs")
+    matcher.add("/agents/{agent_id}/logs", "logs-post", methods=["POST"])
+    matcher.add("/agents/enroll/bulk", "bulk")
+    matcher.add("/agents/*", "agents-prefix")
+    matcher.add("/grafana/{path:path}", "grafana")
+
+    assert matcher.match("GET", "/agents/42/logs").value == "logs"
+    assert matcher.match("POST", "/agents/42/logs").value == "logs-post"
+    assert matcher.match("POST", "/agents/42/logs").template == "/agents/{agent_id}/logs"
+    # Literal segments win; the parameter branch is the fallback.
+    assert matcher.match("POST", "/agents/enroll/bulk").value == "bulk"
+    assert matcher.match("GET", "/agents/enroll/logs").value == "logs"
+    assert [m.value for m in matcher.match_all("GET", "/agents/42/logs")] == ["agents-prefix", "logs"]
+    assert matcher.match("GET", "/agents/42/other").value == "agents-prefix"
+    assert matcher.match("GET", "/agentsx") is None
+    assert matcher.match("GET", "/grafana/api/dashboards/uid/abc").value == "grafana"
+
+
+def test_rate_limit_policy_resolution(monkeypatch):
+    monkeypatch.delenv("RATE_LIMIT_SKIP", raising=False)
+    mw = RateLimitMiddleware(
+        app=None,
+        route_overrides={
+            "POST /agents/{agent_id}/logs/stream": (5, 60),
+            "/admin/settings": (20, 60),
+            "/auth/login": (10, 60),
+        },
+    )
+    assert mw.resolve("POST", "/agents/7/logs/stream").limit == 5
+    assert mw.resolve("GET", "/agents/7/logs/stream") is mw.default
+    assert mw.resolve("GET", "/admin/settings").limit == 20
+    assert mw.resolve("OPTIONS", "/admin/settings") is None
+    assert mw.resolve("GET", "/health") is None
+    # Skip prefixes win over overrides and match on segment boundaries only.
+    assert mw.resolve("POST", "/auth/login") is None
+    assert mw.resolve("GET", "/grafana/api/search") is None
+    assert mw.resolve("GET", "/authz") is mw.default
+
+
+def test_metrics_use_route_templates():
+    matcher = build_app_matcher(app)
+    assert matcher.match("GET", "/agents/config/123").value == "/agents/config/{agent_id}"
+
+    client.get("/agents/config/987654")
+    samples = {
+        sample.labels.get("path")
+        for metric in REGISTRY.collect()
+        if metric.name == "http_requests"
+        for sample in metric.samples
+    }
+    assert "/agents/config/{agent_id}" in samples
+    assert "/agents/config/987654" not in samples
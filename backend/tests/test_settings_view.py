@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from app.database import SessionLocal, dispose_async_engine, get_async_sessionmaker
+from app.models.app_setting import AppSetting
+from app.services.grafana import get_base_url
+from app.services.settings_view import _VIEW_CACHE, get_settings, get_settings_async
+
+_KEYS = ("view.test.limit", "view.test.names", "view.test.url")
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    yield
+    db = SessionLocal()
+    try:
+        db.query(AppSetting).filter(AppSetting.key.in_(_KEYS)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _put(db, key, value, tenant_id=None):
+    db.add(AppSetting(tenant_id=tenant_id, key=key, value=value))
+    db.commit()
+
+
+def test_tenant_rows_override_global_and_values_are_typed():
+    db = SessionLocal()
+    try:
+        _put(db, "view.test.limit", "25")
+        _put(db, "view.test.names", "Spooler, WinRM ,", tenant_id=9)
+        _put(db, "view.test.url", "https://global.example", tenant_id=None)
+        _put(db, "view.test.url", "https://tenant.example", tenant_id=9)
+
+        tenant = get_settings(db, 9)
+        assert tenant.get_int("view.test.limit", 10) == 25
+        assert tenant.get_str_list("view.test.names") == ["Spooler", "WinRM"]
+        assert tenant.get_str("view.test.url") == "https://tenant.example"
+        assert get_settings(db).get_str("view.test.url") == "https://global.example"
+        assert get_settings(db, 10).get_str("view.test.url") == "https://global.example"
+        assert tenant.get_int("view.test.missing", 7) == 7
+        assert tenant.tenant_only().get_str("view.test.url") == "https://tenant.example"
+        assert tenant.tenant_only().get("view.test.limit") is None
+        assert get_settings(db, 10).tenant_only().get_str("view.test.url") is None
+    finally:
+        db.close()
+
+
+def test_repeated_reads_issue_no_queries_until_a_commit():
+    db = SessionLocal()
+    statements = []
+
+    def _count(*_args, **_kwargs):
+        statements.append(1)
+
+    try:
+        _put(db, "view.test.url", "https://grafana.example:3000/grafana")
+        event.listen(db.get_bind(), "before_cursor_execute", _count)
+        try:
+            for _ in range(3):
+                get_base_url(db, tenant_id=9)
+                assert get_settings(db, 9).get("view.test.url") == "https://grafana.example:3000/grafana"
+            assert len(statements) <= 1
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", _count)
+
+        _put(db, "view.test.limit", 3, tenant_id=9)
+        assert get_settings(db, 9).get_int("view.test.limit", 0) == 3
+    finally:
+        db.close()
+
+
+def test_async_lookup_shares_the_cache_without_joining_its_flights():
+    db = SessionLocal()
+    try:
+        _put(db, "view.test.names", ["Spooler"], tenant_id=11)
+    finally:
+        db.close()
+    _VIEW_CACHE.invalidate(11)
+
+    async def _run():
+        try:
+            async with get_async_sessionmaker()() as session:
+                first = await get_settings_async(session, 11)
+                second = await get_settings_async(session, 11)
+                return first, second
+        finally:
+            await dispose_async_engine()
+
+    first, second = asyncio.run(_run())
+    assert first.get_str_list("view.test.names") == ["Spooler"]
+    assert second is first
+    db = SessionLocal()
+    try:
+        assert get_settings(db, 11) is first
+    finally:
+        db.close()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the HTTP middleware stack.
+
+Usage:
+  python backend/tools/bench_middleware.py --requests 20000
+
+Drives ASGI apps in-process through httpx.ASGITransport (no sockets) and reports per-request cost for:
+  - bare:      a plain Starlette app with no middleware
+  - legacy:    six BaseHTTPMiddleware pass-through layers (shape of the old stack)
+  - tenantra:  the pure-ASGI stack used by app.main (metrics, rate limit, CORS,
+               security headers, request logging, correlation id)
+The middleware overhead is reported relative to the bare app.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import atexit
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _setup_path() -> None:
+    backend_dir = Path(__file__).resolve().parents[1]
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+    os.environ.setdefault("TENANTRA_TEST_BOOTSTRAP", "1")
+    if "DB_URL" not in os.environ:
+        # Scratch SQLite file outside the working tree, removed on exit.
+        fd, db_path = tempfile.mkstemp(prefix="bench_middleware_", suffix=".db")
+        os.close(fd)
+        atexit.register(_remove_file, db_path)
+        os.environ["DB_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("CORS_ALLOWED_ORIGINS", "http://bench.local")
+
+
+def _endpoint_app():
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    async def ok(_request):
+        return PlainTextResponse("ok")
+
+    return Starlette(routes=[Route("/bench", ok)])
+
+
+def _legacy_stack():
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    class PassThrough(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            response = await call_next(request)
+            response.headers.setdefault("X-Bench", "1")
+            return response
+
+    app = _endpoint_app()
+    for _ in range(6):
+        app.add_middleware(PassThrough)
+    return app
+
+
+def _tenantra_stack():
+    from app.middleware.correlation_id import CorrelationIdMiddleware
+    from app.middleware.dynamic_cors import DynamicCORSMiddleware
+    from app.middleware.rate_limit import RateLimitMiddleware
+    from app.middleware.request_logging import RequestLoggingMiddleware
+    from app.middleware.security_headers import SecurityHeadersMiddleware
+    from app.observability.metrics import RequestMetricsMiddleware
+
+    app = _endpoint_app()
+    app.add_middleware(CorrelationIdMiddleware)
+    app.add_middleware(RequestLoggingMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(DynamicCORSMiddleware)
+    app.add_middleware(RateLimitMiddleware, default_limit=10**9, default_window=60)
+    app.add_middleware(RequestMetricsMiddleware)
+    return app
+
+
+async def _drive(app, count: int) -> float:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 12345))
+    headers = {"origin": "http://bench.local"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench.local") as client:
+        for _ in range(min(count, 200)):  # warm-up
+            await client.get("/bench", headers=headers)
+        start = time.perf_counter()
+        for _ in range(count):
+            await client.get("/bench", headers=headers)
+        return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    _setup_path()
+    # Keep log I/O out of the measurement.
+    logging.disable(logging.CRITICAL)
+
+    results = {}
+    for name, factory in (("bare", _endpoint_app), ("legacy", _legacy_stack), ("tenantra", _tenantra_stack)):
+        elapsed = asyncio.run(_drive(factory(), args.requests))
+        results[name] = elapsed / args.requests * 1e6
+
+    bare = results["bare"]
+    print(f"{'stack':<10} {'us/request':>12} {'overhead us':>12}")
+    for name, per_request in results.items():
+        print(f"{name:<10} {per_request:>12.1f} {per_request - bare:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,6 +5,25 @@ import Button from "../components/ui/Button.jsx";
 
 const API_BASE = getApiBase();
 
+// UI filter names -> /audit-logs query parameters.
+const QUERY_PARAMS = {
+  pageSize: "page_size",
+  userId: "user_id",
+  start: "start_date",
+  end: "end_date",
+  result: "result",
+};
+
+const buildQuery = (filters, { paging }) => {
+  const qs = new URLSearchParams();
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value && (paging || key !== "pageSize")) {
+      qs.set(QUERY_PARAMS[key] || key, value);
+    }
+  });
+  return qs;
+};
+
 const authHeaders = (token, extra = {}) => ({
   "Content-Type": "application/json",
   Authorization: `Bearer ${token}`,
@@ -16,8 +35,11 @@ export default function AuditLogs() {
   const [total, setTotal] = useState(0);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
+  // Pages are walked with the API's keyset cursors; cursors[i] opens page i + 1.
+  const [page, setPage] = useState(1);
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [filters, setFilters] = useState({
-    page: 1,
     pageSize: 50,
     userId: "",
     start: "",
@@ -26,17 +48,16 @@ export default function AuditLogs() {
   });
 
   const token = typeof window !== "undefined" ? localStorage.getItem("token") : null;
+  const cursor = cursors[page - 1] || null;
 
   const loadLogs = useCallback(async () => {
     setLoading(true);
     setError("");
     try {
-      const qs = new URLSearchParams();
-      Object.entries(filters).forEach(([key, value]) => {
-        if (value) {
-          qs.set(key, value);
-        }
-      });
+      const qs = buildQuery(filters, { paging: true });
+      if (cursor) {
+        qs.set("cursor", cursor);
+      }
 
       const res = await fetch(`${API_BASE}/audit-logs?${qs.toString()}`, { headers: authHeaders(token) });
       if (!res.ok) {
@@ -44,13 +65,17 @@ export default function AuditLogs() {
       }
       const data = await res.json();
       setLogs(data?.items || []);
-      setTotal(data?.total || 0);
+      setNextCursor(data?.next_cursor || null);
+      // Only the first page carries the exact total; later pages keep it.
+      if (!cursor) {
+        setTotal(data?.total || 0);
+      }
     } catch (e) {
       setError(e.message || "Failed to load audit logs");
     } finally {
       setLoading(false);
     }
-  }, [token, filters]);
+  }, [token, filters, cursor]);
 
   useEffect(() => {
     loadLogs();
@@ -58,17 +83,22 @@ export default function AuditLogs() {
 
   const handleFilterChange = (e) => {
     const { name, value } = e.target;
-    setFilters((prev) => ({ ...prev, [name]: value, page: 1 }));
+    setFilters((prev) => ({ ...prev, [name]: value }));
+    setPage(1);
+    setCursors([null]);
+  };
+
+  const goNext = () => {
+    if (!nextCursor) {
+      return;
+    }
+    setCursors((prev) => [...prev.slice(0, page), nextCursor]);
+    setPage((prev) => prev + 1);
   };
 
   const exportCsv = async () => {
     try {
-      const qs = new URLSearchParams();
-      Object.entries(filters).forEach(([key, value]) => {
-        if (value && key !== "page" && key !== "pageSize") {
-          qs.set(key, value);
-        }
-      });
+      const qs = buildQuery(filters, { paging: false });
 
       const res = await fetch(`${API_BASE}/audit-logs/export?${qs.toString()}`, {
         headers: authHeaders(token, { Accept: "text/csv" }),
@@ -223,17 +253,17 @@ export default function AuditLogs() {
           <div className="text-sm text-gray-500">{total} results</div>
           <div className="flex items-center space-x-2">
             <Button
-              onClick={() => setFilters((prev) => ({ ...prev, page: Math.max(1, prev.page - 1) }))}
-              disabled={filters.page <= 1}
+              onClick={() => setPage((prev) => Math.max(1, prev - 1))}
+              disabled={page <= 1}
             >
               Prev
             </Button>
             <div className="text-sm">
-              Page {filters.page} / {pageCount}
+              Page {page} / {pageCount}
             </div>
             <Button
-              onClick={() => setFilters((prev) => ({ ...prev, page: Math.min(pageCount, prev.page + 1) }))}
-              disabled={filters.page >= pageCount}
+              onClick={goNext}
+              disabled={!nextCursor}
             >
               Next
             </Button>